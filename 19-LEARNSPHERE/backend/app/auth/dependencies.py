@@ -28,6 +28,8 @@ def get_current_user(payload: dict = Depends(verify_token), db: Session = Depend
                 print("Failed to auto-create user due to concurrent insertion:", str(e))
                 raise HTTPException(status_code=500, detail="Failed to initialize user session")
         
+    # Lets the session remember who wrote, for read-your-writes replica routing
+    db.info["user_id"] = user.id
     return user
 
 def require_admin(current_user: User = Depends(get_current_user)):
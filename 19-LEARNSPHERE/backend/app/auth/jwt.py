@@ -10,7 +10,7 @@ security = HTTPBearer()
 @lru_cache(maxsize=1)
 def get_jwks():
     url = f"{settings.NEON_AUTH_URL}/.well-known/jwks.json"
-    response = httpx.get(url)
+    response = httpx.get(url, timeout=10)
     response.raise_for_status()
     return response.json()
 
@@ -0,0 +1,173 @@
+import time
+import asyncio
+import itertools
+from typing import Optional
+from fastapi.responses import JSONResponse
+from app.core.config import settings
+from app.core.metrics import ADMISSION_DECISIONS, ADMISSION_QUEUE_WAIT, ADMISSION_IN_FLIGHT, ADMISSION_QUEUE_DEPTH
+
+# Lower is served first when requests are queued: cheap reads, then writes, then analytics, then AI chat
+PRIORITIES = {"read": 0, "tracking": 1, "write": 1, "dashboard": 2, "ai": 3}
+
+TRACKING_PREFIXES = ("/lesson/", "/quiz/", "/session/", "/course/", "/performance/")
+
+def classify(method: str, path: str) -> Optional[str]:
+    """
+    The admission class of a request, or None for paths that bypass admission control
+    (health checks, metrics, docs and the long-lived dashboard event stream).
+    """
+    api = settings.API_V1_STR
+    if not path.startswith(api + "/"):
+        return None
+    path = path[len(api):]
+    if path.startswith("/ai/"):
+        return "ai"
+    if path.startswith("/dashboard/"):
+        return None if path == "/dashboard/stream" else "dashboard"
+    if path.startswith(TRACKING_PREFIXES):
+        return "tracking"
+    return "read" if method in ("GET", "HEAD") else "write"
+
+class RouteClass:
+    def __init__(self, name: str, limit: int, deadline: float, priority: int):
+        self.name = name
+        self.limit = limit
+        self.deadline = deadline
+        self.priority = priority
+        self.in_flight = 0
+
+class AdmissionController:
+    """
+    Caps concurrent requests per route class (`limit`, 0 = unlimited) and across all classes
+    (`max_concurrent`). Requests over a cap wait in one queue, served in priority order, for at
+    most their class's deadline; when the queue is full or the deadline passes they are shed.
+    State is only touched from the worker's event loop, so no locking is needed.
+    """
+
+    def __init__(self, classes: dict, max_concurrent: int = 0, max_queue: int = 0):
+        self.classes = classes
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self._waiters = []
+        self._seq = itertools.count()
+
+    @classmethod
+    def from_settings(cls):
+        classes = {
+            name: RouteClass(
+                name,
+                settings.ADMISSION_LIMITS.get(name, 0),
+                settings.ADMISSION_QUEUE_DEADLINES_MS.get(name, 0) / 1000,
+                priority
+            )
+            for name, priority in PRIORITIES.items()
+        }
+        return cls(classes, settings.ADMISSION_MAX_CONCURRENT, settings.ADMISSION_MAX_QUEUE)
+
+    def _has_room(self, route_class: RouteClass) -> bool:
+        if self.max_concurrent > 0 and self.in_flight >= self.max_concurrent:
+            return False
+        return route_class.limit <= 0 or route_class.in_flight < route_class.limit
+
+    def _admit(self, route_class: RouteClass):
+        route_class.in_flight += 1
+        self.in_flight += 1
+        ADMISSION_IN_FLIGHT.set(route_class.in_flight, route_class=route_class.name)
+
+    def _dispatch(self):
+        """
+        Admits queued requests, highest priority first, while their classes have room.
+        """
+        remaining = []
+        for entry in sorted(self._waiters, key=lambda e: e[:2]):
+            future = entry[3]
+            if future.done():
+                continue
+            if self._has_room(entry[2]):
+                self._admit(entry[2])
+                future.set_result(True)
+            else:
+                remaining.append(entry)
+        self._waiters = remaining
+        ADMISSION_QUEUE_DEPTH.set(len(remaining))
+
+    def _forget(self, future):
+        self._waiters = [entry for entry in self._waiters if entry[3] is not future]
+        ADMISSION_QUEUE_DEPTH.set(len(self._waiters))
+
+    async def acquire(self, name: str) -> bool:
+        """
+        Waits for a slot in the named class; False means the request should be shed.
+        """
+        route_class = self.classes[name]
+        if not self._waiters and self._has_room(route_class):
+            self._admit(route_class)
+            ADMISSION_DECISIONS.inc(route_class=name, decision="admitted")
+            return True
+        if self.max_queue > 0 and len(self._waiters) >= self.max_queue:
+            ADMISSION_DECISIONS.inc(route_class=name, decision="shed_queue_full")
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((route_class.priority, next(self._seq), route_class, future))
+        # Lower-priority requests may be queued ahead while this class has room
+        self._dispatch()
+        if future.done():
+            ADMISSION_DECISIONS.inc(route_class=name, decision="admitted")
+            return True
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(future, timeout=max(route_class.deadline, 0))
+        except asyncio.TimeoutError:
+            self._forget(future)
+            ADMISSION_QUEUE_WAIT.observe(time.monotonic() - started, route_class=name)
+            ADMISSION_DECISIONS.inc(route_class=name, decision="shed_deadline")
+            return False
+        except asyncio.CancelledError:
+            # Client went away while queued; give back a slot granted in the meantime
+            if future.done() and not future.cancelled():
+                self.release(name)
+            else:
+                self._forget(future)
+            raise
+        ADMISSION_QUEUE_WAIT.observe(time.monotonic() - started, route_class=name)
+        ADMISSION_DECISIONS.inc(route_class=name, decision="queued")
+        return True
+
+    def release(self, name: str):
+        route_class = self.classes[name]
+        route_class.in_flight -= 1
+        self.in_flight -= 1
+        ADMISSION_IN_FLIGHT.set(route_class.in_flight, route_class=name)
+        if self._waiters:
+            self._dispatch()
+
+class AdmissionControlMiddleware:
+    """
+    Sheds load before it piles up in uvicorn and the connection pool: requests past their
+    class's limits queue briefly, then get 503 with Retry-After.
+    """
+
+    def __init__(self, app, controller: AdmissionController = None, retry_after: int = 2):
+        self.app = app
+        self.controller = controller or AdmissionController.from_settings()
+        self.retry_after = retry_after
+
+    async def __call__(self, scope, receive, send):
+        name = classify(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+        if not await self.controller.acquire(name):
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Server is busy, please retry shortly"},
+                headers={"Retry-After": str(self.retry_after)}
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(name)
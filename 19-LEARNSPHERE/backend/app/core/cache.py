@@ -0,0 +1,61 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Every cache registers itself here so it can be flushed by name or all at once
+_registry = {}
+
+class TTLCache:
+    """
+    Small thread-safe LRU cache with a per-entry time to live.
+    Shared by all requests handled by this worker process.
+    """
+
+    def __init__(self, name: str, ttl_seconds: float = 300, maxsize: int = 1024):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        _registry[name] = self
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl_seconds: float = None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+def get_cache(name: str):
+    return _registry.get(name)
+
+def all_caches():
+    return list(_registry.values())
+
+def clear_all_caches():
+    for cache in all_caches():
+        cache.clear()
@@ -1,4 +1,5 @@
 import os
+from typing import Dict
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 # Dynamically resolve absolute path to backend/.env
@@ -13,6 +14,88 @@ class Settings(BaseSettings):
     QUBRID_API_KEY: str
     QUBRID_BASE_URL: str = "https://platform.qubrid.com/api/v1/qubridai"
 
+    # Startup: schema changes run via migrate.py unless enabled here (handy for local dev)
+    RUN_MIGRATIONS_ON_STARTUP: bool = False
+    DB_POOL_PREFILL: int = 5
+
+    # Read replicas for read-only endpoints (comma-separated DSNs; empty routes everything to the primary)
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_STICKY_SECONDS: int = 5
+    # Where "wrote recently" markers live. "memory" only pins reads served by the worker that took
+    # the write: use "redis" (REDIS_URL) when running more than one worker
+    REPLICA_STICKY_BACKEND: str = "memory" # memory, redis
+    REPLICA_RETRY_SECONDS: int = 30
+
+    # Shared store (Redis) used by multi-worker deployments; empty keeps state in-process
+    REDIS_URL: str = ""
+
+    # Cross-worker cache invalidation over Postgres LISTEN/NOTIFY (DSN defaults to DATABASE_URL)
+    CACHE_INVALIDATION_CHANNEL: str = "cache_invalidation"
+    CACHE_INVALIDATION_DSN: str = ""
+
+    # Leaderboards. "memory" keeps the boards inside one worker process: use "redis" when running
+    # more than one worker. The memory backend rebuilds from the database on startup; its snapshot
+    # file is only a fallback for when the database can't be read then
+    LEADERBOARD_BACKEND: str = "memory" # memory, redis
+    LEADERBOARD_SNAPSHOT_PATH: str = os.path.join(BASE_DIR, "leaderboard_snapshot.json")
+    LEADERBOARD_SNAPSHOT_INTERVAL_SECONDS: int = 300
+    LEADERBOARD_SNAPSHOT_MAX_AGE_SECONDS: int = 3600
+
+    # Collaborative-filtering course recommendations (written by train_recommender.py)
+    RECOMMENDER_MODEL_PATH: str = os.path.join(BASE_DIR, "course_embeddings.npz")
+
+    # Observability: metrics are served at /metrics; the headers are opt-in per deployment
+    LOG_LEVEL: str = "INFO"
+    SLOW_QUERY_MS: int = 500
+    # Adds X-Query-Count (SQL statements per request) to responses; used by the bench suite
+    QUERY_COUNT_HEADER: bool = False
+    # Adds Server-Timing (DB time, query count, JSON serialization, total) for browser devtools and the bench suite
+    SERVER_TIMING_HEADER: bool = False
+    # Per-route query budgets (@query_budget) and N+1 detection: "warn", "raise" (tests) or "off"
+    QUERY_BUDGET_MODE: str = "warn"
+    QUERY_REPEAT_LIMIT: int = 5
+
+    # Activity logs are written behind by a background thread: one multi-row insert per batch of
+    # FLUSH_ROWS or every FLUSH_INTERVAL_SECONDS. A full buffer (CAPACITY) applies OVERFLOW:
+    # "flush" (the request writes a batch inline), "drop_oldest" or "drop_newest"
+    ACTIVITY_LOG_BUFFERED: bool = True
+    ACTIVITY_LOG_FLUSH_ROWS: int = 500
+    ACTIVITY_LOG_FLUSH_INTERVAL_SECONDS: float = 1.0
+    ACTIVITY_LOG_CAPACITY: int = 20000
+    ACTIVITY_LOG_OVERFLOW: str = "flush"
+
+    # Admission control: concurrent requests per route class (0 = unlimited) and across all of them.
+    # Requests over a limit queue, cheap reads first and AI chat last, for up to their class's
+    # deadline, then get 503 with Retry-After. Keep MAX_CONCURRENT near the DB pool size. The dicts
+    # are set from JSON and replace the defaults whole (classes left out become unlimited)
+    ADMISSION_CONTROL: bool = True
+    ADMISSION_MAX_CONCURRENT: int = 48
+    ADMISSION_LIMITS: Dict[str, int] = {"read": 0, "write": 16, "tracking": 32, "dashboard": 8, "ai": 8}
+    ADMISSION_QUEUE_DEADLINES_MS: Dict[str, int] = {"read": 2000, "write": 2000, "tracking": 2000, "dashboard": 1000, "ai": 250}
+    ADMISSION_MAX_QUEUE: int = 256
+    ADMISSION_RETRY_AFTER_SECONDS: int = 2
+
+    # Per-user token-bucket rate limits by route class and role, as "requests/period" (second, minute,
+    # hour, day). "default" covers roles not listed; a class left out is unlimited. The rate applies
+    # to each route of the class separately. The memory backend limits per worker, redis shares
+    # the buckets across workers
+    RATE_LIMIT_BACKEND: str = "memory" # memory, redis
+    RATE_LIMITS: Dict[str, Dict[str, str]] = {
+        "ai": {"default": "10/minute", "instructor": "20/minute", "admin": "60/minute"},
+        "tracking": {"default": "120/minute", "instructor": "240/minute", "admin": "600/minute"},
+    }
+
+    # Responses: gzip/brotli (brotli when the package is installed) for complete bodies of at least
+    # this many bytes; 0 disables compression
+    COMPRESSION_MIN_BYTES: int = 1024
+
+    # Learner home (/home): threads shared by all requests for running its independent queries
+    # concurrently, each on its own session (and connection); 0 runs them in turn on the request's session.
+    # A request runs 4 parts, so 8 threads serve about 2 home requests at once per worker and later ones
+    # queue for a thread. Every busy thread holds a connection: keep this within what the primary's pool
+    # (SQLAlchemy default: 5 + 10 overflow) can spare beside the worker's other requests
+    HOME_QUERY_WORKERS: int = 8
+
     # API Configuration
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "LearnSphere LMS Backend"
@@ -23,4 +106,27 @@ class Settings(BaseSettings):
         extra="ignore"
     )
 
-settings = Settings()
+class TestSettings(Settings):
+    """
+    SETTINGS_PROFILE=test: in-memory SQLite and placeholder credentials, so the test suite
+    runs without Postgres or a .env file. Environment variables still override these.
+    """
+    DATABASE_URL: str = "sqlite://"
+    NEON_AUTH_URL: str = "http://auth.test"
+    NEON_AUTH_AUDIENCE: str = "learnsphere-test"
+    NEON_AUTH_ISSUER: str = "learnsphere-test"
+    QUBRID_API_KEY: str = "test"
+    QUBRID_BASE_URL: str = "http://qubrid.test"
+    DB_POOL_PREFILL: int = 0
+    # Tests read activity logs straight after the request
+    ACTIVITY_LOG_BUFFERED: bool = False
+    # The in-memory database is a single connection, which threads can't use at once
+    HOME_QUERY_WORKERS: int = 0
+
+    # Budget violations and N+1 patterns fail the request (and so the test) instead of logging
+    QUERY_BUDGET_MODE: str = "raise"
+    QUERY_COUNT_HEADER: bool = True
+
+    model_config = SettingsConfigDict(env_file=None, extra="ignore")
+
+settings = TestSettings() if os.environ.get("SETTINGS_PROFILE") == "test" else Settings()
@@ -0,0 +1,116 @@
+import time
+import uuid
+import enum
+import asyncio
+import itertools
+import threading
+from collections import deque
+
+# In-process pub/sub for dashboard push. Topics are course ids; ALL_COURSES receives every event.
+ALL_COURSES = "*"
+DEFAULT_BUFFER_SIZE = 256
+
+class Subscription:
+    """
+    One subscriber's bounded buffer. When it is full the oldest event is dropped,
+    and the number of dropped events is reported on the next read so the client can resync.
+    """
+
+    def __init__(self, topics, loop: asyncio.AbstractEventLoop, maxsize: int = DEFAULT_BUFFER_SIZE):
+        self.topics = frozenset(topics)
+        self.dropped = 0
+        self._buffer = deque(maxlen=maxsize)
+        self._lock = threading.Lock()
+        self._loop = loop
+        self._ready = asyncio.Event()
+
+    def push(self, event: dict):
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(event)
+        # Publishers run on worker threads; wake the consumer on its own loop
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            pass  # loop already closed
+
+    def drain(self):
+        """
+        Returns (events, dropped) buffered since the last call.
+        """
+        with self._lock:
+            events = list(self._buffer)
+            self._buffer.clear()
+            dropped, self.dropped = self.dropped, 0
+            self._ready.clear()
+        return events, dropped
+
+    async def wait(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+class EventBus:
+    def __init__(self):
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+
+    def subscribe(self, topics, maxsize: int = DEFAULT_BUFFER_SIZE) -> Subscription:
+        """
+        Must be called from the event loop that will consume the subscription.
+        """
+        subscription = Subscription(topics, asyncio.get_running_loop(), maxsize)
+        with self._lock:
+            for topic in subscription.topics:
+                self._subscriptions.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._subscriptions.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[topic]
+
+    def publish(self, course_id, event_type: str, data: dict):
+        """
+        Fans an event out to the course's subscribers. Never blocks on slow consumers.
+        """
+        topic = str(course_id)
+        with self._lock:
+            targets = set(self._subscriptions.get(topic, ())) | set(self._subscriptions.get(ALL_COURSES, ()))
+            if not targets:
+                return
+            event = {
+                "id": next(self._sequence),
+                "type": event_type,
+                "course_id": topic,
+                "ts": time.time(),
+                "data": data
+            }
+        for subscription in targets:
+            subscription.push(event)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(set().union(*self._subscriptions.values())) if self._subscriptions else 0
+
+event_bus = EventBus()
+
+def _jsonable(value):
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (list, tuple, set)):
+        return [_jsonable(item) for item in value]
+    return value
+
+def publish_event(course_id, event_type: str, **data):
+    event_bus.publish(course_id, event_type, {key: _jsonable(value) for key, value in data.items()})
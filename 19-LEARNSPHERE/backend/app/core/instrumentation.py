@@ -0,0 +1,56 @@
+import time
+from starlette.datastructures import MutableHeaders
+from app.core.metrics import HTTP_REQUESTS, HTTP_REQUEST_DURATION, HTTP_IN_FLIGHT
+from app.core.config import settings
+from app.core.query_stats import start_request_stats, reset_request_stats, route_label
+from app.core.query_budget import enforce_query_budget
+
+QUERY_COUNT_HEADER = "X-Query-Count"
+
+class RequestMetricsMiddleware:
+    """
+    Records per-route latency, status counts and in-flight requests, and tracks the SQL each
+    request runs against its query budget. Optionally reports it back in X-Query-Count and
+    Server-Timing headers.
+    """
+
+    def __init__(self, app, query_count_header: bool = False, server_timing_header: bool = False):
+        self.app = app
+        self.query_count_header = query_count_header
+        self.server_timing_header = server_timing_header
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats, token = start_request_stats(scope, track_shapes=settings.QUERY_BUDGET_MODE != "off")
+        started = time.perf_counter()
+        status = 500
+        HTTP_IN_FLIGHT.inc()
+
+        async def send_with_metrics(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                if self.query_count_header:
+                    headers.append(QUERY_COUNT_HEADER, str(stats.count))
+                if self.server_timing_header:
+                    total_ms = (time.perf_counter() - started) * 1000
+                    headers.append(
+                        "Server-Timing",
+                        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.count} queries", '
+                        f'serialize;dur={stats.serialize_seconds * 1000:.1f}, app;dur={total_ms:.1f}'
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            route = route_label(scope)
+            HTTP_IN_FLIGHT.dec()
+            HTTP_REQUESTS.inc(method=scope["method"], route=route, status=str(status))
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, method=scope["method"], route=route)
+            reset_request_stats(token)
+            enforce_query_budget(stats, scope)
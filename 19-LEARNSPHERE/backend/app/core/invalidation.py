@@ -0,0 +1,195 @@
+import os
+import json
+import uuid
+import socket
+import logging
+import threading
+import select as select_module
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.cache import get_cache, clear_all_caches
+
+logger = logging.getLogger("cache_invalidation")
+
+# Typed invalidation messages; every key is the UUID the target caches are keyed on
+COURSE_EDITED = "course_edited"                          # course_id
+COURSE_ACTIVITY = "course_activity"                      # course_id: enrollments, progress, quizzes, sessions
+LEARNER_PROGRESS_CHANGED = "learner_progress_changed"    # user_id
+REVIEWS_CHANGED = "reviews_changed"                      # user_id
+PROFILE_CHANGED = "profile_changed"                      # user_id
+
+# Message type -> names of the registered caches to evict the key from. A type is added together
+# with the cache it evicts: role and performance changes have no cache to drop, so they publish nothing
+INVALIDATION_TARGETS = {
+    COURSE_EDITED: ["course_lessons", "cohort_analytics", "lesson_funnel"],
+    COURSE_ACTIVITY: ["cohort_analytics"],
+    LEARNER_PROGRESS_CHANGED: ["learner_lesson_state"],
+    REVIEWS_CHANGED: ["review_queues"],
+    PROFILE_CHANGED: ["user_profiles"],
+}
+
+# NOTIFY payloads are capped at 8000 bytes; UUIDs are 36 characters plus quoting
+MAX_KEYS_PER_MESSAGE = 150
+RECONNECT_MIN_SECONDS = 1
+RECONNECT_MAX_SECONDS = 30
+POLL_SECONDS = 5
+
+_origin = None
+_origin_pid = None
+
+def worker_origin() -> str:
+    """
+    Identifies this worker process so it can ignore its own notifications. Recomputed after fork.
+    """
+    global _origin, _origin_pid
+    if _origin_pid != os.getpid():
+        _origin = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        _origin_pid = os.getpid()
+    return _origin
+
+def evict(message_type: str, keys):
+    for name in INVALIDATION_TARGETS.get(message_type, []):
+        cache = get_cache(name)
+        if cache is None:
+            continue
+        for key in keys:
+            cache.invalidate(key)
+
+def publish_invalidation(db: Session, message_type: str, *keys, local: bool = True):
+    """
+    Queues an invalidation on the session's open write transaction.
+    On Postgres a NOTIFY is issued in the same transaction, so other workers only hear about
+    committed changes. This worker evicts after commit unless `local` is False
+    (for callers that update their own in-memory copy in place).
+    Types with no target caches yet are accepted and skipped, so no worker is woken for nothing.
+    """
+    if message_type not in INVALIDATION_TARGETS:
+        raise ValueError(f"Unknown invalidation message type: {message_type}")
+    keys = [key for key in keys if key is not None]
+    if not keys or not INVALIDATION_TARGETS[message_type]:
+        return
+    if local:
+        # Begin the transaction now if nothing has run yet, so a rollback discards the eviction
+        db.connection()
+        db.info.setdefault("pending_invalidations", []).append((message_type, keys))
+    if db.get_bind().dialect.name == "postgresql":
+        for start in range(0, len(keys), MAX_KEYS_PER_MESSAGE):
+            payload = json.dumps({
+                "type": message_type,
+                "keys": [str(key) for key in keys[start:start + MAX_KEYS_PER_MESSAGE]],
+                "origin": worker_origin()
+            })
+            db.execute(text("SELECT pg_notify(:channel, :payload)"), {
+                "channel": settings.CACHE_INVALIDATION_CHANNEL,
+                "payload": payload
+            })
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_invalidations(session):
+    for message_type, keys in session.info.pop("pending_invalidations", []):
+        evict(message_type, keys)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_invalidations(session, previous_transaction):
+    session.info.pop("pending_invalidations", None)
+
+def handle_notification(payload: str):
+    try:
+        message = json.loads(payload)
+        if message.get("origin") == worker_origin():
+            return
+        evict(message["type"], [uuid.UUID(key) for key in message["keys"]])
+    except (ValueError, KeyError, TypeError) as e:
+        logger.warning("Ignoring malformed invalidation message: %s", e)
+
+def _listener_dsn() -> str:
+    url = make_url(settings.CACHE_INVALIDATION_DSN or settings.DATABASE_URL)
+    return url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+class InvalidationListener:
+    """
+    Background thread holding a dedicated LISTEN connection (outside the pool).
+    Reconnects with exponential backoff; after any disconnect every cache is flushed,
+    since notifications sent during the gap are lost.
+    """
+
+    def __init__(self, dsn: str, channel: str):
+        self.dsn = dsn
+        self.channel = channel
+        self.connected = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="cache-invalidation", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _connect(self):
+        import psycopg2
+        import psycopg2.extensions
+        connection = psycopg2.connect(self.dsn)
+        connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with connection.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.channel}"')
+        return connection
+
+    def _run(self):
+        backoff = RECONNECT_MIN_SECONDS
+        had_connection = False
+        while not self._stop.is_set():
+            connection = None
+            try:
+                connection = self._connect()
+                if had_connection:
+                    clear_all_caches()
+                    logger.warning("Invalidation listener reconnected; flushed all caches")
+                had_connection = True
+                backoff = RECONNECT_MIN_SECONDS
+                self.connected.set()
+                while not self._stop.is_set():
+                    if select_module.select([connection], [], [], POLL_SECONDS) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        handle_notification(connection.notifies.pop(0).payload)
+            except Exception as e:
+                self.connected.clear()
+                logger.error("Invalidation listener disconnected: %s; retrying in %ss", e, backoff)
+                # Caches may already be stale; don't wait for the reconnect to drop them
+                if had_connection:
+                    clear_all_caches()
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, RECONNECT_MAX_SECONDS)
+            finally:
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+        self.connected.clear()
+
+_listener = None
+
+def start_invalidation_listener(engine):
+    """
+    Starts the per-worker listener on Postgres. Other dialects run single-process and need none.
+    """
+    global _listener
+    if engine.dialect.name != "postgresql" or _listener is not None:
+        return None
+    _listener = InvalidationListener(_listener_dsn(), settings.CACHE_INVALIDATION_CHANNEL)
+    _listener.start()
+    return _listener
+
+def stop_invalidation_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,147 @@
+import bisect
+import threading
+
+# Shared by the latency histograms: 5ms .. 30s
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+def _escape(value: str, quotes: bool = True) -> str:
+    value = value.replace("\\", "\\\\").replace("\n", "\\n")
+    return value.replace('"', '\\"') if quotes else value
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+class Metric:
+    """
+    A named metric with fixed label names, registered for /metrics on creation.
+    Values are per process; with several workers each one reports its own.
+    """
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        with _registry_lock:
+            if name in _registry:
+                raise ValueError(f"Metric {name} is already registered")
+            _registry[name] = self
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        """
+        (sample name, labels, value) triples for the text exposition.
+        """
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, the last slot is +Inf; then sum
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        for key, counts, total in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(float(bound))}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+def render_metrics() -> str:
+    """
+    Every registered metric in the Prometheus text exposition format (version 0.0.4).
+    """
+    with _registry_lock:
+        metrics = list(_registry.values())
+    lines = []
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {_escape(metric.documentation, quotes=False)}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route and status code", ("method", "route", "status"))
+HTTP_REQUEST_DURATION = Histogram("http_request_duration_seconds", "HTTP request latency by route", ("method", "route"))
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+DB_QUERIES = Counter("db_queries_total", "SQL statements executed, by route", ("route",))
+DB_QUERY_DURATION = Histogram("db_query_duration_seconds", "SQL statement execution time, by route", ("route",))
+RESPONSE_SERIALIZE_DURATION = Histogram("response_serialize_seconds", "Time spent encoding JSON response bodies, by route", ("route",))
+ACTIVITY_LOG_BUFFER_DEPTH = Gauge("activity_log_buffer_depth", "Activity log rows waiting in the write-behind buffer")
+ACTIVITY_LOG_FLUSH_DURATION = Histogram("activity_log_flush_seconds", "Time to insert and commit one batch of activity log rows")
+ACTIVITY_LOG_ROWS_WRITTEN = Counter("activity_log_rows_written_total", "Activity log rows written by buffer flushes")
+ACTIVITY_LOG_ROWS_DROPPED = Counter("activity_log_rows_dropped_total", "Activity log rows discarded by the write-behind buffer", ("reason",))
+ADMISSION_DECISIONS = Counter(
+    "admission_decisions_total",
+    "Admission control outcomes by route class: admitted, queued (admitted after waiting), shed_queue_full, shed_deadline",
+    ("route_class", "decision")
+)
+ADMISSION_QUEUE_WAIT = Histogram("admission_queue_wait_seconds", "Time requests spent queued for admission", ("route_class",))
+ADMISSION_IN_FLIGHT = Gauge("admission_in_flight", "Admitted requests being served, by route class", ("route_class",))
+ADMISSION_QUEUE_DEPTH = Gauge("admission_queue_depth", "Requests waiting for admission")
+RATE_LIMIT_REJECTIONS = Counter("rate_limit_rejections_total", "Requests refused with 429 by the per-user rate limits", ("route_class", "role"))
+RATE_LIMIT_BACKEND_ERRORS = Counter("rate_limit_backend_errors_total", "Rate limit checks skipped because the store failed (requests allowed)", ("route_class",))
+QUBRID_REQUEST_DURATION = Histogram("qubrid_request_duration_seconds", "Qubrid chat completion latency", ("outcome",))
+QUBRID_TOKENS = Counter("qubrid_tokens_total", "Tokens reported by Qubrid usage blocks", ("kind",))
@@ -0,0 +1,55 @@
+import logging
+from app.core.config import settings
+from app.core.query_stats import route_label
+
+logger = logging.getLogger("query_budget")
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+class QueryBudget:
+    def __init__(self, max_queries, max_repeats: int = None):
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+
+def query_budget(max_queries, max_repeats: int = None):
+    """
+    Declares the most SQL statements a route may run per request, dependencies (auth, user lookup)
+    included, and optionally how often one statement shape may repeat (default QUERY_REPEAT_LIMIT).
+    The budget must not depend on data size; a loop of per-row lookups breaks it.
+    Batch endpoints that work in chunks pass max_queries=None and a higher max_repeats.
+
+        @router.get("/my-courses")
+        @query_budget(2)
+        def my_courses(...):
+    """
+    def decorate(endpoint):
+        endpoint.query_budget = QueryBudget(max_queries, max_repeats)
+        return endpoint
+    return decorate
+
+def budget_violations(stats, endpoint) -> list:
+    budget = getattr(endpoint, "query_budget", None)
+    violations = []
+    if budget is not None and budget.max_queries is not None and stats.count > budget.max_queries:
+        violations.append(f"ran {stats.count} queries, budget is {budget.max_queries}")
+    max_repeats = budget.max_repeats if budget is not None and budget.max_repeats is not None else settings.QUERY_REPEAT_LIMIT
+    for shape, count in (stats.shapes or {}).items():
+        if count > max_repeats:
+            violations.append(f"repeated {count} times (likely N+1): {shape[:300]}")
+    return violations
+
+def enforce_query_budget(stats, scope: dict):
+    """
+    Checks a finished request against its route's budget. QUERY_BUDGET_MODE "warn" logs
+    violations (production), "raise" fails the request (test suite), "off" skips the check.
+    """
+    if settings.QUERY_BUDGET_MODE == "off":
+        return
+    violations = budget_violations(stats, scope.get("endpoint"))
+    if not violations:
+        return
+    message = f"{scope['method']} {route_label(scope)}: " + "; ".join(violations)
+    if settings.QUERY_BUDGET_MODE == "raise":
+        raise QueryBudgetExceeded(message)
+    logger.warning("Query budget exceeded on %s", message)
@@ -0,0 +1,108 @@
+import re
+import time
+import logging
+import threading
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+from app.core.metrics import DB_QUERIES, DB_QUERY_DURATION
+
+logger = logging.getLogger("slow_queries")
+
+# Label for statements run outside any request (warm-up, background threads)
+NO_ROUTE = "none"
+
+# Expanded IN lists differ only in their placeholder count
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)\s*,)+\s*(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)\s*\)")
+
+# Transaction control (SQLite's explicit BEGIN, the test suite's savepoints) isn't counted as a query
+_TRANSACTION_CONTROL = ("BEGIN", "SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+def statement_shape(statement: str) -> str:
+    return _PLACEHOLDER_LIST.sub("(?)", " ".join(statement.split()))
+
+class RequestQueryStats:
+    """
+    Per-request database and serialization counters. The context variable holds this object, so worker threads
+    running sync endpoints (which see a copy of the request context) update the same instance. A request can
+    fan out to several threads at once (the learner home screen), so updates go through a lock.
+    """
+    __slots__ = ("count", "db_seconds", "serialize_seconds", "scope", "shapes", "_lock")
+
+    def __init__(self, scope: dict = None, track_shapes: bool = False):
+        self.count = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.scope = scope
+        # Statement shape -> executions, for N+1 detection (only when budgets are enforced)
+        self.shapes = {} if track_shapes else None
+        self._lock = threading.Lock()
+
+    def record_query(self, statement: str, elapsed: float):
+        shape = statement_shape(statement) if self.shapes is not None else None
+        with self._lock:
+            self.count += 1
+            self.db_seconds += elapsed
+            if shape is not None:
+                self.shapes[shape] = self.shapes.get(shape, 0) + 1
+
+    def record_serialize(self, elapsed: float):
+        with self._lock:
+            self.serialize_seconds += elapsed
+
+    @property
+    def route(self) -> str:
+        return route_label(self.scope) if self.scope is not None else NO_ROUTE
+
+_current = ContextVar("request_query_stats", default=None)
+
+def current_query_stats():
+    return _current.get()
+
+def start_request_stats(scope: dict, track_shapes: bool = False):
+    """
+    Installs fresh stats for the request; returns (stats, token) for reset_request_stats.
+    """
+    stats = RequestQueryStats(scope, track_shapes)
+    return stats, _current.set(stats)
+
+def reset_request_stats(token):
+    _current.reset(token)
+
+_route_paths = {}
+
+def route_label(scope: dict) -> str:
+    """
+    The matched route's path template (e.g. /api/v1/courses/{course_id}), so metric labels stay bounded.
+    """
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "unmatched"
+    path = _route_paths.get(endpoint)
+    if path is None:
+        for route in getattr(scope.get("app"), "routes", []):
+            if getattr(route, "endpoint", None) is not None:
+                _route_paths.setdefault(route.endpoint, route.path)
+        path = _route_paths.get(endpoint, "unmatched")
+    return path
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    if statement.startswith(_TRANSACTION_CONTROL):
+        return
+    started = getattr(context, "_query_started", None)
+    elapsed = time.perf_counter() - started if started is not None else 0.0
+    stats = _current.get()
+    route = stats.route if stats is not None else NO_ROUTE
+    if stats is not None:
+        stats.record_query(statement, elapsed)
+    DB_QUERIES.inc(route=route)
+    DB_QUERY_DURATION.observe(elapsed, route=route)
+    if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        logger.warning("Slow query (%.0fms) on %s: %s", elapsed * 1000, route, " ".join(statement.split())[:1000])
@@ -0,0 +1,152 @@
+import random
+
+class _Node:
+    __slots__ = ("key", "forward", "span")
+
+    def __init__(self, key, level: int):
+        self.key = key
+        self.forward = [None] * level
+        # span[i] = number of level-0 steps taken when following forward[i]
+        self.span = [0] * level
+
+class RankedSet:
+    """
+    Members ordered by descending score, backed by an indexable skip list (the structure
+    behind Redis sorted sets). update, remove, rank and the first step of top are O(log n).
+    Ties are broken by member so the order is deterministic.
+    """
+
+    MAX_LEVEL = 32
+    P = 0.25
+
+    def __init__(self):
+        self._head = _Node(None, self.MAX_LEVEL)
+        self._level = 1
+        self._size = 0
+        self._scores = {}
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, member):
+        return member in self._scores
+
+    def score(self, member):
+        return self._scores.get(member)
+
+    def items(self):
+        return list(self._scores.items())
+
+    @staticmethod
+    def _key(member, score):
+        return (-score, member)
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < self.MAX_LEVEL and random.random() < self.P:
+            level += 1
+        return level
+
+    def update(self, member, score: float):
+        current = self._scores.get(member)
+        if current == score:
+            return
+        if current is not None:
+            self._delete(self._key(member, current))
+        self._insert(self._key(member, score))
+        self._scores[member] = score
+
+    def remove(self, member):
+        current = self._scores.pop(member, None)
+        if current is not None:
+            self._delete(self._key(member, current))
+
+    def rank(self, member):
+        """
+        1-based position of the member (1 = highest score), or None if absent.
+        """
+        score = self._scores.get(member)
+        if score is None:
+            return None
+        key = self._key(member, score)
+        rank = 0
+        node = self._head
+        for i in reversed(range(self._level)):
+            while node.forward[i] is not None and node.forward[i].key <= key:
+                rank += node.span[i]
+                node = node.forward[i]
+            if node.key == key:
+                return rank
+        return None
+
+    def top(self, k: int, offset: int = 0):
+        """
+        [(member, score)] for ranks offset+1 .. offset+k.
+        """
+        if k <= 0 or offset >= self._size:
+            return []
+        # Descend to the node just before the requested offset using spans
+        node = self._head
+        traversed = 0
+        for i in reversed(range(self._level)):
+            while node.forward[i] is not None and traversed + node.span[i] <= offset:
+                traversed += node.span[i]
+                node = node.forward[i]
+        result = []
+        node = node.forward[0]
+        while node is not None and len(result) < k:
+            neg_score, member = node.key
+            result.append((member, -neg_score))
+            node = node.forward[0]
+        return result
+
+    def _insert(self, key):
+        update = [None] * self.MAX_LEVEL
+        rank = [0] * self.MAX_LEVEL
+        node = self._head
+        for i in reversed(range(self._level)):
+            rank[i] = 0 if i == self._level - 1 else rank[i + 1]
+            while node.forward[i] is not None and node.forward[i].key < key:
+                rank[i] += node.span[i]
+                node = node.forward[i]
+            update[i] = node
+
+        level = self._random_level()
+        if level > self._level:
+            for i in range(self._level, level):
+                rank[i] = 0
+                update[i] = self._head
+                self._head.span[i] = self._size
+            self._level = level
+
+        new_node = _Node(key, level)
+        for i in range(level):
+            new_node.forward[i] = update[i].forward[i]
+            update[i].forward[i] = new_node
+            new_node.span[i] = update[i].span[i] - (rank[0] - rank[i])
+            update[i].span[i] = (rank[0] - rank[i]) + 1
+
+        for i in range(level, self._level):
+            update[i].span[i] += 1
+        self._size += 1
+
+    def _delete(self, key):
+        update = [None] * self.MAX_LEVEL
+        node = self._head
+        for i in reversed(range(self._level)):
+            while node.forward[i] is not None and node.forward[i].key < key:
+                node = node.forward[i]
+            update[i] = node
+
+        target = node.forward[0]
+        if target is None or target.key != key:
+            return
+        for i in range(self._level):
+            if update[i].forward[i] is target:
+                update[i].span[i] += target.span[i] - 1
+                update[i].forward[i] = target.forward[i]
+            else:
+                update[i].span[i] -= 1
+        while self._level > 1 and self._head.forward[self._level - 1] is None:
+            self._level -= 1
+        self._size -= 1
@@ -0,0 +1,190 @@
+import math
+import time
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from fastapi import Depends, HTTPException, Request, Response
+from app.core.config import settings
+from app.core.metrics import RATE_LIMIT_REJECTIONS, RATE_LIMIT_BACKEND_ERRORS
+from app.core.query_stats import route_label
+from app.core.shared_store import get_redis_client
+from app.auth.dependencies import get_current_user
+from app.models.user import User
+
+logger = logging.getLogger("rate_limit")
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+class Rate:
+    """
+    A token bucket: bursts of up to `capacity` requests, refilled evenly over `period` seconds.
+    """
+
+    def __init__(self, capacity: int, period: float):
+        if capacity < 1 or period <= 0:
+            raise ValueError(
+                f"A rate limit must allow at least one request per period, got {capacity}/{period}s "
+                "(leave the class out of RATE_LIMITS to disable limiting)"
+            )
+        self.capacity = capacity
+        self.period = period
+        self.refill_per_second = capacity / period
+
+    @classmethod
+    def parse(cls, value: str) -> "Rate":
+        """
+        "20/minute" -> 20 requests per minute (second, minute, hour or day).
+        """
+        count, _, period = value.partition("/")
+        return cls(int(count), PERIODS[period.strip()])
+
+class BucketState:
+    __slots__ = ("allowed", "tokens")
+
+    def __init__(self, allowed: bool, tokens: float):
+        self.allowed = allowed
+        self.tokens = tokens
+
+class RateLimitStore(ABC):
+    """
+    Token buckets by key. take() refills the bucket for the time elapsed, then spends one token if it can.
+    """
+
+    @abstractmethod
+    def take(self, key: str, rate: Rate) -> BucketState:
+        ...
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """
+    Per-process buckets (each worker limits on its own). The least recently used buckets are
+    evicted past `max_keys`; an idle bucket has refilled anyway, so dropping it loses nothing.
+    """
+
+    def __init__(self, max_keys: int = 100_000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, rate):
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                tokens = float(rate.capacity)
+                if len(self._buckets) >= self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+                tokens = min(rate.capacity, bucket[0] + (now - bucket[1]) * rate.refill_per_second)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+        return BucketState(allowed, tokens)
+
+# Refill, spend and expire atomically, on Redis's clock so every worker agrees
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * refill)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / refill * 1000) + 1000)
+return {allowed, tostring(tokens)}
+"""
+
+class RedisRateLimitStore(RateLimitStore):
+    """
+    Buckets shared by every worker, one Redis hash per key; one round trip per check.
+    """
+
+    KEY_PREFIX = "ratelimit:"
+
+    def __init__(self, client):
+        self._take = client.register_script(_TAKE_SCRIPT)
+
+    def take(self, key, rate):
+        allowed, tokens = self._take(keys=[self.KEY_PREFIX + key], args=[rate.capacity, rate.refill_per_second])
+        return BucketState(bool(allowed), float(tokens))
+
+_store = None
+
+def get_rate_limit_store() -> RateLimitStore:
+    global _store
+    if _store is None:
+        if settings.RATE_LIMIT_BACKEND == "redis":
+            _store = RedisRateLimitStore(get_redis_client())
+        else:
+            _store = InMemoryRateLimitStore()
+    return _store
+
+_rates = {}
+
+def rate_for(route_class: str, role: str):
+    """
+    The configured Rate for the role (falling back to "default"), or None when unlimited.
+    """
+    key = (route_class, role)
+    if key not in _rates:
+        limits = settings.RATE_LIMITS.get(route_class, {})
+        value = limits.get(role, limits.get("default"))
+        _rates[key] = Rate.parse(value) if value else None
+    return _rates[key]
+
+def validate_rate_limits():
+    """
+    Parses every configured rate, so a bad RATE_LIMITS value fails at startup rather than on requests.
+    """
+    for route_class, limits in settings.RATE_LIMITS.items():
+        for role, value in limits.items():
+            try:
+                Rate.parse(value)
+            except (ValueError, KeyError) as e:
+                raise ValueError(f"Invalid RATE_LIMITS[{route_class!r}][{role!r}] = {value!r}: {e}") from e
+
+def rate_limit_headers(rate: Rate, state: BucketState) -> dict:
+    return {
+        "RateLimit-Limit": str(rate.capacity),
+        "RateLimit-Remaining": str(max(0, math.floor(state.tokens))),
+        # Seconds until the bucket is full again
+        "RateLimit-Reset": str(math.ceil((rate.capacity - state.tokens) / rate.refill_per_second)),
+        "RateLimit-Policy": f"{rate.capacity};w={math.ceil(rate.period)}",
+    }
+
+def rate_limit(route_class: str):
+    """
+    Route dependency enforcing the per-user token bucket of `route_class` (see RATE_LIMITS).
+    Each route has its own bucket, keyed on the route's path template and the authenticated
+    user's id; the class only sets the rate. Reuses the request's get_current_user result.
+
+        @router.post("/chat", dependencies=[Depends(rate_limit("ai"))])
+    """
+    def check(request: Request, response: Response, current_user: User = Depends(get_current_user)):
+        rate = rate_for(route_class, current_user.role)
+        if rate is None:
+            return
+        try:
+            state = get_rate_limit_store().take(f"{route_class}:{route_label(request.scope)}:{current_user.id}", rate)
+        except Exception as e:
+            # Fail open: a rate limiter outage must not take the limited routes down with it
+            RATE_LIMIT_BACKEND_ERRORS.inc(route_class=route_class)
+            logger.error("Rate limit check for %s failed, allowing the request: %s", route_class, e)
+            return
+        headers = rate_limit_headers(rate, state)
+        if not state.allowed:
+            RATE_LIMIT_REJECTIONS.inc(route_class=route_class, role=current_user.role)
+            headers["Retry-After"] = str(math.ceil((1 - state.tokens) / rate.refill_per_second))
+            raise HTTPException(status_code=429, detail="Rate limit exceeded, please slow down", headers=headers)
+        response.headers.update(headers)
+    return check
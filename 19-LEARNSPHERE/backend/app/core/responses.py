@@ -0,0 +1,62 @@
+import time
+import hashlib
+from decimal import Decimal
+import orjson
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from app.core.metrics import RESPONSE_SERIALIZE_DURATION
+from app.core.query_stats import current_query_stats, NO_ROUTE
+
+def _default(value):
+    # Types orjson doesn't handle natively (UUIDs, datetimes, enums and dataclasses it does)
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content) -> bytes:
+    """
+    Serializes `content` with orjson and records the time against the current request.
+    """
+    started = time.perf_counter()
+    body = orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    elapsed = time.perf_counter() - started
+    stats = current_query_stats()
+    if stats is not None:
+        stats.record_serialize(elapsed)
+    RESPONSE_SERIALIZE_DURATION.observe(elapsed, route=stats.route if stats is not None else NO_ROUTE)
+    return body
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON rendered by orjson; the app's default response class. Routes returning large row sets
+    build plain dicts from trusted query results and return this directly, which skips FastAPI's
+    jsonable_encoder pass and response_model re-validation (the model still documents the schema).
+    """
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+def etag_for(body: bytes) -> str:
+    # Weak: the compression middleware may re-encode the body
+    return 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def _etag_matches(header: str, etag: str) -> bool:
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in tags)
+
+def conditional_json_response(request: Request, content) -> Response:
+    """
+    JSON with an ETag of its body; 304 with no body when it matches the request's If-None-Match.
+    Saves the transfer and the client's re-render, not the work of building `content`.
+    """
+    body = dumps(content)
+    etag = etag_for(body)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
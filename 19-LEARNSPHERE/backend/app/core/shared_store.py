@@ -0,0 +1,16 @@
+from functools import lru_cache
+from app.core.config import settings
+
+@lru_cache(maxsize=1)
+def get_redis_client():
+    """
+    Lazily connects to the shared Redis store used by multi-worker deployments.
+    The redis package is only required when a shared backend is configured.
+    """
+    if not settings.REDIS_URL:
+        raise RuntimeError("A shared backend was selected but REDIS_URL is not configured")
+    try:
+        import redis
+    except ImportError as e:
+        raise RuntimeError("The redis package is required for shared backends: pip install redis") from e
+    return redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
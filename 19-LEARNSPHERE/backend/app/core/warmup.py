@@ -0,0 +1,65 @@
+import time
+import asyncio
+import logging
+
+logger = logging.getLogger("warmup")
+
+class WarmupTask:
+    def __init__(self, name: str, fn, critical: bool = False):
+        self.name = name
+        self.fn = fn
+        self.critical = critical
+
+class WarmupState:
+    """
+    Outcome of the concurrent warm-up run, as reported by the readiness endpoint.
+    A worker is ready once warm-up has finished and every critical task succeeded.
+    """
+
+    def __init__(self, process_started: float):
+        self.process_started = process_started
+        self.startup_seconds = None
+        self.finished = False
+        self.tasks = {}
+        self._critical = set()
+
+    @property
+    def ready(self) -> bool:
+        return self.finished and all(self.tasks[name]["status"] == "ok" for name in self._critical)
+
+    def succeeded(self, name: str) -> bool:
+        return self.tasks.get(name, {}).get("status") == "ok"
+
+    def report(self) -> dict:
+        return {
+            "status": "ready" if self.ready else ("degraded" if self.finished else "warming_up"),
+            "startup_seconds": self.startup_seconds,
+            "tasks": self.tasks
+        }
+
+    async def _run_task(self, task: WarmupTask):
+        started = time.monotonic()
+        try:
+            await asyncio.to_thread(task.fn)
+            self.tasks[task.name] = {"status": "ok"}
+        except Exception as e:
+            logger.error("Warm-up task %s failed: %s", task.name, e)
+            self.tasks[task.name] = {"status": "failed", "error": str(e)}
+        self.tasks[task.name]["seconds"] = round(time.monotonic() - started, 3)
+
+    async def run(self, tasks: list):
+        """
+        Runs every task concurrently on worker threads; failures are recorded, never raised.
+        """
+        for task in tasks:
+            self.tasks[task.name] = {"status": "pending"}
+            if task.critical:
+                self._critical.add(task.name)
+        await asyncio.gather(*(self._run_task(task) for task in tasks))
+        self.finished = True
+        self.startup_seconds = round(time.monotonic() - self.process_started, 3)
+        logger.info(
+            "Startup complete in %.2fs (%s)",
+            self.startup_seconds,
+            ", ".join(f"{name} {result['status']} {result['seconds']}s" for name, result in self.tasks.items())
+        )
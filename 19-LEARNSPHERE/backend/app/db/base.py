@@ -8,3 +8,5 @@ from app.models.progress import LessonProgress
 from app.models.ai_conversation import AIConversation
 from app.models.profile import UserProfile
 from app.models.tracking import LearningSession, QuizAttempt, UserActivityLog, PerformanceAnalysis
+from app.models.mastery import LessonMastery
+from app.models.review import ReviewItem
@@ -0,0 +1,28 @@
+import logging
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.db.base import Base
+from app.models.mastery import LessonMastery
+from app.services.search_service import ensure_search_schema
+from app.services.mastery_service import backfill_lesson_mastery
+
+logger = logging.getLogger("db_migrate")
+
+def run_migrations(engine):
+    """
+    Creates missing tables and the Postgres search columns/indexes. Idempotent.
+    Run once per deploy (migrate.py), not by every worker on boot.
+    """
+    Base.metadata.create_all(bind=engine)
+    # create_all only adds indexes along with new tables; this one came after users
+    with engine.begin() as connection:
+        connection.execute(text("CREATE INDEX IF NOT EXISTS ix_users_email_lower ON users (lower(email))"))
+    ensure_search_schema(engine)
+    with Session(bind=engine) as db:
+        # One-off: derive lesson_mastery from the quiz history it was introduced after.
+        # Rerun backfill_mastery.py if rows were written before this step ran
+        if db.query(LessonMastery.id).first() is None:
+            written = backfill_lesson_mastery(db)
+            if written:
+                logger.info("Backfilled %d lesson mastery rows from quiz attempts", written)
+    logger.info("Schema is up to date")
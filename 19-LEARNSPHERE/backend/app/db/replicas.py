@@ -0,0 +1,193 @@
+import os
+import time
+import logging
+import itertools
+import threading
+from abc import ABC, abstractmethod
+from fastapi import Depends
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.config import settings
+from app.core.cache import TTLCache
+from app.core.shared_store import get_redis_client
+from app.db.session import SessionLocal, get_db
+from app.models.user import User
+from app.auth.dependencies import get_current_user
+
+logger = logging.getLogger("db_replicas")
+
+class ReplicaSet:
+    """
+    Round-robin over read replicas. A replica that fails a connection check is skipped
+    for REPLICA_RETRY_SECONDS, then tried again.
+    """
+
+    def __init__(self, urls):
+        self.pid = os.getpid()
+        self.engines = [create_engine(url, pool_pre_ping=True, future=True) for url in urls]
+        self.sessionmakers = [sessionmaker(autocommit=False, autoflush=False, bind=engine) for engine in self.engines]
+        self._down_until = [0.0] * len(self.engines)
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def candidates(self) -> list:
+        """
+        Healthy replica indexes, starting from the next one in round-robin order.
+        """
+        if not self.engines:
+            return []
+        start = next(self._counter) % len(self.engines)
+        now = time.monotonic()
+        order = [(start + i) % len(self.engines) for i in range(len(self.engines))]
+        with self._lock:
+            return [i for i in order if self._down_until[i] <= now]
+
+    def mark_down(self, index: int):
+        with self._lock:
+            self._down_until[index] = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+        logger.warning("Read replica %d failed its connection check; routing around it", index)
+
+    def open_session(self):
+        """
+        A session on the first replica that accepts a connection, or None if none do.
+        """
+        for index in self.candidates():
+            session = self.sessionmakers[index]()
+            try:
+                # Check out now (pool_pre_ping validates it) so failures surface before the route runs
+                session.connection()
+                return session
+            except OperationalError:
+                session.close()
+                self.mark_down(index)
+        return None
+
+def _replica_urls() -> list:
+    return [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
+_replicas = None
+_replicas_lock = threading.Lock()
+
+def get_replicas() -> ReplicaSet:
+    """
+    Created on first use in each worker process, like the primary engine.
+    """
+    global _replicas
+    if _replicas is None or _replicas.pid != os.getpid():
+        with _replicas_lock:
+            if _replicas is None or _replicas.pid != os.getpid():
+                _replicas = ReplicaSet(_replica_urls())
+    return _replicas
+
+def dispose_replicas():
+    global _replicas
+    with _replicas_lock:
+        if _replicas is not None and _replicas.pid == os.getpid():
+            for engine in _replicas.engines:
+                engine.dispose()
+        _replicas = None
+
+class RecentWriters(ABC):
+    """
+    Users who committed in the last REPLICA_STICKY_SECONDS. They read from the primary until
+    the replicas have caught up with their write.
+    """
+
+    @abstractmethod
+    def mark(self, user_id):
+        ...
+
+    @abstractmethod
+    def contains(self, user_id) -> bool:
+        ...
+
+class InMemoryRecentWriters(RecentWriters):
+    """
+    Per-process markers: only the worker that took the write sends the user to the primary.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self._cache = TTLCache("recent_writers", ttl_seconds=ttl_seconds, maxsize=100000)
+
+    def mark(self, user_id):
+        self._cache.set(str(user_id), True)
+
+    def contains(self, user_id):
+        return bool(self._cache.get(str(user_id)))
+
+    def clear(self):
+        self._cache.clear()
+
+class RedisRecentWriters(RecentWriters):
+    """
+    Markers every worker sees, one expiring Redis key per user. If Redis can't be reached the
+    user reads from the primary, which is always up to date.
+    """
+
+    KEY_PREFIX = "recent_writer:"
+
+    def __init__(self, client, ttl_seconds: float):
+        self._redis = client
+        self.ttl_ms = max(1, int(ttl_seconds * 1000))
+
+    def mark(self, user_id):
+        try:
+            self._redis.set(self.KEY_PREFIX + str(user_id), 1, px=self.ttl_ms)
+        except Exception as e:
+            logger.error("Could not record a recent write for %s: %s", user_id, e)
+
+    def contains(self, user_id):
+        try:
+            return bool(self._redis.exists(self.KEY_PREFIX + str(user_id)))
+        except Exception as e:
+            logger.error("Could not check recent writes for %s, reading from the primary: %s", user_id, e)
+            return True
+
+_recent_writers = None
+
+def get_recent_writers() -> RecentWriters:
+    global _recent_writers
+    if _recent_writers is None:
+        if settings.REPLICA_STICKY_BACKEND == "redis":
+            _recent_writers = RedisRecentWriters(get_redis_client(), settings.REPLICA_STICKY_SECONDS)
+        else:
+            _recent_writers = InMemoryRecentWriters(settings.REPLICA_STICKY_SECONDS)
+    return _recent_writers
+
+@event.listens_for(SessionLocal, "after_commit")
+def _remember_writer(session):
+    user_id = session.info.get("user_id")
+    if user_id is not None and settings.DATABASE_REPLICA_URLS:
+        get_recent_writers().mark(user_id)
+
+def open_read_session(user_id) -> Session:
+    """
+    A new session for reads made off the request's own session (e.g. queries run in parallel):
+    a healthy replica under the same rules as get_read_db, otherwise the primary. The caller closes it.
+    """
+    replicas = get_replicas()
+    if replicas.engines and not get_recent_writers().contains(user_id):
+        replica_db = replicas.open_session()
+        if replica_db is not None:
+            return replica_db
+    return SessionLocal()
+
+def get_read_db(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    """
+    Session for read-only endpoints. Routes to a healthy replica when one is configured,
+    otherwise (or within REPLICA_STICKY_SECONDS of this user's last write) reuses the request's
+    primary session.
+    """
+    replicas = get_replicas()
+    if not replicas.engines or get_recent_writers().contains(current_user.id):
+        yield db
+        return
+    replica_db = replicas.open_session()
+    if replica_db is None:
+        yield db
+        return
+    try:
+        yield replica_db
+    finally:
+        replica_db.close()
@@ -1,31 +1,100 @@
+import os
 import logging
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.orm import sessionmaker, Session
 from app.core.config import settings
 
-# Configure minimal logger
 logger = logging.getLogger("db_setup")
-logging.basicConfig(level=logging.INFO)
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    future=True
-)
+_engine = None
+_engine_pid = None
+_engine_lock = threading.Lock()
+
+def create_sqlite_engine(url: str):
+    """
+    SQLite engine for test and bench runs. An in-memory database lives in one shared connection
+    so every thread sees the same data, and transactions start with an explicit BEGIN because
+    pysqlite's own transaction handling breaks SAVEPOINTs.
+    """
+    options = {"connect_args": {"check_same_thread": False}}
+    if make_url(url).database in (None, "", ":memory:"):
+        options["poolclass"] = StaticPool
+    engine = create_engine(url, future=True, **options)
+
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+    return engine
+
+def get_engine():
+    """
+    The process's engine, created on first use. A forked worker gets its own engine
+    (and pool) instead of sharing the parent's connections.
+    """
+    global _engine, _engine_pid
+    if _engine is None or _engine_pid != os.getpid():
+        with _engine_lock:
+            if _engine is None or _engine_pid != os.getpid():
+                if _engine is not None:
+                    # Inherited from the parent: drop the pool without closing the parent's sockets
+                    _engine.dispose(close=False)
+                if settings.DATABASE_URL.startswith("sqlite"):
+                    _engine = create_sqlite_engine(settings.DATABASE_URL)
+                else:
+                    _engine = create_engine(
+                        settings.DATABASE_URL,
+                        pool_pre_ping=True,
+                        future=True
+                    )
+                _engine_pid = os.getpid()
+    return _engine
+
+def dispose_engine():
+    global _engine
+    with _engine_lock:
+        if _engine is not None and _engine_pid == os.getpid():
+            _engine.dispose()
+        _engine = None
+
+def prefill_pool(connections: int):
+    """
+    Opens up to `connections` pooled connections at once so the first requests don't pay for connects.
+    """
+    engine = get_engine()
+    size = min(connections, engine.pool.size()) if hasattr(engine.pool, "size") else 1
+    if size <= 0:
+        return
+    with ThreadPoolExecutor(max_workers=size) as executor:
+        opened = list(executor.map(lambda _: engine.connect(), range(size)))
+    for connection in opened:
+        try:
+            connection.execute(text("SELECT 1"))
+        finally:
+            connection.close()
+
+class LazySession(Session):
+    """
+    Binds to get_engine() at first use, so importing this module never connects.
+    """
 
-# Safe Connectivity Test
-try:
-    with engine.connect() as connection:
-        connection.execute(text("SELECT 1"))
-        logger.info("Database connection successful")
-except Exception as e:
-    logger.error("Database connection failed. Please ensure DATABASE_URL in .env is correct.")
-    # Do not log `e` if it might reveal connection credentials, or log securely
+    def get_bind(self, *args, **kwargs):
+        if self.bind is None:
+            return get_engine()
+        return super().get_bind(*args, **kwargs)
 
 SessionLocal = sessionmaker(
+    class_=LazySession,
     autocommit=False,
-    autoflush=False,
-    bind=engine
+    autoflush=False
 )
 
 def get_db():
@@ -0,0 +1,31 @@
+from sqlalchemy import JSON, Uuid
+from sqlalchemy.types import TypeDecorator
+from sqlalchemy.dialects import postgresql
+
+class GUID(TypeDecorator):
+    """
+    UUID column: native UUID on Postgres, CHAR(32) hex elsewhere (SQLite test and bench runs).
+    Values are uuid.UUID objects on both.
+    """
+    impl = Uuid
+    cache_ok = True
+
+    def __init__(self):
+        super().__init__(as_uuid=True)
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        return dialect.type_descriptor(Uuid(as_uuid=True, native_uuid=False))
+
+class JSONType(TypeDecorator):
+    """
+    JSON document column: JSONB on Postgres, JSON (stored as text) elsewhere.
+    """
+    impl = JSON
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.JSONB())
+        return dialect.type_descriptor(JSON())
@@ -1,23 +1,84 @@
+import time
+
+# Measured from import so the reported startup time covers module loading too
+PROCESS_STARTED = time.monotonic()
+
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from app.core.config import settings
 from app.routers import ai
 
-# Import Base and engine for table creation
-from app.db.base import Base
-from app.db.session import engine
+from app.db.session import get_engine, dispose_engine, prefill_pool
+from app.db.replicas import dispose_replicas
+from app.db.migrate import run_migrations
+from app.auth.jwt import get_jwks
+from app.core.warmup import WarmupState, WarmupTask
+from app.services.leaderboard_service import init_leaderboards, shutdown_leaderboards
+from app.services.course_recommendation_service import get_course_embeddings
+from app.core.invalidation import start_invalidation_listener, stop_invalidation_listener
+from app.services.activity_log_service import start_activity_log_buffer, stop_activity_log_buffer
+from app.core.instrumentation import RequestMetricsMiddleware
+from app.core.metrics import render_metrics
+from app.core.compression import CompressionMiddleware
+from app.core.admission import AdmissionControlMiddleware
+from app.core.rate_limit import validate_rate_limits
+from app.core.responses import FastJSONResponse
 
 import logging
 
-logging.basicConfig(level=logging.DEBUG)
+logging.basicConfig(level=settings.LOG_LEVEL)
+# httpx logs every upstream request at INFO
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# A misconfigured rate limit fails the boot, not every limited request
+validate_rate_limits()
 
-# Note: For production, it is typically better to use Alembic for DB migrations.
+# Schema changes run separately via migrate.py (set RUN_MIGRATIONS_ON_STARTUP for local dev).
+# Nothing connects at import time, so each forked worker builds its own engine and pool.
+warmup = WarmupState(PROCESS_STARTED)
+
+def warmup_tasks() -> list:
+    return [
+        WarmupTask("database", lambda: prefill_pool(settings.DB_POOL_PREFILL), critical=True),
+        WarmupTask("jwks", get_jwks),
+        WarmupTask("leaderboards", init_leaderboards),
+        WarmupTask("invalidation_listener", lambda: start_invalidation_listener(get_engine())),
+        WarmupTask("recommender", get_course_embeddings),
+    ]
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.RUN_MIGRATIONS_ON_STARTUP:
+        await run_in_threadpool(run_migrations, get_engine())
+    start_activity_log_buffer()
+    # Serve liveness right away; readiness flips once warm-up finishes
+    warmup_run = asyncio.create_task(warmup.run(warmup_tasks()))
+    yield
+    await warmup_run
+    # Write out buffered activity logs while the engine is still up
+    await run_in_threadpool(stop_activity_log_buffer)
+    if warmup.succeeded("leaderboards"):
+        # Only snapshot boards that were actually loaded, never an empty set over a good snapshot
+        await run_in_threadpool(shutdown_leaderboards)
+    await run_in_threadpool(stop_invalidation_listener)
+    dispose_replicas()
+    dispose_engine()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
 )
 
+# Innermost, so shed requests still get CORS headers and show up in the request metrics
+if settings.ADMISSION_CONTROL:
+    app.add_middleware(AdmissionControlMiddleware, retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS)
+
 # CORS Configuration
 app.add_middleware(
     CORSMiddleware,
@@ -30,22 +91,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.on_event("startup")
-def startup():
-    print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
-    print("Database tables created successfully")
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_BYTES)
+
+app.add_middleware(
+    RequestMetricsMiddleware,
+    query_count_header=settings.QUERY_COUNT_HEADER,
+    server_timing_header=settings.SERVER_TIMING_HEADER
+)
 
 # Include Routers
 app.include_router(ai.router, prefix=settings.API_V1_STR)
-from app.routers import auth, courses, dashboard, profile, enrollments, tracking
+from app.routers import auth, courses, dashboard, profile, enrollments, tracking, leaderboards, recommendations, reviews, search, home
 app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
 app.include_router(profile.router, prefix=f"{settings.API_V1_STR}/profile", tags=["profile"])
 app.include_router(courses.router, prefix=f"{settings.API_V1_STR}/courses", tags=["courses"])
 app.include_router(enrollments.router, prefix=f"{settings.API_V1_STR}/enrollments", tags=["enrollments"])
 app.include_router(tracking.router, prefix=f"{settings.API_V1_STR}", tags=["tracking"])
 app.include_router(dashboard.router, prefix=f"{settings.API_V1_STR}/dashboard", tags=["dashboard"])
+app.include_router(leaderboards.router, prefix=f"{settings.API_V1_STR}/courses", tags=["leaderboards"])
+app.include_router(recommendations.router, prefix=f"{settings.API_V1_STR}/recommendations", tags=["recommendations"])
+app.include_router(reviews.router, prefix=f"{settings.API_V1_STR}/reviews", tags=["reviews"])
+app.include_router(search.router, prefix=f"{settings.API_V1_STR}/search", tags=["search"])
+app.include_router(home.router, prefix=f"{settings.API_V1_STR}/home", tags=["home"])
 
 @app.get("/health")
 def health_check():
     return {"status": "ok", "message": "LearnSphere Backend is actively running"}
+
+@app.get("/health/live")
+def liveness():
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+def readiness():
+    return JSONResponse(status_code=200 if warmup.ready else 503, content=warmup.report())
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,26 @@
+import uuid
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, UniqueConstraint, Index
+from app.db.types import GUID
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class LessonMastery(Base):
+    __tablename__ = "lesson_mastery"
+
+    id = Column(GUID(), primary_key=True, default=uuid.uuid4)
+    user_id = Column(GUID(), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    lesson_id = Column(GUID(), ForeignKey("lessons.id", ondelete="CASCADE"), nullable=False)
+    course_id = Column(GUID(), ForeignKey("courses.id", ondelete="CASCADE"), index=True, nullable=False)
+
+    attempt_count = Column(Integer, default=0, nullable=False)
+    ewma_score = Column(Float, default=0.0, nullable=False) # Exponentially weighted quiz score (0-100)
+    last_score = Column(Integer, default=0)
+    last_attempt_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "lesson_id"),
+        # Weak / strong topics are top-k reads ordered by score within one user
+        Index("ix_lesson_mastery_user_score", "user_id", "ewma_score"),
+        # "What to review" lists are ordered by how long ago the lesson was attempted
+        Index("ix_lesson_mastery_user_last_attempt", "user_id", "last_attempt_at"),
+    )
@@ -1,12 +1,12 @@
 from sqlalchemy import Column, String, Text, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from app.db.types import GUID
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 
 class UserProfile(Base):
     __tablename__ = "user_profiles"
 
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(GUID(), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
     display_name = Column(String(255))
     avatar_url = Column(Text)
     bio = Column(Text)
@@ -1,6 +1,6 @@
 import uuid
 from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
-from sqlalchemy.dialects.postgresql import UUID
+from app.db.types import GUID
 from sqlalchemy import Enum
 from sqlalchemy.sql import func
 from app.db.base_class import Base
@@ -9,9 +9,9 @@ from app.models.enums import ProgressStatus
 class LessonProgress(Base):
     __tablename__ = "lesson_progress"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    lesson_id = Column(UUID(as_uuid=True), ForeignKey("lessons.id", ondelete="CASCADE"), index=True)
-    learner_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    id = Column(GUID(), primary_key=True, default=uuid.uuid4)
+    lesson_id = Column(GUID(), ForeignKey("lessons.id", ondelete="CASCADE"), index=True)
+    learner_id = Column(GUID(), ForeignKey("users.id", ondelete="CASCADE"), index=True)
     status = Column(Enum(ProgressStatus, name="progress_status", create_type=True), default=ProgressStatus.not_started, nullable=False)
     progress_percent = Column(Integer, default=0)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
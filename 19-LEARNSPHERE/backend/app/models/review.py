@@ -0,0 +1,26 @@
+import uuid
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, UniqueConstraint, Index
+from app.db.types import GUID
+from app.db.base_class import Base
+
+class ReviewItem(Base):
+    __tablename__ = "review_items"
+
+    id = Column(GUID(), primary_key=True, default=uuid.uuid4)
+    user_id = Column(GUID(), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    lesson_id = Column(GUID(), ForeignKey("lessons.id", ondelete="CASCADE"), nullable=False)
+    course_id = Column(GUID(), ForeignKey("courses.id", ondelete="CASCADE"), index=True, nullable=False)
+
+    # SM-2 scheduling state
+    ease = Column(Float, default=2.5, nullable=False)
+    interval_days = Column(Float, default=0.0, nullable=False)
+    repetitions = Column(Integer, default=0, nullable=False)
+    last_score = Column(Integer, default=0)
+    last_reviewed_at = Column(DateTime(timezone=True), nullable=True)
+    due_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "lesson_id"),
+        # "Due now" is a range scan on (user_id, due_at)
+        Index("ix_review_items_user_due", "user_id", "due_at"),
+    )
@@ -5,10 +5,13 @@ from app.auth.dependencies import get_current_user
 from app.models.user import User
 from app.db.session import get_db
 from app.services.ai_service import handle_ai_chat
+from app.core.query_budget import query_budget
+from app.core.rate_limit import rate_limit
 
 router = APIRouter(prefix="/ai", tags=["AI Personalized Chat"])
 
-@router.post("/chat", response_model=ChatResponse)
+@router.post("/chat", response_model=ChatResponse, dependencies=[Depends(rate_limit("ai"))])
+@query_budget(11)
 async def chat_with_ai(
     request: ChatRequest,
     current_user: User = Depends(get_current_user),
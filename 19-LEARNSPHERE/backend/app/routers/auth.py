@@ -4,6 +4,7 @@ from pydantic import BaseModel
 from app.auth.dependencies import get_current_user, ADMIN_EMAIL
 from app.db.session import get_db
 from app.models.user import User
+from app.core.query_budget import query_budget
 
 router = APIRouter()
 
@@ -11,6 +12,7 @@ class RegisterProfileRequest(BaseModel):
     role: str
 
 @router.post("/register-profile")
+@query_budget(3)
 def register_profile(
     request: RegisterProfileRequest, 
     current_user: User = Depends(get_current_user),
@@ -1,16 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+import json
 from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
 import uuid
 from datetime import datetime
 
-from app.db.session import get_db
+from app.db.session import get_db, SessionLocal
+from app.db.replicas import get_read_db
 from app.models.user import User
 from app.models.course import Course, Enrollment
 from app.models.enums import CourseStatus
 from app.models.lesson import Lesson
 from app.auth.dependencies import get_current_user
+from app.services.leaderboard_service import record_leaderboard_completion
+from app.services.enrollment_service import bulk_enroll
+from app.services.search_service import reindex_course
+from app.core.events import publish_event
+from app.core.invalidation import publish_invalidation, COURSE_EDITED, COURSE_ACTIVITY, LEARNER_PROGRESS_CHANGED
+from app.services.course_bundle_service import parse_bundle, import_bundle, export_bundle, BUNDLE_MEDIA_TYPE
+from app.core.query_budget import query_budget
+from app.core.responses import FastJSONResponse
 
 router = APIRouter()
 
@@ -19,14 +31,19 @@ class CourseCreate(BaseModel):
     description: Optional[str] = None
 
 class CourseResponse(BaseModel):
-    id: str
+    id: uuid.UUID
     course_name: str
     description: Optional[str] = None
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
 
+class BulkEnrollRequest(BaseModel):
+    learner_ids: List[uuid.UUID] = []
+    emails: List[str] = []
+
 @router.post("", response_model=CourseResponse)
+@query_budget(5)
 def create_course(req: CourseCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     try:
         if current_user.role not in ["instructor", "admin"]:
@@ -40,6 +57,7 @@ def create_course(req: CourseCreate, current_user: User = Depends(get_current_us
         db.add(course)
         db.commit()
         db.refresh(course)
+        reindex_course(db, course.id)
         print("COURSE CREATED:", course.id)
         return course
     except Exception as e:
@@ -47,7 +65,36 @@ def create_course(req: CourseCreate, current_user: User = Depends(get_current_us
         print("COURSE CREATE ERROR:", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/import")
+@query_budget(6)
+async def import_course(request: Request, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    """
+    Creates a course and its lessons from an NDJSON bundle (see course_bundle_service).
+    The body is validated line by line as it streams in; any bad line rejects the whole bundle.
+    """
+    if current_user.role not in ["instructor", "admin"]:
+        raise HTTPException(status_code=403, detail="Only instructors and Admin can import courses")
+
+    bundle = await parse_bundle(request.stream())
+    if bundle.error_count:
+        raise HTTPException(status_code=422, detail={"error_count": bundle.error_count, "errors": bundle.errors})
+
+    try:
+        course = await run_in_threadpool(import_bundle, db, current_user.id, bundle)
+        await run_in_threadpool(reindex_course, db, course.id)
+        return {
+            "success": True,
+            "course_id": course.id,
+            "course_name": course.course_name,
+            "lessons": len(bundle.lessons)
+        }
+    except Exception as e:
+        db.rollback()
+        print("ERROR in import_course:", str(e))
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.put("/{course_id}", response_model=CourseResponse)
+@query_budget(7)
 def edit_course(course_id: uuid.UUID, req: CourseCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     try:
         course = db.query(Course).filter(Course.id == course_id).first()
@@ -60,9 +107,11 @@ def edit_course(course_id: uuid.UUID, req: CourseCreate, current_user: User = De
         course.course_name = req.course_name
         if req.description is not None:
             course.description = req.description
+        publish_invalidation(db, COURSE_EDITED, course.id)
             
         db.commit()
         db.refresh(course)
+        reindex_course(db, course.id)
         return course
     except Exception as e:
         db.rollback()
@@ -70,35 +119,41 @@ def edit_course(course_id: uuid.UUID, req: CourseCreate, current_user: User = De
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/my-courses")
-def my_courses(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+@query_budget(2)
+def my_courses(current_user: User = Depends(get_current_user), db: Session = Depends(get_read_db)):
     try:
         if current_user.role != "learner":
             raise HTTPException(status_code=403, detail="Only learners have enrolled courses")
             
         results = (
-            db.query(Course, Enrollment)
+            db.query(
+                Course.id, Course.course_name, Course.description,
+                Enrollment.id, Enrollment.progress_percent, Enrollment.status
+            )
             .join(Enrollment, Course.id == Enrollment.course_id)
             .filter(Enrollment.learner_id == current_user.id)
             .all()
         )
         
-        return [
+        # Plain rows straight to the encoder: no ORM objects, no jsonable_encoder pass
+        return FastJSONResponse([
             {
-                "course_id": course.id,
-                "course_name": course.course_name,
-                "description": course.description,
-                "enrollment_id": enrollment.id,
-                "progress_percent": enrollment.progress_percent,
-                "status": enrollment.status
+                "course_id": course_id,
+                "course_name": course_name,
+                "description": description,
+                "enrollment_id": enrollment_id,
+                "progress_percent": progress_percent,
+                "status": status
             }
-            for course, enrollment in results
-        ]
+            for course_id, course_name, description, enrollment_id, progress_percent, status in results
+        ])
     except Exception as e:
         print("ERROR in my_courses:", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{course_id}", response_model=CourseResponse)
-def get_course(course_id: uuid.UUID, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+@query_budget(2)
+def get_course(course_id: uuid.UUID, current_user: User = Depends(get_current_user), db: Session = Depends(get_read_db)):
     try:
         course = db.query(Course).filter(Course.id == course_id).first()
         if not course:
@@ -109,14 +164,21 @@ def get_course(course_id: uuid.UUID, current_user: User = Depends(get_current_us
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("", response_model=List[CourseResponse])
-def list_courses(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+@query_budget(2)
+def list_courses(current_user: User = Depends(get_current_user), db: Session = Depends(get_read_db)):
     try:
-        return db.query(Course).all()
+        # Rows are already in CourseResponse's shape; returning the response skips re-validating each one
+        rows = db.query(Course.id, Course.course_name, Course.description, Course.created_at).all()
+        return FastJSONResponse([
+            {"id": course_id, "course_name": course_name, "description": description, "created_at": created_at}
+            for course_id, course_name, description, created_at in rows
+        ])
     except Exception as e:
         print("ERROR in list_courses:", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/{course_id}/enroll")
+@query_budget(8)
 def enroll_course(course_id: uuid.UUID, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     try:
         if current_user.role != "learner":
@@ -142,8 +204,15 @@ def enroll_course(course_id: uuid.UUID, current_user: User = Depends(get_current
         )
         
         db.add(enrollment)
+        publish_invalidation(db, COURSE_ACTIVITY, course_id)
+        publish_invalidation(db, LEARNER_PROGRESS_CHANGED, current_user.id)
         db.commit()
         db.refresh(enrollment)
+        record_leaderboard_completion(current_user.id, course_id, enrollment.progress_percent)
+        publish_event(
+            course_id, "enrollment_created",
+            learner_id=current_user.id, status=enrollment.status, progress_percent=enrollment.progress_percent
+        )
         
         return {
             "success": True,
@@ -155,4 +224,76 @@ def enroll_course(course_id: uuid.UUID, current_user: User = Depends(get_current
         print("ERROR in enroll_course:", str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/{course_id}/enroll/bulk")
+@query_budget(None, max_repeats=50)
+def bulk_enroll_course(
+    course_id: uuid.UUID,
+    req: BulkEnrollRequest,
+    stream: bool = Query(False, description="Stream NDJSON progress lines instead of a single summary"),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Enrolls a whole class by learner id and/or email in one transaction.
+    Already-enrolled users and non-learners are skipped; unknown identifiers are reported as not found.
+    """
+    if current_user.role not in ["instructor", "admin"]:
+        raise HTTPException(status_code=403, detail="Only instructors and Admin can bulk enroll")
+
+    course = db.query(Course).filter(Course.id == course_id).first()
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    if current_user.role != "admin" and course.created_by != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to enroll learners in this course")
+
+    if not stream:
+        try:
+            summary = None
+            for summary in bulk_enroll(db, course_id, req.learner_ids, req.emails):
+                pass
+            summary.pop("done")
+            return {"success": True, **summary}
+        except Exception as e:
+            db.rollback()
+            print("ERROR in bulk_enroll_course:", str(e))
+            raise HTTPException(status_code=500, detail=str(e))
+
+    # The request session is closed before the body streams, so the generator owns its own
+    def progress_lines():
+        stream_db = SessionLocal()
+        try:
+            for update in bulk_enroll(stream_db, course_id, req.learner_ids, req.emails):
+                yield json.dumps(update) + "\n"
+        except Exception as e:
+            stream_db.rollback()
+            print("ERROR in bulk_enroll_course:", str(e))
+            yield json.dumps({"done": True, "error": str(e)}) + "\n"
+        finally:
+            stream_db.close()
+
+    return StreamingResponse(progress_lines(), media_type="application/x-ndjson")
+
+@router.get("/{course_id}/export")
+@query_budget(4)
+def export_course(course_id: uuid.UUID, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    """
+    Streams the course back out in the import bundle format.
+    """
+    course = db.query(Course).filter(Course.id == course_id).first()
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    if current_user.role != "admin" and course.created_by != current_user.id:
+        raise HTTPException(status_code=403, detail="You do not have permission to export this course")
+
+    def bundle_lines():
+        stream_db = SessionLocal()
+        try:
+            yield from export_bundle(stream_db, course_id)
+        finally:
+            stream_db.close()
 
+    return StreamingResponse(
+        bundle_lines(),
+        media_type=BUNDLE_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="course-{course_id}.ndjson"'}
+    )
@@ -1,71 +1,193 @@
-from fastapi import APIRouter, Depends, HTTPException
+import uuid
+import json
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.db.session import get_db
+from app.db.replicas import get_read_db
 from app.models.user import User
+from app.models.profile import UserProfile
 from app.models.course import Course, Enrollment
 from app.models.lesson import Lesson
 from app.models.progress import LessonProgress
 from app.models.enums import CourseStatus
 from app.auth.dependencies import get_current_user
+from app.services.cohort_service import get_cohort_analytics
+from app.services.funnel_service import get_lesson_funnel
+from app.core.events import event_bus, ALL_COURSES
+from app.core.query_budget import query_budget
+from app.core.responses import FastJSONResponse
+
+STREAM_HEARTBEAT_SECONDS = 15
 
 router = APIRouter()
 
 @router.get("/metrics")
-def get_metrics(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+@query_budget(2)
+def get_metrics(current_user: User = Depends(get_current_user), db: Session = Depends(get_read_db)):
     if current_user.role == "learner":
         raise HTTPException(status_code=403, detail="Learners cannot view dashboard metrics")
 
-    # Get relevant courses
-    if current_user.role == "admin":
-        courses = db.query(Course).all()
-    else:
-        courses = db.query(Course).filter(Course.created_by == current_user.id).all()
-        
-    course_ids = [c.id for c in courses]
-    
-    # Get enrollments for these courses
-    enrollments = db.query(Enrollment).filter(Enrollment.course_id.in_(course_ids)).all()
+    # Count enrollments per status in the database rather than loading every row
+    query = db.query(Enrollment.status, func.count(Enrollment.id)).group_by(Enrollment.status)
+    if current_user.role != "admin":
+        query = query.join(Course, Course.id == Enrollment.course_id).filter(Course.created_by == current_user.id)
+    counts = dict(query.all())
     
     metrics = {
-        "total_participants": len(enrollments),
-        "yet_to_start": sum(1 for e in enrollments if e.status == CourseStatus.NOT_STARTED),
-        "in_progress": sum(1 for e in enrollments if e.status == CourseStatus.IN_PROGRESS),
-        "completed": sum(1 for e in enrollments if e.status == CourseStatus.COMPLETED)
+        "total_participants": sum(counts.values()),
+        "yet_to_start": counts.get(CourseStatus.NOT_STARTED, 0),
+        "in_progress": counts.get(CourseStatus.IN_PROGRESS, 0),
+        "completed": counts.get(CourseStatus.COMPLETED, 0)
     }
             
     return metrics
 
 @router.get("/learner-progress")
-def get_learner_progress(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+@query_budget(2)
+def get_learner_progress(current_user: User = Depends(get_current_user), db: Session = Depends(get_read_db)):
     if current_user.role == "learner":
         raise HTTPException(status_code=403, detail="Learners cannot view learner progress table")
         
-    if current_user.role == "admin":
-        courses = db.query(Course).all()
-    else:
-        courses = db.query(Course).filter(Course.created_by == current_user.id).all()
-        
-    course_ids = [c.id for c in courses]
-    enrollments = db.query(Enrollment).filter(Enrollment.course_id.in_(course_ids)).all()
+    # One joined read instead of a user, profile and course lookup per enrollment
+    query = (
+        db.query(
+            Enrollment.enrolled_at, Enrollment.progress_percent, Enrollment.status,
+            User.email, UserProfile.display_name, Course.course_name
+        )
+        .join(User, User.id == Enrollment.learner_id)
+        .outerjoin(UserProfile, UserProfile.user_id == Enrollment.learner_id)
+        .join(Course, Course.id == Enrollment.course_id)
+    )
+    if current_user.role != "admin":
+        query = query.filter(Course.created_by == current_user.id)
     
     result = []
     
-    for enrollment in enrollments:
-        learner = db.query(User).filter(User.id == enrollment.learner_id).first()
-        course = db.query(Course).filter(Course.id == enrollment.course_id).first()
-        
-        if not learner or not course:
-            continue
-            
+    for enrolled_at, progress_percent, status, learner_email, display_name, course_name in query.all():
+        enrolled_date = enrolled_at.isoformat() if enrolled_at else None
         result.append({
-            "course_name": course.title,
-            "learner_name": learner.email.split('@')[0], # Fallback name
-            "learner_email": learner.email,
-            "enrolled_date": enrollment.enrolled_at.isoformat() if enrollment.enrolled_at else None,
-            "start_date": enrollment.enrolled_at.isoformat() if enrollment.enrolled_at else None,
+            "course_name": course_name,
+            "learner_name": display_name or learner_email.split('@')[0],
+            "learner_email": learner_email,
+            "enrolled_date": enrolled_date,
+            "start_date": enrolled_date,
             "time_spent": 0, # Placeholder
-            "completion_percentage": enrollment.progress_percent,
-            "status": enrollment.status.value.lower()
+            "completion_percentage": progress_percent,
+            "status": status.value.lower()
         })
         
-    return result
+    return FastJSONResponse(result)
+
+def get_managed_course(course_id: uuid.UUID, current_user: User, db: Session) -> Course:
+    if current_user.role == "learner":
+        raise HTTPException(status_code=403, detail="Learners cannot view course analytics")
+        
+    course = db.query(Course).filter(Course.id == course_id).first()
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+        
+    if current_user.role != "admin" and course.created_by != current_user.id:
+        raise HTTPException(status_code=403, detail="You do not have permission to view this course")
+    return course
+
+@router.get("/courses/{course_id}/cohort")
+@query_budget(4)
+def get_course_cohort(
+    course_id: uuid.UUID,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db)
+):
+    get_managed_course(course_id, current_user, read_db)
+    # Filled from the primary: the cache is shared by every request, and a lagging replica read
+    # made right after an invalidation would otherwise be served for the whole TTL
+    return get_cohort_analytics(db, course_id)
+
+@router.get("/courses/{course_id}/funnel")
+@query_budget(4)
+def get_course_funnel(
+    course_id: uuid.UUID,
+    background_tasks: BackgroundTasks,
+    refresh: bool = False,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db)
+):
+    get_managed_course(course_id, current_user, read_db)
+    # Filled from the primary, like the cohort cache
+    return get_lesson_funnel(db, course_id, background_tasks, force_refresh=refresh)
+
+def _stream_topics(course_ids: Optional[List[uuid.UUID]], current_user: User, db: Session) -> list:
+    if course_ids:
+        for course_id in course_ids:
+            get_managed_course(course_id, current_user, db)
+        return [str(course_id) for course_id in course_ids]
+    if current_user.role == "learner":
+        raise HTTPException(status_code=403, detail="Learners cannot view dashboard metrics")
+    if current_user.role == "admin":
+        return [ALL_COURSES]
+    return [str(row[0]) for row in db.query(Course.id).filter(Course.created_by == current_user.id).all()]
+
+def _status_snapshot(topics: list, db: Session) -> dict:
+    """
+    Enrollment counts per course and status, so clients can apply deltas from a known state.
+    """
+    query = db.query(Enrollment.course_id, Enrollment.status, func.count(Enrollment.id))\
+        .group_by(Enrollment.course_id, Enrollment.status)
+    if ALL_COURSES not in topics:
+        query = query.filter(Enrollment.course_id.in_([uuid.UUID(topic) for topic in topics]))
+    courses = {topic: {status.value: 0 for status in CourseStatus} for topic in topics if topic != ALL_COURSES}
+    for course_id, status, count in query.all():
+        courses.setdefault(str(course_id), {s.value: 0 for s in CourseStatus})[status.value] = count
+    return {"courses": courses}
+
+def _sse(event_type: str, data: dict, event_id=None) -> str:
+    lines = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{lines}event: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+@router.get("/stream")
+@query_budget(3)
+async def dashboard_stream(
+    request: Request,
+    course_id: Optional[List[uuid.UUID]] = Query(None),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Server-sent events for the instructor dashboard: a status snapshot, then
+    enrollment_created, enrollments_created, status_changed, progress_changed and quiz_submitted deltas.
+    A resync event means the subscriber fell behind and dropped events; refetch the snapshot.
+    """
+    topics = await run_in_threadpool(_stream_topics, course_id, current_user, db)
+    # Subscribe before taking the snapshot so no change falls between the two
+    subscription = event_bus.subscribe(topics)
+    try:
+        snapshot = await run_in_threadpool(_status_snapshot, topics, db)
+    except Exception:
+        event_bus.unsubscribe(subscription)
+        raise
+
+    async def events():
+        try:
+            yield _sse("snapshot", snapshot)
+            while not await request.is_disconnected():
+                if not await subscription.wait(STREAM_HEARTBEAT_SECONDS):
+                    yield ": keep-alive\n\n"
+                    continue
+                pending, dropped = subscription.drain()
+                if dropped:
+                    yield _sse("resync", {"dropped": dropped})
+                for event in pending:
+                    yield _sse(event["type"], event, event["id"])
+        finally:
+            event_bus.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
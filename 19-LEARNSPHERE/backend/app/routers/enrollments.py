@@ -7,15 +7,20 @@ from typing import List, Optional
 from app.db.session import get_db
 from app.models.user import User
 from app.models.course import Course, Enrollment
-from app.models.enums import CourseStatus
+from app.services.progress_service import course_status_for, pending_progress_change, publish_progress_change
+from app.services.leaderboard_service import record_leaderboard_completion
 from app.auth.dependencies import get_current_user
+from app.core.invalidation import publish_invalidation, COURSE_ACTIVITY
+from app.core.query_budget import query_budget
 
 router = APIRouter()
 
 class ProgressUpdateReq(BaseModel):
     progress_percent: int
 
-@router.patch("/{enrollment_id}/progress")
+# Deprecated: enrollment progress is now derived from POST /lesson/progress
+@router.patch("/{enrollment_id}/progress", deprecated=True)
+@query_budget(5)
 def update_progress(enrollment_id: uuid.UUID, req: ProgressUpdateReq, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     if current_user.role != "learner":
         raise HTTPException(status_code=403, detail="Only learners can update progress")
@@ -28,16 +33,14 @@ def update_progress(enrollment_id: uuid.UUID, req: ProgressUpdateReq, current_us
         raise HTTPException(status_code=403, detail="Not your enrollment")
         
     enrollment.progress_percent = max(0, min(100, req.progress_percent))
-    
-    if enrollment.progress_percent == 0:
-        enrollment.status = CourseStatus.NOT_STARTED
-    elif enrollment.progress_percent == 100:
-        enrollment.status = CourseStatus.COMPLETED
-    else:
-        enrollment.status = CourseStatus.IN_PROGRESS
+    enrollment.status = course_status_for(enrollment.progress_percent)
+    change = pending_progress_change(enrollment)
+    publish_invalidation(db, COURSE_ACTIVITY, enrollment.course_id)
         
     db.commit()
     db.refresh(enrollment)
+    record_leaderboard_completion(current_user.id, enrollment.course_id, enrollment.progress_percent)
+    publish_progress_change(enrollment.course_id, current_user.id, change)
     
     return {
         "success": True,
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+from app.db.session import get_db
+from app.db.replicas import get_read_db
+from app.models.user import User
+from app.auth.dependencies import get_current_user
+from app.services.home_service import get_learner_home
+from app.core.query_budget import query_budget
+from app.core.responses import conditional_json_response
+
+router = APIRouter()
+
+@router.get("")
+@query_budget(17)
+def learner_home(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db)
+):
+    """
+    The learner home screen in one round trip. Send the last ETag back as If-None-Match
+    to get 304 Not Modified when nothing on the screen has changed.
+    """
+    if current_user.role != "learner":
+        raise HTTPException(status_code=403, detail="Only learners have a home screen")
+    return conditional_json_response(request, get_learner_home(db, read_db, current_user.id))
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import exists
+from sqlalchemy.orm import Session
+import uuid
+
+from app.db.replicas import get_read_db
+from app.models.user import User
+from app.models.course import Course, Enrollment
+from app.auth.dependencies import get_current_user
+from app.services.leaderboard_service import get_leaderboard, METRICS
+from app.core.query_budget import query_budget
+
+router = APIRouter()
+
+def check_leaderboard_access(course_id: uuid.UUID, current_user: User, db: Session):
+    """
+    Boards list a course's learners: only its enrolled learners, its owner and admins may see them.
+    """
+    enrolled = exists().where(Enrollment.course_id == Course.id, Enrollment.learner_id == current_user.id)
+    row = db.query(Course.created_by, enrolled).filter(Course.id == course_id).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    created_by, is_enrolled = row
+    if current_user.role != "admin" and created_by != current_user.id and not is_enrolled:
+        raise HTTPException(status_code=403, detail="You do not have permission to view this leaderboard")
+
+@router.get("/{course_id}/leaderboard")
+@query_budget(3)
+def course_leaderboard(
+    course_id: uuid.UUID,
+    metric: str = "score",
+    limit: int = 10,
+    offset: int = 0,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    if metric not in METRICS:
+        raise HTTPException(status_code=400, detail=f"metric must be one of: {', '.join(METRICS)}")
+    check_leaderboard_access(course_id, current_user, db)
+    limit = max(1, min(100, limit))
+    offset = max(0, offset)
+    
+    board = get_leaderboard(course_id, metric, limit, offset, user_id=current_user.id)
+    
+    # Resolve display names for the visible page only
+    member_ids = [uuid.UUID(entry["user_id"]) for entry in board["entries"]]
+    emails = dict(db.query(User.id, User.email).filter(User.id.in_(member_ids)).all()) if member_ids else {}
+    for entry in board["entries"]:
+        email = emails.get(uuid.UUID(entry["user_id"]))
+        entry["learner_name"] = email.split('@')[0] if email else None # Fallback name
+        
+    return {"course_id": str(course_id), "metric": metric, **board}
@@ -1,9 +1,18 @@
+import uuid
+from typing import List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.models.profile import UserProfile
 from app.models.user import User
-from pydantic import BaseModel
+from app.auth.dependencies import require_instructor
+from app.core.invalidation import publish_invalidation, PROFILE_CHANGED
+from app.core.query_budget import query_budget
+from app.core.responses import FastJSONResponse
+from app.services.profile_service import get_profile_by_email, get_profiles
+from pydantic import BaseModel, Field
+
+MAX_BATCH_PROFILES = 500
 
 router = APIRouter()
 
@@ -16,28 +25,37 @@ class ProfileUpdateParams(BaseModel):
     location: str | None = None
     interests: str | None = None
 
+class ProfileBatchParams(BaseModel):
+    user_ids: List[uuid.UUID] = Field(..., max_length=MAX_BATCH_PROFILES)
+
 @router.get("")
+@query_budget(1)
 def read_profile(email: str, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
+    snapshot = get_profile_by_email(db, email)
+    if snapshot is None:
         raise HTTPException(status_code=404, detail="User not found")
-        
-    profile = db.query(UserProfile).filter(UserProfile.user_id == user.id).first()
-    if not profile:
+    if not snapshot.has_profile:
         return None
-        
-    return {
-        "displayName": profile.display_name,
-        "username": user.name,
-        "email": email,
-        "phone": None,
-        "bio": profile.bio,
-        "location": None,
-        "interests": None,
-        "updatedAt": None
-    }
+    return snapshot.to_dict()
+
+@router.post("/batch")
+@query_budget(2)
+def read_profiles(params: ProfileBatchParams, current_user: User = Depends(require_instructor), db: Session = Depends(get_db)):
+    # Cached snapshots plus one joined query for the rest, however many users are asked for
+    profiles = get_profiles(db, list(dict.fromkeys(params.user_ids)))
+    return FastJSONResponse({
+        "profiles": {
+            str(user_id): {
+                "displayName": snapshot.name,
+                "username": snapshot.username,
+                "avatarUrl": snapshot.avatar_url
+            }
+            for user_id, snapshot in profiles.items()
+        }
+    })
 
 @router.post("")
+@query_budget(4)
 def update_profile(params: ProfileUpdateParams, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.email == params.email).first()
     if not user:
@@ -55,7 +73,7 @@ def update_profile(params: ProfileUpdateParams, db: Session = Depends(get_db)):
             bio=params.bio,
         )
         db.add(profile)
-        
+
+    publish_invalidation(db, PROFILE_CHANGED, user.id)
     db.commit()
-    db.refresh(profile)
     return {"message": "Profile updated successfully"}
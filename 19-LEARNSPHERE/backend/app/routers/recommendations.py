@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.models.user import User
+from app.auth.dependencies import get_current_user
+from app.services.next_lesson_service import get_next_lessons, get_review_lessons
+from app.services.course_recommendation_service import recommend_courses
+from app.core.query_budget import query_budget
+
+router = APIRouter()
+
+@router.get("/next-lessons")
+@query_budget(5)
+def next_lessons(review_limit: int = 5, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    review_limit = max(0, min(10, review_limit))
+    return {
+        "success": True,
+        "next_lessons": get_next_lessons(db, current_user.id),
+        "review_lessons": get_review_lessons(db, current_user.id, review_limit)
+    }
+
+@router.get("/courses")
+@query_budget(4)
+def recommended_courses(k: int = 5, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    k = max(1, min(50, k))
+    return {
+        "success": True,
+        "courses": recommend_courses(db, current_user.id, k)
+    }
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.models.user import User
+from app.auth.dependencies import get_current_user
+from app.services.review_service import get_due_reviews
+from app.core.query_budget import query_budget
+
+router = APIRouter()
+
+@router.get("/due")
+@query_budget(3)
+def due_reviews(limit: int = 10, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    limit = max(1, min(50, limit))
+    return {
+        "success": True,
+        "reviews": get_due_reviews(db, current_user.id, limit)
+    }
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.db.replicas import get_read_db
+from app.models.user import User
+from app.auth.dependencies import get_current_user
+from app.services.search_service import search_courses
+from app.core.query_budget import query_budget
+
+router = APIRouter()
+
+@router.get("/courses")
+@query_budget(3)
+def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Search terms; the last term also matches as a prefix"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    try:
+        return search_courses(db, q, limit=limit, offset=offset)
+    except Exception as e:
+        print("ERROR in search:", str(e))
+        raise HTTPException(status_code=500, detail=str(e))
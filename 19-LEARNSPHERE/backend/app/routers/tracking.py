@@ -6,13 +6,31 @@ from typing import List, Optional
 from datetime import datetime
 
 from app.db.session import get_db
+from app.db.replicas import get_read_db
 from app.models.user import User
-from app.models.tracking import LearningSession, QuizAttempt, UserActivityLog, PerformanceAnalysis
+from app.models.tracking import LearningSession, QuizAttempt, PerformanceAnalysis
 from app.models.course import Enrollment, Course
 from app.models.lesson import Lesson
 from app.models.progress import LessonProgress
 from app.auth.dependencies import get_current_user
-from app.services.performance_service import update_user_performance
+from app.services.performance_service import update_user_performance, serialize_performance
+from app.services.activity_log_service import log_activity
+from app.services.course_lessons_service import get_course_lesson_index
+from app.services.progress_service import (
+    lesson_status_for, rollup_enrollment_progress, pending_progress_change, publish_progress_change
+)
+from app.services.leaderboard_service import record_leaderboard_score, record_leaderboard_completion
+from app.services.next_lesson_service import mark_lesson_completion
+from app.services.review_service import schedule_review, update_review_queue
+from app.core.events import publish_event
+from app.core.invalidation import (
+    publish_invalidation, COURSE_ACTIVITY, LEARNER_PROGRESS_CHANGED, REVIEWS_CHANGED
+)
+from app.services.mastery_service import (
+    record_quiz_score, get_weak_topics, get_strong_topics, get_review_topics, serialize_mastery
+)
+from app.core.query_budget import query_budget
+from app.core.rate_limit import rate_limit
 
 router = APIRouter()
 
@@ -37,62 +55,89 @@ class SessionEndReq(BaseModel):
     started_at: datetime
     ended_at: datetime
 
-@router.post("/course/start")
+@router.post("/course/start", dependencies=[Depends(rate_limit("tracking"))])
+@query_budget(2)
 def start_course(req: StartCourseReq, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
     # Log Activity
-    log = UserActivityLog(
-        user_id=current_user.id,
-        activity_type="course_start",
-        metadata_json={"detail": f"Started course {req.course_id}", "course_id": str(req.course_id)}
-    )
-    db.add(log)
+    log_activity(db, current_user.id, "course_start", {
+        "detail": f"Started course {req.course_id}",
+        "course_id": str(req.course_id)
+    })
     db.commit()
     return {"success": True}
 
-@router.post("/lesson/progress")
+@router.post("/lesson/progress", dependencies=[Depends(rate_limit("tracking"))])
+@query_budget(17)
 def update_lesson_progress(req: LessonProgressReq, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    # Read once: after commit the expired user would be reloaded on access
+    user_id = current_user.id
+    lesson_index = get_course_lesson_index(db, req.course_id)
+    if req.lesson_id not in lesson_index:
+        raise HTTPException(status_code=400, detail="Lesson does not belong to this course")
+        
+    percent = max(0, min(100, req.percent))
+    
     progress = db.query(LessonProgress).filter(
-        LessonProgress.learner_id == current_user.id,
+        LessonProgress.learner_id == user_id,
         LessonProgress.lesson_id == req.lesson_id
     ).first()
     
     if not progress:
         progress = LessonProgress(
-            learner_id=current_user.id,
+            learner_id=user_id,
             lesson_id=req.lesson_id,
-            progress_percent=req.percent
+            progress_percent=percent
         )
         db.add(progress)
     else:
-        progress.progress_percent = req.percent
+        progress.progress_percent = percent
+    progress.status = lesson_status_for(percent)
+    
+    # Course progress is derived from lesson progress in the same transaction
+    enrollment = rollup_enrollment_progress(db, user_id, lesson_index)
+    change = pending_progress_change(enrollment) if enrollment else None
+    course_progress = enrollment.progress_percent if enrollment else None
+    course_status = enrollment.status if enrollment else None
         
     # Log Activity
-    log = UserActivityLog(
-        user_id=current_user.id,
-        activity_type="lesson_progress",
-        metadata_json={
-            "detail": f"Updated progress on lesson {req.lesson_id} to {req.percent}%",
-            "course_id": str(req.course_id),
-            "lesson_id": str(req.lesson_id)
-        }
-    )
-    db.add(log)
+    log_activity(db, user_id, "lesson_progress", {
+        "detail": f"Updated progress on lesson {req.lesson_id} to {percent}%",
+        "course_id": str(req.course_id),
+        "lesson_id": str(req.lesson_id)
+    })
+    publish_invalidation(db, COURSE_ACTIVITY, req.course_id)
+    # This worker flips the completion bit in place below; other workers reload
+    publish_invalidation(db, LEARNER_PROGRESS_CHANGED, user_id, local=False)
     db.commit()
+    mark_lesson_completion(user_id, lesson_index, req.lesson_id, percent >= 100)
+    if enrollment:
+        record_leaderboard_completion(user_id, req.course_id, course_progress)
+        publish_progress_change(req.course_id, user_id, change)
     
     # Recalculate performance async or synchronously
-    update_user_performance(current_user.id, db)
+    update_user_performance(user_id, db)
     
-    return {"success": True, "percent": req.percent}
+    return {
+        "success": True,
+        "percent": percent,
+        "course_progress": course_progress,
+        "course_status": course_status
+    }
 
-@router.post("/quiz/submit")
+@router.post("/quiz/submit", dependencies=[Depends(rate_limit("tracking"))])
+@query_budget(20)
 def submit_quiz(req: QuizSubmitReq, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    user_id = current_user.id
+    if req.quiz_id not in get_course_lesson_index(db, req.course_id):
+        raise HTTPException(status_code=400, detail="Lesson does not belong to this course")
+
     current_attempts_count = db.query(QuizAttempt).filter(
-        QuizAttempt.user_id == current_user.id,
+        QuizAttempt.user_id == user_id,
         QuizAttempt.quiz_id == req.quiz_id
     ).count()
 
     attempt = QuizAttempt(
-        user_id=current_user.id,
+        user_id=user_id,
         course_id=req.course_id,
         quiz_id=req.quiz_id,
         score=req.score,
@@ -101,30 +146,39 @@ def submit_quiz(req: QuizSubmitReq, current_user: User = Depends(get_current_use
         attempt_number=current_attempts_count + 1
     )
     db.add(attempt)
+    record_quiz_score(db, user_id, req.course_id, req.quiz_id, req.score)
+    review_due_at = schedule_review(db, user_id, req.course_id, req.quiz_id, req.score).due_at
     
     # Log Activity
-    log = UserActivityLog(
-        user_id=current_user.id,
-        activity_type="quiz_submitted",
-        metadata_json={
-            "detail": f"Submitted quiz {req.quiz_id} inside course {req.course_id} with score {req.score}/{req.total_questions}",
-            "course_id": str(req.course_id),
-            "quiz_id": str(req.quiz_id),
-            "score": req.score
-        }
-    )
-    db.add(log)
+    log_activity(db, user_id, "quiz_submitted", {
+        "detail": f"Submitted quiz {req.quiz_id} inside course {req.course_id} with score {req.score}/{req.total_questions}",
+        "course_id": str(req.course_id),
+        "quiz_id": str(req.quiz_id),
+        "score": req.score
+    })
+    publish_invalidation(db, COURSE_ACTIVITY, req.course_id)
+    publish_invalidation(db, LEARNER_PROGRESS_CHANGED, user_id)
+    publish_invalidation(db, REVIEWS_CHANGED, user_id, local=False)
     db.commit()
+    record_leaderboard_score(db, user_id, req.course_id)
+    update_review_queue(user_id, req.quiz_id, req.course_id, review_due_at)
+    publish_event(
+        req.course_id, "quiz_submitted",
+        learner_id=user_id, lesson_id=req.quiz_id, score=req.score,
+        attempt_number=current_attempts_count + 1
+    )
     
-    update_user_performance(current_user.id, db)
+    update_user_performance(user_id, db)
     return {"success": True, "score": req.score}
 
-@router.post("/session/end")
+@router.post("/session/end", dependencies=[Depends(rate_limit("tracking"))])
+@query_budget(12)
 def end_session(req: SessionEndReq, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+    user_id = current_user.id
     duration = (req.ended_at - req.started_at).total_seconds()
     
     session = LearningSession(
-        user_id=current_user.id,
+        user_id=user_id,
         course_id=req.course_id,
         lesson_id=req.lesson_id,
         started_at=req.started_at,
@@ -134,33 +188,38 @@ def end_session(req: SessionEndReq, current_user: User = Depends(get_current_use
     db.add(session)
     
     # Log Activity
-    log = UserActivityLog(
-        user_id=current_user.id,
-        activity_type="session_ended",
-        metadata_json={
-            "detail": f"Ended session for course {req.course_id} duration {int(duration)}s",
-            "course_id": str(req.course_id),
-            "lesson_id": str(req.lesson_id) if req.lesson_id else None
-        }
-    )
-    db.add(log)
+    log_activity(db, user_id, "session_ended", {
+        "detail": f"Ended session for course {req.course_id} duration {int(duration)}s",
+        "course_id": str(req.course_id),
+        "lesson_id": str(req.lesson_id) if req.lesson_id else None
+    })
+    publish_invalidation(db, COURSE_ACTIVITY, req.course_id)
     db.commit()
     
-    update_user_performance(current_user.id, db)
+    update_user_performance(user_id, db)
     return {"success": True, "duration": int(duration)}
 
 @router.get("/performance/me")
-def my_performance(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
-    perf = db.query(PerformanceAnalysis).filter(PerformanceAnalysis.user_id == current_user.id).first()
+@query_budget(11)
+def my_performance(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db)
+):
+    perf = read_db.query(PerformanceAnalysis).filter(PerformanceAnalysis.user_id == current_user.id).first()
     if not perf:
+        # First visit: compute and store on the primary
         perf = update_user_performance(current_user.id, db)
     
+    return {"success": True, **serialize_performance(perf)}
+
+@router.get("/performance/mastery")
+@query_budget(4)
+def my_mastery(limit: int = 5, current_user: User = Depends(get_current_user), db: Session = Depends(get_read_db)):
+    limit = max(1, min(50, limit))
     return {
         "success": True,
-        "total_learning_time": perf.total_learning_time,
-        "average_score": perf.average_score,
-        "completion_percentage": perf.completion_percentage,
-        "weak_topics": perf.weak_topics,
-        "engagement_level": perf.engagement_level,
-        "learning_trend": perf.learning_trend
+        "weak_topics": serialize_mastery(get_weak_topics(db, current_user.id, limit)),
+        "strong_topics": serialize_mastery(get_strong_topics(db, current_user.id, limit)),
+        "review_topics": serialize_mastery(get_review_topics(db, current_user.id, limit))
     }
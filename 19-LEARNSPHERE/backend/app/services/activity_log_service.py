@@ -0,0 +1,188 @@
+import time
+import uuid
+import logging
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.metrics import (
+    ACTIVITY_LOG_BUFFER_DEPTH, ACTIVITY_LOG_FLUSH_DURATION, ACTIVITY_LOG_ROWS_WRITTEN, ACTIVITY_LOG_ROWS_DROPPED
+)
+from app.db.session import SessionLocal
+from app.models.tracking import UserActivityLog
+
+logger = logging.getLogger("activity_log")
+
+OVERFLOW_POLICIES = ("flush", "drop_oldest", "drop_newest")
+
+class ActivityLogBuffer:
+    """
+    Write-behind buffer for activity log rows. A background thread inserts them in batches
+    (one multi-row INSERT and one commit per batch) once `flush_rows` are queued or every
+    `flush_interval` seconds. When `capacity` rows are waiting, `overflow` decides:
+    "flush" makes the caller write a batch inline, "drop_oldest"/"drop_newest" discard a row.
+    """
+
+    def __init__(self, capacity: int, flush_rows: int, flush_interval: float, overflow: str = "flush"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown activity log overflow policy {overflow!r}; use one of {OVERFLOW_POLICIES}")
+        self.capacity = max(1, capacity)
+        self.flush_rows = max(1, min(flush_rows, self.capacity))
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self._rows = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, row: dict):
+        with self._lock:
+            full = len(self._rows) >= self.capacity
+            if not full:
+                self._rows.append(row)
+            elif self.overflow == "drop_newest":
+                ACTIVITY_LOG_ROWS_DROPPED.inc(reason="overflow")
+                return
+            elif self.overflow == "drop_oldest":
+                self._rows.popleft()
+                self._rows.append(row)
+                ACTIVITY_LOG_ROWS_DROPPED.inc(reason="overflow")
+                full = False
+        if full:
+            # "flush": apply backpressure by writing one batch on the caller's thread. If that fails
+            # (the database is down) the row is dropped rather than retried, so requests never spin
+            self.flush_batch()
+            with self._lock:
+                room = len(self._rows) < self.capacity
+                if room:
+                    self._rows.append(row)
+            if not room:
+                ACTIVITY_LOG_ROWS_DROPPED.inc(reason="flush_failed")
+                return
+        depth = len(self._rows)
+        ACTIVITY_LOG_BUFFER_DEPTH.set(depth)
+        if depth >= self.flush_rows:
+            self._wake.set()
+
+    def _take(self, limit: int) -> list:
+        with self._lock:
+            batch = [self._rows.popleft() for _ in range(min(limit, len(self._rows)))]
+        ACTIVITY_LOG_BUFFER_DEPTH.set(len(self._rows))
+        return batch
+
+    def _requeue(self, batch: list):
+        # Put a failed batch back in front, keeping within capacity (newest rows win)
+        with self._lock:
+            room = self.capacity - len(self._rows)
+            kept = batch[len(batch) - room:] if room < len(batch) else batch
+            self._rows.extendleft(reversed(kept))
+        if len(kept) < len(batch):
+            ACTIVITY_LOG_ROWS_DROPPED.inc(len(batch) - len(kept), reason="flush_failed")
+        ACTIVITY_LOG_BUFFER_DEPTH.set(len(self._rows))
+
+    def flush_batch(self) -> int:
+        """
+        Writes up to `flush_rows` queued rows in one transaction; returns how many were written.
+        """
+        batch = self._take(self.flush_rows)
+        if not batch:
+            return 0
+        started = time.perf_counter()
+        db = None
+        try:
+            db = SessionLocal()
+            db.execute(UserActivityLog.__table__.insert().values(batch))
+            db.commit()
+        except Exception as e:
+            if db is not None:
+                db.rollback()
+            self._requeue(batch)
+            logger.error("Activity log flush of %d rows failed: %s", len(batch), e)
+            return 0
+        finally:
+            if db is not None:
+                db.close()
+            ACTIVITY_LOG_FLUSH_DURATION.observe(time.perf_counter() - started)
+        ACTIVITY_LOG_ROWS_WRITTEN.inc(len(batch))
+        return len(batch)
+
+    def flush(self):
+        """
+        Drains the buffer (stops early if the database is failing).
+        """
+        while self._rows:
+            if not self.flush_batch():
+                break
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error("Activity log flusher error: %s", e)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="activity-log-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the flusher and writes whatever is still queued.
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(5.0, self.flush_interval * 2))
+        self.flush()
+        if self._rows:
+            logger.error("Shutting down with %d activity log rows unwritten", len(self._rows))
+
+_buffer = None
+
+def start_activity_log_buffer():
+    """
+    Startup hook (per worker). Until it runs, and when ACTIVITY_LOG_BUFFERED is off,
+    log_activity writes in the caller's transaction.
+    """
+    global _buffer
+    if not settings.ACTIVITY_LOG_BUFFERED or _buffer is not None:
+        return
+    _buffer = ActivityLogBuffer(
+        capacity=settings.ACTIVITY_LOG_CAPACITY,
+        flush_rows=settings.ACTIVITY_LOG_FLUSH_ROWS,
+        flush_interval=settings.ACTIVITY_LOG_FLUSH_INTERVAL_SECONDS,
+        overflow=settings.ACTIVITY_LOG_OVERFLOW
+    )
+    _buffer.start()
+
+def stop_activity_log_buffer():
+    global _buffer
+    buffer, _buffer = _buffer, None
+    if buffer is not None:
+        buffer.stop()
+
+def log_activity(db: Session, user_id: uuid.UUID, activity_type: str, metadata: dict):
+    """
+    Records a learner activity. Activity logs are an audit trail, not business state, so they go
+    through the write-behind buffer and can reach the table up to a flush interval late.
+    Attempts, sessions and progress stay in the request's own transaction.
+    """
+    row = {
+        "id": uuid.uuid4(),
+        "user_id": user_id,
+        "activity_type": activity_type,
+        "metadata_json": metadata,
+        # Stamped now, not when the batch is written
+        "created_at": datetime.now(timezone.utc)
+    }
+    if _buffer is None:
+        db.add(UserActivityLog(**row))
+    else:
+        _buffer.add(row)
@@ -3,13 +3,15 @@ import json
 from sqlalchemy.orm import Session
 from app.models.tracking import PerformanceAnalysis, UserActivityLog
 from app.models.course import Enrollment, Course
+from app.services.next_lesson_service import get_next_lessons
+from app.services.review_service import get_due_reviews
 
 def build_ai_context(user_id: uuid.UUID, db: Session) -> str:
     """
     Builds a JSON context object for the AI using tracking and performance data.
     """
     # 1. Courses
-    enrollments = db.query(Enrollment, Course.title)\
+    enrollments = db.query(Enrollment, Course.course_name)\
         .join(Course, Course.id == Enrollment.course_id)\
         .filter(Enrollment.learner_id == user_id)\
         .all()
@@ -37,7 +39,11 @@ def build_ai_context(user_id: uuid.UUID, db: Session) -> str:
             "engagement": "unknown"
         }
         
-    # 3. Recent Activity
+    # 3. Next lessons and due reviews, served from in-memory per-learner state
+    next_lessons = [lesson["title"] for lesson in get_next_lessons(db, user_id)]
+    review_lessons = [review["title"] for review in get_due_reviews(db, user_id, limit=3)]
+        
+    # 4. Recent Activity
     activities = db.query(UserActivityLog)\
         .filter(UserActivityLog.user_id == user_id)\
         .order_by(UserActivityLog.created_at.desc())\
@@ -53,6 +59,8 @@ def build_ai_context(user_id: uuid.UUID, db: Session) -> str:
     context = {
         "courses": courses_list,
         "performance": perf_dict,
+        "next_lessons": next_lessons,
+        "reviews_due": review_lessons,
         "recent_activity": activity_list
     }
     
@@ -24,7 +24,7 @@ async def handle_ai_chat(db: Session, user: User, prompt: str) -> str:
     Rules:
     - Guide based on weak topics.
     - Mention progress percentage.
-    - Suggest next lessons.
+    - Suggest the listed next lessons and the reviews that are due.
     - Give realistic learning schedule.
     Please instruct, motivate, and guide strictly corresponding to academic goals.
     """
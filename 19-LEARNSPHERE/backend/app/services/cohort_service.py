@@ -0,0 +1,180 @@
+import uuid
+from datetime import datetime, timezone
+import numpy as np
+from sqlalchemy import select, func, case
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.models.course import Enrollment
+from app.models.lesson import Lesson
+from app.models.progress import LessonProgress
+from app.models.tracking import QuizAttempt, LearningSession
+from app.core.cache import TTLCache
+from app.services.course_lessons_service import get_course_lesson_index
+
+_cohort_cache = TTLCache("cohort_analytics", ttl_seconds=300, maxsize=512)
+
+PERCENTILES = [10, 25, 50, 75, 90]
+SCORE_BINS = np.arange(0, 101, 10)
+TIME_BINS_MINUTES = np.array([0, 15, 30, 60, 120, 240, 480, np.inf])
+AT_RISK_SCORE = 60
+AT_RISK_INACTIVE_DAYS = 14
+AT_RISK_STALLED_DAYS = 7
+AT_RISK_LIST_LIMIT = 100
+
+def _column(values, dtype=np.float64):
+    return np.fromiter((np.nan if v is None else v for v in values), dtype=dtype, count=len(values))
+
+def _timestamps(values):
+    return np.fromiter((v.timestamp() if v else np.nan for v in values), dtype=np.float64, count=len(values))
+
+def _percentiles(values: np.ndarray) -> dict:
+    values = values[~np.isnan(values)]
+    if not values.size:
+        return {f"p{p}": None for p in PERCENTILES}
+    return {f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+def _histogram(values: np.ndarray, bins: np.ndarray) -> list:
+    values = values[~np.isnan(values)]
+    counts, edges = np.histogram(values, bins=bins)
+    return [
+        {"from": float(lo), "to": None if np.isinf(hi) else float(hi), "count": int(c)}
+        for lo, hi, c in zip(edges[:-1], edges[1:], counts)
+    ]
+
+def _fetch_cohort_columns(db: Session, course_id: uuid.UUID):
+    """
+    Pulls one row per enrolled learner with every per-learner aggregate in a single query.
+    """
+    quiz_stats = select(
+        QuizAttempt.user_id.label("user_id"),
+        func.avg(QuizAttempt.score).label("avg_score"),
+        func.max(QuizAttempt.created_at).label("last_quiz_at")
+    ).where(QuizAttempt.course_id == course_id).group_by(QuizAttempt.user_id).subquery()
+
+    session_stats = select(
+        LearningSession.user_id.label("user_id"),
+        func.sum(LearningSession.duration_seconds).label("time_seconds"),
+        func.max(LearningSession.ended_at).label("last_session_at")
+    ).where(LearningSession.course_id == course_id).group_by(LearningSession.user_id).subquery()
+
+    lesson_stats = select(
+        LessonProgress.learner_id.label("user_id"),
+        func.max(case((LessonProgress.progress_percent >= 100, Lesson.order_index))).label("max_completed_order"),
+        func.max(LessonProgress.updated_at).label("last_lesson_at")
+    ).join(Lesson, Lesson.id == LessonProgress.lesson_id)\
+        .where(Lesson.course_id == course_id)\
+        .group_by(LessonProgress.learner_id).subquery()
+
+    stmt = select(
+        Enrollment.learner_id,
+        User.email,
+        Enrollment.progress_percent,
+        Enrollment.enrolled_at,
+        quiz_stats.c.avg_score,
+        session_stats.c.time_seconds,
+        lesson_stats.c.max_completed_order,
+        quiz_stats.c.last_quiz_at,
+        session_stats.c.last_session_at,
+        lesson_stats.c.last_lesson_at
+    ).join(User, User.id == Enrollment.learner_id)\
+        .outerjoin(quiz_stats, quiz_stats.c.user_id == Enrollment.learner_id)\
+        .outerjoin(session_stats, session_stats.c.user_id == Enrollment.learner_id)\
+        .outerjoin(lesson_stats, lesson_stats.c.user_id == Enrollment.learner_id)\
+        .where(Enrollment.course_id == course_id)
+
+    rows = db.execute(stmt).all()
+    return list(zip(*rows)) if rows else [()] * 10
+
+def compute_cohort_analytics(db: Session, course_id: uuid.UUID) -> dict:
+    (learner_ids, emails, progress_col, enrolled_col, score_col, time_col,
+     max_order_col, last_quiz_col, last_session_col, last_lesson_col) = _fetch_cohort_columns(db, course_id)
+
+    now = datetime.now(timezone.utc).timestamp()
+    progress = _column(progress_col)
+    progress = np.where(np.isnan(progress), 0, progress)
+    scores = _column(score_col)
+    minutes = np.nan_to_num(_column(time_col)) / 60.0
+    enrolled_at = _timestamps(enrolled_col)
+    last_active = np.fmax(np.fmax(_timestamps(last_quiz_col), _timestamps(last_session_col)), _timestamps(last_lesson_col))
+    last_active = np.where(np.isnan(last_active), enrolled_at, last_active)
+    days_inactive = (now - last_active) / 86400.0
+    days_enrolled = (now - enrolled_at) / 86400.0
+
+    # Completion funnel: share of learners whose furthest completed lesson is at or past each position
+    lesson_index = get_course_lesson_index(db, course_id)
+    total = len(learner_ids)
+    funnel = []
+    if len(lesson_index):
+        max_order = _column(max_order_col)
+        completed = ~np.isnan(max_order)
+        positions = np.searchsorted(np.asarray(lesson_index.order_indexes), max_order[completed], side="right") - 1
+        reached = np.cumsum(np.bincount(positions[positions >= 0], minlength=len(lesson_index))[::-1])[::-1]
+        funnel = [
+            {
+                "lesson_id": str(lesson_id),
+                "title": title,
+                "order_index": order_index,
+                "completed": int(count),
+                "share": round(int(count) / total, 4) if total else 0.0
+            }
+            for lesson_id, title, order_index, count in zip(
+                lesson_index.lesson_ids, lesson_index.titles, lesson_index.order_indexes, reached
+            )
+        ]
+
+    # At-risk flags, evaluated for the whole cohort at once
+    unfinished = progress < 100
+    low_score = unfinished & (scores < AT_RISK_SCORE)
+    inactive = unfinished & (days_inactive > AT_RISK_INACTIVE_DAYS)
+    stalled = (progress == 0) & (days_enrolled > AT_RISK_STALLED_DAYS)
+    at_risk = low_score | inactive | stalled
+    at_risk_positions = np.flatnonzero(at_risk)
+    # Most inactive first so the truncated list keeps the learners who need attention most
+    at_risk_positions = at_risk_positions[np.argsort(-days_inactive[at_risk_positions], kind="stable")][:AT_RISK_LIST_LIMIT]
+
+    return {
+        "course_id": str(course_id),
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "total_learners": total,
+        "scores": {
+            "learners_with_attempts": int(np.count_nonzero(~np.isnan(scores))),
+            "percentiles": _percentiles(scores),
+            "histogram": _histogram(scores, SCORE_BINS)
+        },
+        "time_on_course_minutes": {
+            "percentiles": _percentiles(minutes),
+            "histogram": _histogram(minutes, TIME_BINS_MINUTES)
+        },
+        "completion": {
+            "percentiles": _percentiles(progress),
+            "completed": int(np.count_nonzero(progress >= 100)),
+            "funnel": funnel
+        },
+        "at_risk": {
+            "count": int(np.count_nonzero(at_risk)),
+            "learners": [
+                {
+                    "learner_id": str(learner_ids[i]),
+                    "learner_email": emails[i],
+                    "progress_percent": int(progress[i]),
+                    "average_score": None if np.isnan(scores[i]) else round(float(scores[i]), 1),
+                    "days_inactive": round(float(days_inactive[i]), 1),
+                    "reasons": [
+                        reason for reason, flagged in (
+                            ("low_score", low_score[i]),
+                            ("inactive", inactive[i]),
+                            ("not_started", stalled[i])
+                        ) if flagged
+                    ]
+                }
+                for i in at_risk_positions
+            ]
+        }
+    }
+
+def get_cohort_analytics(db: Session, course_id: uuid.UUID) -> dict:
+    analytics = _cohort_cache.get(course_id)
+    if analytics is None:
+        analytics = compute_cohort_analytics(db, course_id)
+        _cohort_cache.set(course_id, analytics)
+    return analytics
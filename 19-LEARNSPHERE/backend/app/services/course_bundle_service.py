@@ -0,0 +1,153 @@
+import json
+import uuid
+from typing import Optional
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.models.course import Course
+from app.models.lesson import Lesson
+from app.models.enums import LessonType
+
+# Course bundle format (NDJSON, one JSON object per line):
+#   line 1:  {"course_name": "...", "description": "..."}
+#   line 2+: {"title": "...", "type": "video|document|quiz", "duration_minutes": 10}
+# Lessons are ordered by their position in the bundle.
+BUNDLE_MEDIA_TYPE = "application/x-ndjson"
+MAX_LINE_BYTES = 64 * 1024
+MAX_BUNDLE_LESSONS = 5000
+MAX_REPORTED_ERRORS = 100
+LESSON_INSERT_CHUNK_SIZE = 1000
+EXPORT_BATCH_SIZE = 500
+
+class BundleCourse(BaseModel):
+    course_name: str = Field(min_length=1, max_length=255)
+    description: Optional[str] = None
+
+class BundleLesson(BaseModel):
+    title: str = Field(min_length=1, max_length=255)
+    type: LessonType = LessonType.video
+    duration_minutes: int = Field(default=0, ge=0)
+
+class BundleParseResult:
+    def __init__(self):
+        self.course: Optional[BundleCourse] = None
+        self.header_seen = False
+        self.lessons = []
+        self.errors = []
+        self.error_count = 0
+
+    def add_error(self, line: int, error):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": error})
+
+async def _iter_lines(chunks):
+    """
+    Splits an async byte stream into lines, buffering at most one line.
+    Yields (line_number, bytes, too_long); an overlong line is reported once and its bytes dropped.
+    """
+    buffer = b""
+    line_number = 0
+    overlong = False
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            too_long = overlong or len(line) > MAX_LINE_BYTES
+            yield line_number, b"" if too_long else line, too_long
+            overlong = False
+        if len(buffer) > MAX_LINE_BYTES:
+            overlong = True
+            buffer = b""
+    if overlong or buffer:
+        too_long = overlong or len(buffer) > MAX_LINE_BYTES
+        yield line_number + 1, b"" if too_long else buffer, too_long
+
+async def parse_bundle(chunks) -> BundleParseResult:
+    """
+    Validates a course bundle line by line as it arrives. Every bad line is reported; nothing is written here.
+    """
+    result = BundleParseResult()
+    async for line_number, raw, too_long in _iter_lines(chunks):
+        if not too_long and not raw.strip():
+            continue
+        # The first non-blank line is the course header, valid or not
+        is_header = not result.header_seen
+        result.header_seen = True
+        if too_long:
+            result.add_error(line_number, f"Line exceeds {MAX_LINE_BYTES} bytes")
+            continue
+        try:
+            data = json.loads(raw)
+        except ValueError as e:
+            result.add_error(line_number, f"Invalid JSON: {e}")
+            continue
+        if not isinstance(data, dict):
+            result.add_error(line_number, "Expected a JSON object")
+            continue
+
+        try:
+            if is_header:
+                result.course = BundleCourse(**data)
+            elif len(result.lessons) >= MAX_BUNDLE_LESSONS:
+                result.add_error(line_number, f"Bundle exceeds {MAX_BUNDLE_LESSONS} lessons")
+            else:
+                result.lessons.append(BundleLesson(**data))
+        except ValidationError as e:
+            result.add_error(line_number, [
+                {"field": ".".join(str(loc) for loc in err["loc"]), "message": err["msg"]}
+                for err in e.errors()
+            ])
+
+    if not result.header_seen:
+        result.add_error(1, "Bundle is empty; the first line must describe the course")
+    return result
+
+def import_bundle(db: Session, created_by: uuid.UUID, bundle: BundleParseResult) -> Course:
+    """
+    Creates the course and all of its lessons in one transaction.
+    """
+    course = Course(
+        course_name=bundle.course.course_name,
+        description=bundle.course.description,
+        created_by=created_by
+    )
+    db.add(course)
+    db.flush()
+
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "course_id": course.id,
+            "title": lesson.title,
+            "type": lesson.type,
+            "duration_minutes": lesson.duration_minutes,
+            "order_index": position
+        }
+        for position, lesson in enumerate(bundle.lessons)
+    ]
+    for start in range(0, len(rows), LESSON_INSERT_CHUNK_SIZE):
+        db.execute(insert(Lesson), rows[start:start + LESSON_INSERT_CHUNK_SIZE])
+
+    db.commit()
+    db.refresh(course)
+    return course
+
+def export_bundle(db: Session, course_id: uuid.UUID):
+    """
+    Yields the course bundle as NDJSON lines, reading lessons in batches.
+    """
+    course = db.query(Course.course_name, Course.description).filter(Course.id == course_id).first()
+    yield json.dumps({"course_name": course.course_name, "description": course.description}) + "\n"
+
+    lessons = db.query(Lesson.title, Lesson.type, Lesson.duration_minutes)\
+        .filter(Lesson.course_id == course_id)\
+        .order_by(Lesson.order_index.asc(), Lesson.id.asc())\
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    for lesson in lessons:
+        yield json.dumps({
+            "title": lesson.title,
+            "type": lesson.type.value,
+            "duration_minutes": lesson.duration_minutes or 0
+        }) + "\n"
@@ -0,0 +1,69 @@
+import uuid
+from sqlalchemy.orm import Session
+from app.models.lesson import Lesson
+from app.core.cache import TTLCache
+
+_lesson_index_cache = TTLCache("course_lessons", ttl_seconds=600, maxsize=4096)
+
+class CourseLessonIndex:
+    """
+    Ordered lesson metadata for one course, with each lesson's weight in the course progress.
+    Lessons are weighted by duration_minutes; lessons without a duration count as one minute.
+    """
+
+    def __init__(self, course_id: uuid.UUID, rows):
+        self.course_id = course_id
+        self.lesson_ids = [row.id for row in rows]
+        self.titles = [row.title for row in rows]
+        self.order_indexes = [row.order_index for row in rows]
+        self.weights = [max(row.duration_minutes or 0, 1) for row in rows]
+        self.position = {lesson_id: i for i, lesson_id in enumerate(self.lesson_ids)}
+        self.total_weight = sum(self.weights)
+        # Identifies the lesson order: state keyed by position is only valid for the same version
+        self.version = hash(tuple(self.lesson_ids))
+
+    def __len__(self):
+        return len(self.lesson_ids)
+
+    def __contains__(self, lesson_id):
+        return lesson_id in self.position
+
+    def weight_of(self, lesson_id) -> int:
+        return self.weights[self.position[lesson_id]]
+
+def get_course_lesson_index(db: Session, course_id: uuid.UUID) -> CourseLessonIndex:
+    index = _lesson_index_cache.get(course_id)
+    if index is None:
+        rows = db.query(Lesson.id, Lesson.title, Lesson.order_index, Lesson.duration_minutes)\
+            .filter(Lesson.course_id == course_id)\
+            .order_by(Lesson.order_index.asc(), Lesson.id.asc())\
+            .all()
+        index = CourseLessonIndex(course_id, rows)
+        _lesson_index_cache.set(course_id, index)
+    return index
+
+def get_course_lesson_indexes(db: Session, course_ids) -> dict:
+    """
+    Indexes for many courses at once; every uncached course is loaded in a single query.
+    """
+    indexes = {}
+    missing = []
+    for course_id in course_ids:
+        index = _lesson_index_cache.get(course_id)
+        if index is None:
+            missing.append(course_id)
+        else:
+            indexes[course_id] = index
+    if missing:
+        rows_by_course = {course_id: [] for course_id in missing}
+        rows = db.query(Lesson.course_id, Lesson.id, Lesson.title, Lesson.order_index, Lesson.duration_minutes)\
+            .filter(Lesson.course_id.in_(missing))\
+            .order_by(Lesson.course_id, Lesson.order_index.asc(), Lesson.id.asc())\
+            .all()
+        for row in rows:
+            rows_by_course[row.course_id].append(row)
+        for course_id, course_rows in rows_by_course.items():
+            index = CourseLessonIndex(course_id, course_rows)
+            _lesson_index_cache.set(course_id, index)
+            indexes[course_id] = index
+    return indexes
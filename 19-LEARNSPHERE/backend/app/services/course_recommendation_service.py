@@ -0,0 +1,277 @@
+import os
+import time
+import uuid
+import logging
+import threading
+from datetime import datetime, timezone
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.course import Course, Enrollment
+
+logger = logging.getLogger("course_recommendations")
+
+# Implicit-feedback ALS: every enrollment is a positive signal, progress raises its confidence
+CONFIDENCE_ALPHA = 10.0
+DEFAULT_FACTORS = 32
+DEFAULT_REGULARIZATION = 0.1
+DEFAULT_ITERATIONS = 10
+
+class CourseEmbeddings:
+    """
+    Learner and course factors produced by the offline job, stored as float32.
+    """
+
+    def __init__(self, user_ids, course_ids, user_factors, course_factors, popularity, trained_at: float, regularization: float):
+        self.user_ids = [str(u) for u in user_ids]
+        self.course_ids = [str(c) for c in course_ids]
+        self.user_factors = np.asarray(user_factors, dtype=np.float32)
+        self.course_factors = np.asarray(course_factors, dtype=np.float32)
+        self.popularity = np.asarray(popularity, dtype=np.float32)
+        self.trained_at = trained_at
+        self.regularization = regularization
+        self.user_position = {u: i for i, u in enumerate(self.user_ids)}
+        self.course_position = {c: i for i, c in enumerate(self.course_ids)}
+        factors = self.course_factors.astype(np.float64)
+        # Gram matrix shared by every learner fold-in
+        self.course_gram = factors.T @ factors + regularization * np.eye(factors.shape[1])
+
+    def save(self, path: str):
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(
+            tmp_path,
+            user_ids=np.array(self.user_ids),
+            course_ids=np.array(self.course_ids),
+            user_factors=self.user_factors,
+            course_factors=self.course_factors,
+            popularity=self.popularity,
+            trained_at=np.array(self.trained_at),
+            regularization=np.array(self.regularization)
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path) as data:
+            return cls(
+                data["user_ids"], data["course_ids"], data["user_factors"], data["course_factors"],
+                data["popularity"], float(data["trained_at"]), float(data["regularization"])
+            )
+
+def _confidence(progress) -> np.ndarray:
+    return 1.0 + CONFIDENCE_ALPHA * np.clip(np.asarray(progress, dtype=np.float64), 0, 100) / 100.0
+
+def _group(keys: np.ndarray, n_groups: int):
+    """
+    CSR-style grouping: returns (order, indptr) so rows of group g are order[indptr[g]:indptr[g + 1]].
+    """
+    order = np.argsort(keys, kind="stable")
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(keys, minlength=n_groups))))
+    return order, indptr
+
+def _solve_rows(indptr, order, other_index, confidence, other_factors, regularization):
+    """
+    One ALS half-step: solves every row's factors against the fixed factors on the other side.
+    """
+    n_rows = len(indptr) - 1
+    n_factors = other_factors.shape[1]
+    gram = other_factors.T @ other_factors + regularization * np.eye(n_factors)
+    solved = np.zeros((n_rows, n_factors))
+    for row in range(n_rows):
+        start, end = indptr[row], indptr[row + 1]
+        if start == end:
+            continue
+        entries = order[start:end]
+        factors = other_factors[other_index[entries]]
+        c = confidence[entries]
+        a = gram + (factors.T * (c - 1.0)) @ factors
+        solved[row] = np.linalg.solve(a, factors.T @ c)
+    return solved
+
+def _load_interactions(db: Session, since: datetime = None):
+    query = db.query(Enrollment.learner_id, Enrollment.course_id, Enrollment.progress_percent)
+    if since is not None:
+        touched = db.query(Enrollment.learner_id).filter(Enrollment.updated_at > since).distinct()
+        query = query.filter(Enrollment.learner_id.in_(touched))
+    return query.all()
+
+def train_course_embeddings(db: Session, factors: int = DEFAULT_FACTORS, iterations: int = DEFAULT_ITERATIONS,
+                            regularization: float = DEFAULT_REGULARIZATION, seed: int = 42) -> CourseEmbeddings:
+    """
+    Full offline factorization of the sparse learner x course matrix.
+    """
+    started = time.time()
+    rows = _load_interactions(db)
+    user_ids = sorted({str(r[0]) for r in rows})
+    course_ids = sorted({str(r[1]) for r in rows})
+    user_position = {u: i for i, u in enumerate(user_ids)}
+    course_position = {c: i for i, c in enumerate(course_ids)}
+
+    users = np.fromiter((user_position[str(r[0])] for r in rows), dtype=np.int64, count=len(rows))
+    courses = np.fromiter((course_position[str(r[1])] for r in rows), dtype=np.int64, count=len(rows))
+    confidence = _confidence([r[2] or 0 for r in rows])
+
+    rng = np.random.default_rng(seed)
+    user_factors = rng.normal(scale=0.01, size=(len(user_ids), factors))
+    course_factors = rng.normal(scale=0.01, size=(len(course_ids), factors))
+    user_order, user_indptr = _group(users, len(user_ids))
+    course_order, course_indptr = _group(courses, len(course_ids))
+
+    for _ in range(iterations):
+        user_factors = _solve_rows(user_indptr, user_order, courses, confidence, course_factors, regularization)
+        course_factors = _solve_rows(course_indptr, course_order, users, confidence, user_factors, regularization)
+
+    popularity = np.bincount(courses, minlength=len(course_ids))
+    logger.info(
+        "Trained course embeddings for %d learners x %d courses (%d enrollments) in %.1fs",
+        len(user_ids), len(course_ids), len(rows), time.time() - started
+    )
+    return CourseEmbeddings(user_ids, course_ids, user_factors, course_factors, popularity, started, regularization)
+
+def fold_in_learner(model: CourseEmbeddings, course_ids, progress) -> np.ndarray:
+    """
+    Learner factors for an arbitrary set of enrollments, with course factors held fixed.
+    """
+    positions = [model.course_position.get(str(c)) for c in course_ids]
+    keep = [i for i, p in enumerate(positions) if p is not None]
+    if not keep:
+        return None
+    factors = model.course_factors[[positions[i] for i in keep]].astype(np.float64)
+    c = _confidence([progress[i] for i in keep])
+    a = model.course_gram + (factors.T * (c - 1.0)) @ factors
+    return np.linalg.solve(a, factors.T @ c)
+
+def refresh_course_embeddings(db: Session, model: CourseEmbeddings) -> CourseEmbeddings:
+    """
+    Incremental refresh: refits only learners whose enrollments changed since the last run,
+    and folds in courses that did not exist then. Existing course factors stay fixed; popularity
+    gains every enrollment made since.
+    """
+    started = time.time()
+    since = datetime.fromtimestamp(model.trained_at, tz=timezone.utc)
+    rows = _load_interactions(db, since=since)
+
+    by_learner = {}
+    for learner_id, course_id, progress in rows:
+        by_learner.setdefault(str(learner_id), []).append((str(course_id), progress or 0))
+
+    # New courses: fit their factors from learners the model already knows
+    user_ids = list(model.user_ids)
+    user_factors = model.user_factors.astype(np.float64)
+    course_ids = list(model.course_ids)
+    course_factors = model.course_factors.astype(np.float64)
+    popularity = model.popularity.astype(np.float64)
+    new_courses = {}
+    for learner_id, enrollments in by_learner.items():
+        position = model.user_position.get(learner_id)
+        for course_id, progress in enrollments:
+            if course_id not in model.course_position:
+                new_courses.setdefault(course_id, []).append((position, progress))
+    if new_courses:
+        gram = user_factors.T @ user_factors + model.regularization * np.eye(user_factors.shape[1])
+        for course_id, learners in new_courses.items():
+            known = [(p, progress) for p, progress in learners if p is not None]
+            vector = np.zeros(user_factors.shape[1])
+            if known:
+                factors = user_factors[[p for p, _ in known]]
+                c = _confidence([progress for _, progress in known])
+                vector = np.linalg.solve(gram + (factors.T * (c - 1.0)) @ factors, factors.T @ c)
+            course_ids.append(course_id)
+            course_factors = np.vstack([course_factors, vector])
+            popularity = np.append(popularity, 0)
+
+    refreshed = CourseEmbeddings(user_ids, course_ids, user_factors, course_factors, popularity, started, model.regularization)
+
+    # Changed learners: refit against the (now extended) course factors
+    for learner_id, enrollments in by_learner.items():
+        vector = fold_in_learner(refreshed, [c for c, _ in enrollments], [p for _, p in enrollments])
+        if vector is None:
+            continue
+        position = refreshed.user_position.get(learner_id)
+        if position is None:
+            refreshed.user_ids.append(learner_id)
+            refreshed.user_position[learner_id] = len(refreshed.user_ids) - 1
+            refreshed.user_factors = np.vstack([refreshed.user_factors, vector.astype(np.float32)])
+        else:
+            refreshed.user_factors[position] = vector
+
+    # Enrollments made since the last run count towards popularity, in new and existing courses alike
+    enrolled = db.query(Enrollment.course_id, func.count(Enrollment.id))\
+        .filter(Enrollment.enrolled_at > since).group_by(Enrollment.course_id).all()
+    for course_id, count in enrolled:
+        position = refreshed.course_position.get(str(course_id))
+        if position is not None:
+            refreshed.popularity[position] += count
+
+    logger.info(
+        "Refreshed course embeddings: %d changed learners, %d new courses in %.1fs",
+        len(by_learner), len(new_courses), time.time() - started
+    )
+    return refreshed
+
+_model = None
+_model_mtime = None
+_model_lock = threading.Lock()
+
+def get_course_embeddings():
+    """
+    The current model, reloaded whenever the offline job writes a new file.
+    """
+    global _model, _model_mtime
+    path = settings.RECOMMENDER_MODEL_PATH
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return None
+    if mtime != _model_mtime:
+        with _model_lock:
+            if mtime != _model_mtime:
+                _model = CourseEmbeddings.load(path)
+                _model_mtime = mtime
+    return _model
+
+def recommend_courses(db: Session, user_id: uuid.UUID, k: int = 5) -> list:
+    """
+    Top-k courses the learner is not enrolled in, scored by dot product with the learner's factors.
+    The learner is folded in from their current enrollments, so new enrollments count immediately.
+    Learners without usable enrollments get the most popular courses.
+    """
+    model = get_course_embeddings()
+    enrollments = db.query(Enrollment.course_id, Enrollment.progress_percent)\
+        .filter(Enrollment.learner_id == user_id).all()
+    owned = {str(course_id) for course_id, _ in enrollments}
+
+    if model is not None and model.course_ids:
+        vector = fold_in_learner(model, [c for c, _ in enrollments], [p or 0 for _, p in enrollments])
+        scores = model.course_factors @ vector.astype(np.float32) if vector is not None else model.popularity.copy()
+        owned_positions = [model.course_position[c] for c in owned if c in model.course_position]
+        scores[owned_positions] = -np.inf
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        ranked = [(model.course_ids[i], float(scores[i])) for i in top if np.isfinite(scores[i])]
+    else:
+        # No model yet: plain popularity from enrollment counts
+        popular = db.query(Enrollment.course_id, func.count(Enrollment.id).label("learners"))\
+            .group_by(Enrollment.course_id)\
+            .order_by(func.count(Enrollment.id).desc())\
+            .limit(k + len(owned))\
+            .all()
+        ranked = [(str(course_id), float(learners)) for course_id, learners in popular if str(course_id) not in owned][:k]
+
+    if not ranked:
+        return []
+    courses = {
+        str(course.id): course
+        for course in db.query(Course).filter(Course.id.in_([uuid.UUID(c) for c, _ in ranked])).all()
+    }
+    return [
+        {
+            "course_id": course_id,
+            "course_name": courses[course_id].course_name,
+            "description": courses[course_id].description,
+            "score": round(score, 4)
+        }
+        for course_id, score in ranked if course_id in courses
+    ]
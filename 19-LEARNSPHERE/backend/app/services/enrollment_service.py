@@ -0,0 +1,83 @@
+import uuid
+from sqlalchemy import or_, select, func
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.models.course import Enrollment
+from app.models.enums import CourseStatus, UserRole
+from app.services.leaderboard_service import record_leaderboard_completion
+from app.core.events import publish_event
+from app.core.invalidation import publish_invalidation, COURSE_ACTIVITY, LEARNER_PROGRESS_CHANGED
+
+BULK_ENROLL_CHUNK_SIZE = 1000
+
+def _insert_ignoring_duplicates(db: Session):
+    """
+    INSERT ... ON CONFLICT (learner_id, course_id) DO NOTHING RETURNING learner_id, for the session's dialect.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert(Enrollment)\
+        .on_conflict_do_nothing(index_elements=["learner_id", "course_id"])\
+        .returning(Enrollment.learner_id)
+
+def bulk_enroll(db: Session, course_id: uuid.UUID, learner_ids, emails, chunk_size: int = BULK_ENROLL_CHUNK_SIZE):
+    """
+    Enrolls many learners in one transaction. Yields a progress dict after every chunk, whose
+    "pending" count is rows inserted but not yet committed, and a final summary dict
+    (with "done": True) once committed, whose "created" count is final.
+    Identifiers are resolved with a single query (emails case-insensitively); existing
+    enrollments are skipped by the database.
+    """
+    learner_ids = {uuid.UUID(str(i)) for i in learner_ids}
+    # Keyed by the case-folded address, keeping the spelling the caller sent for the not-found report
+    emails = {e.strip().lower(): e.strip() for e in emails if e and e.strip()}
+
+    filters = []
+    if learner_ids:
+        filters.append(User.id.in_(learner_ids))
+    if emails:
+        filters.append(func.lower(User.email).in_(emails))
+    users = db.execute(select(User.id, User.email, User.role).where(or_(*filters))).all() if filters else []
+
+    found_ids = {user.id for user in users}
+    found_emails = {user.email.lower() for user in users}
+    not_found = [str(i) for i in learner_ids - found_ids] + sorted(emails[e] for e in emails.keys() - found_emails)
+    not_learners = [user.id for user in users if user.role != UserRole.learner]
+    targets = sorted({user.id for user in users if user.role == UserRole.learner})
+
+    created = []
+    stmt = _insert_ignoring_duplicates(db)
+    for start in range(0, len(targets), chunk_size):
+        chunk = targets[start:start + chunk_size]
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "learner_id": learner_id,
+                "course_id": course_id,
+                "progress_percent": 0,
+                "status": CourseStatus.NOT_STARTED
+            }
+            for learner_id in chunk
+        ]
+        created.extend(db.execute(stmt.values(rows)).scalars().all())
+        yield {"processed": start + len(chunk), "total": len(targets), "pending": len(created)}
+
+    if created:
+        publish_invalidation(db, COURSE_ACTIVITY, course_id)
+        publish_invalidation(db, LEARNER_PROGRESS_CHANGED, *created)
+    db.commit()
+
+    if created:
+        for learner_id in created:
+            record_leaderboard_completion(learner_id, course_id, 0)
+        publish_event(course_id, "enrollments_created", learner_ids=created, count=len(created), status=CourseStatus.NOT_STARTED)
+
+    yield {
+        "done": True,
+        "created": len(created),
+        "skipped": len(targets) - len(created) + len(not_learners),
+        "not_found": len(not_found),
+        "not_found_identifiers": not_found[:100]
+    }
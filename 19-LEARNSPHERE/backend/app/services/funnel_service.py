@@ -0,0 +1,137 @@
+import time
+import uuid
+import threading
+import logging
+from datetime import datetime, timezone
+from sqlalchemy import select, func, and_
+from sqlalchemy.orm import Session
+from app.db.session import SessionLocal
+from app.models.course import Enrollment
+from app.models.lesson import Lesson
+from app.models.progress import LessonProgress
+from app.core.cache import TTLCache
+
+logger = logging.getLogger("funnel")
+
+# Reports older than this are served but refreshed in the background
+FUNNEL_STALE_SECONDS = 300
+# Reports older than this are never served; the next request recomputes synchronously
+FUNNEL_MAX_AGE_SECONDS = 3600
+
+_funnel_cache = TTLCache("lesson_funnel", ttl_seconds=FUNNEL_MAX_AGE_SECONDS, maxsize=512)
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+def compute_lesson_funnel(db: Session, course_id: uuid.UUID) -> dict:
+    """
+    Share of enrolled learners who reached each lesson, in order_index order.
+    A learner has reached a lesson when they have progress on it or on any later lesson.
+    Ranking, cumulative counts and step drop-off are all window functions evaluated in SQL.
+    """
+    lesson_ranks = select(
+        Lesson.id.label("lesson_id"),
+        Lesson.title,
+        Lesson.order_index,
+        func.row_number().over(order_by=(Lesson.order_index, Lesson.id)).label("position")
+    ).where(Lesson.course_id == course_id).subquery()
+
+    # Furthest lesson position each enrolled learner has touched
+    furthest = select(
+        LessonProgress.learner_id,
+        func.max(lesson_ranks.c.position).label("position")
+    ).join(lesson_ranks, lesson_ranks.c.lesson_id == LessonProgress.lesson_id)\
+        .join(Enrollment, and_(Enrollment.learner_id == LessonProgress.learner_id, Enrollment.course_id == course_id))\
+        .where(LessonProgress.progress_percent > 0)\
+        .group_by(LessonProgress.learner_id).subquery()
+
+    stopped_at = select(
+        furthest.c.position,
+        func.count().label("learners")
+    ).group_by(furthest.c.position).subquery()
+
+    # Learners who reached position k = learners whose furthest position is k or later
+    reached = select(
+        lesson_ranks.c.lesson_id,
+        lesson_ranks.c.title,
+        lesson_ranks.c.order_index,
+        lesson_ranks.c.position,
+        func.coalesce(
+            func.sum(stopped_at.c.learners).over(order_by=lesson_ranks.c.position.desc()), 0
+        ).label("reached")
+    ).outerjoin(stopped_at, stopped_at.c.position == lesson_ranks.c.position).subquery()
+
+    enrolled = select(func.count()).select_from(Enrollment)\
+        .where(Enrollment.course_id == course_id).scalar_subquery()
+
+    stmt = select(
+        reached.c.lesson_id,
+        reached.c.title,
+        reached.c.order_index,
+        reached.c.reached,
+        func.lag(reached.c.reached).over(order_by=reached.c.position).label("previous_reached"),
+        enrolled.label("enrolled")
+    ).order_by(reached.c.position)
+
+    rows = db.execute(stmt).all()
+    total_enrolled = rows[0].enrolled if rows else db.execute(select(enrolled)).scalar()
+
+    steps = []
+    for row in rows:
+        reached_count = int(row.reached or 0)
+        previous = total_enrolled if row.previous_reached is None else int(row.previous_reached)
+        steps.append({
+            "lesson_id": str(row.lesson_id),
+            "title": row.title,
+            "order_index": row.order_index,
+            "reached": reached_count,
+            "share": round(reached_count / total_enrolled, 4) if total_enrolled else 0.0,
+            "dropped_before": previous - reached_count
+        })
+
+    return {
+        "course_id": str(course_id),
+        "enrolled": total_enrolled,
+        "steps": steps,
+        "generated_at": datetime.now(timezone.utc).isoformat()
+    }
+
+def refresh_lesson_funnel(course_id: uuid.UUID):
+    """
+    Recomputes a course funnel on its own session. Meant to run as a background task.
+    """
+    db = SessionLocal()
+    try:
+        report = compute_lesson_funnel(db, course_id)
+        _funnel_cache.set(course_id, (time.monotonic(), report))
+    except Exception as e:
+        logger.error("Funnel refresh failed for course %s: %s", course_id, e)
+    finally:
+        db.close()
+        with _refreshing_lock:
+            _refreshing.discard(course_id)
+
+def _claim_refresh(course_id: uuid.UUID) -> bool:
+    with _refreshing_lock:
+        if course_id in _refreshing:
+            return False
+        _refreshing.add(course_id)
+        return True
+
+def get_lesson_funnel(db: Session, course_id: uuid.UUID, background_tasks, force_refresh: bool = False) -> dict:
+    """
+    Serves the cached funnel when it is within the staleness bound.
+    Stale or explicitly refreshed reports are recomputed in the background; missing ones synchronously.
+    """
+    entry = _funnel_cache.get(course_id)
+    if entry is None:
+        report = compute_lesson_funnel(db, course_id)
+        _funnel_cache.set(course_id, (time.monotonic(), report))
+        return {**report, "age_seconds": 0, "stale": False, "refreshing": False}
+
+    computed_at, report = entry
+    age = time.monotonic() - computed_at
+    stale = age > FUNNEL_STALE_SECONDS
+    if (stale or force_refresh) and _claim_refresh(course_id):
+        background_tasks.add_task(refresh_lesson_funnel, course_id)
+
+    return {**report, "age_seconds": int(age), "stale": stale, "refreshing": course_id in _refreshing}
@@ -0,0 +1,119 @@
+import uuid
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.db.replicas import open_read_session
+from app.models.course import Course, Enrollment
+from app.models.tracking import UserActivityLog, PerformanceAnalysis
+from app.services.next_lesson_service import get_next_lessons
+from app.services.performance_service import update_user_performance, serialize_performance
+
+RECENT_ACTIVITY_LIMIT = 10
+
+def _enrollments(db: Session, user_id: uuid.UUID) -> list:
+    rows = db.query(
+        Course.id, Course.course_name, Course.description,
+        Enrollment.id, Enrollment.progress_percent, Enrollment.status
+    )\
+        .join(Enrollment, Course.id == Enrollment.course_id)\
+        .filter(Enrollment.learner_id == user_id)\
+        .all()
+    return [
+        {
+            "course_id": str(course_id),
+            "course_name": course_name,
+            "description": description,
+            "enrollment_id": enrollment_id,
+            "progress_percent": progress_percent,
+            "status": status
+        }
+        for course_id, course_name, description, enrollment_id, progress_percent, status in rows
+    ]
+
+def _performance(db: Session, user_id: uuid.UUID):
+    performance = db.query(PerformanceAnalysis).filter(PerformanceAnalysis.user_id == user_id).first()
+    return serialize_performance(performance) if performance else None
+
+def _recent_activity(db: Session, user_id: uuid.UUID) -> list:
+    rows = db.query(UserActivityLog.activity_type, UserActivityLog.metadata_json, UserActivityLog.created_at)\
+        .filter(UserActivityLog.user_id == user_id)\
+        .order_by(UserActivityLog.created_at.desc())\
+        .limit(RECENT_ACTIVITY_LIMIT)\
+        .all()
+    return [
+        {"activity_type": activity_type, "metadata": metadata, "created_at": created_at}
+        for activity_type, metadata, created_at in rows
+    ]
+
+# Independent reads behind the home screen (none depends on another's result), and whether they
+# may read from a replica. Next lessons come from the primary: they fill the long-lived learner state cache
+HOME_PARTS = {
+    "enrollments": (_enrollments, True),
+    "performance": (_performance, True),
+    "recent_activity": (_recent_activity, True),
+    "next_lessons": (get_next_lessons, False),
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    One pool per worker process for every home request: HOME_QUERY_WORKERS threads bound how many
+    part queries (and so pooled connections) are in flight at once, whatever the request rate.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=settings.HOME_QUERY_WORKERS, thread_name_prefix="home-query")
+    return _executor
+
+def _run_part(part, replica_ok: bool, user_id: uuid.UUID):
+    db = open_read_session(user_id) if replica_ok else SessionLocal()
+    try:
+        return part(db, user_id)
+    finally:
+        db.close()
+
+def _load_parts(db: Session, read_db: Session, user_id: uuid.UUID) -> dict:
+    if settings.HOME_QUERY_WORKERS <= 0:
+        return {
+            name: part(read_db if replica_ok else db, user_id)
+            for name, (part, replica_ok) in HOME_PARTS.items()
+        }
+    # The parts bring their own sessions: give the request's connections back to the pool meanwhile
+    # instead of holding them idle in a transaction (both sessions stay usable afterwards)
+    read_db.close()
+    db.close()
+    executor = _get_executor()
+    # Each part runs in a copy of the request context, so its queries count against the request
+    futures = {
+        name: executor.submit(contextvars.copy_context().run, _run_part, part, replica_ok, user_id)
+        for name, (part, replica_ok) in HOME_PARTS.items()
+    }
+    return {name: future.result() for name, future in futures.items()}
+
+def get_learner_home(db: Session, read_db: Session, user_id: uuid.UUID) -> dict:
+    """
+    Everything the learner home screen shows: enrollments with progress and their next lesson,
+    the performance snapshot and recent activity. With HOME_QUERY_WORKERS the parts load
+    concurrently, each on its own session. A first visit computes the performance snapshot on
+    the primary (`db`), as /performance/me does.
+    """
+    parts = _load_parts(db, read_db, user_id)
+    performance = parts["performance"]
+    if performance is None:
+        performance = serialize_performance(update_user_performance(user_id, db))
+    next_lessons = {lesson["course_id"]: lesson for lesson in parts["next_lessons"]}
+    enrollments = parts["enrollments"]
+    for enrollment in enrollments:
+        enrollment["next_lesson"] = next_lessons.get(enrollment["course_id"])
+    return {
+        "enrollments": enrollments,
+        "performance": performance,
+        "recent_activity": parts["recent_activity"]
+    }
@@ -0,0 +1,305 @@
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from abc import ABC, abstractmethod
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.ranked_set import RankedSet
+from app.core.shared_store import get_redis_client
+from app.db.session import SessionLocal
+from app.models.course import Enrollment
+from app.models.tracking import QuizAttempt
+
+logger = logging.getLogger("leaderboard")
+
+METRIC_SCORE = "score"           # average quiz score in the course
+METRIC_COMPLETION = "completion" # enrollment progress percent
+METRICS = (METRIC_SCORE, METRIC_COMPLETION)
+
+def board_name(course_id, metric: str) -> str:
+    return f"{course_id}:{metric}"
+
+class LeaderboardBackend(ABC):
+    """
+    Storage for ranked boards. Members are user id strings, rank 1 is the highest score.
+    """
+
+    @abstractmethod
+    def update(self, board: str, member: str, score: float):
+        ...
+
+    @abstractmethod
+    def remove(self, board: str, member: str):
+        ...
+
+    @abstractmethod
+    def rank(self, board: str, member: str):
+        """
+        (rank, score) for the member, or None when they are not on the board.
+        """
+        ...
+
+    @abstractmethod
+    def top(self, board: str, k: int, offset: int = 0):
+        ...
+
+    @abstractmethod
+    def size(self, board: str) -> int:
+        ...
+
+    @abstractmethod
+    def replace_all(self, boards: dict):
+        """
+        Swaps in freshly rebuilt boards: {board: [(member, score), ...]}.
+        """
+        ...
+
+    @abstractmethod
+    def is_empty(self) -> bool:
+        ...
+
+    def export(self) -> dict:
+        return {}
+
+class InMemoryLeaderboardBackend(LeaderboardBackend):
+    """
+    Per-process boards. Each uvicorn worker holds its own copy and only sees the writes it
+    handled itself, so this backend is for single-worker deployments.
+    """
+
+    def __init__(self):
+        self._boards = {}
+        self._lock = threading.Lock()
+
+    def _board(self, board: str) -> RankedSet:
+        ranked = self._boards.get(board)
+        if ranked is None:
+            ranked = self._boards.setdefault(board, RankedSet())
+        return ranked
+
+    def update(self, board, member, score):
+        with self._lock:
+            self._board(board).update(member, float(score))
+
+    def remove(self, board, member):
+        with self._lock:
+            ranked = self._boards.get(board)
+            if ranked is not None:
+                ranked.remove(member)
+
+    def rank(self, board, member):
+        with self._lock:
+            ranked = self._boards.get(board)
+            if ranked is None or member not in ranked:
+                return None
+            return ranked.rank(member), ranked.score(member)
+
+    def top(self, board, k, offset=0):
+        with self._lock:
+            ranked = self._boards.get(board)
+            return ranked.top(k, offset) if ranked is not None else []
+
+    def size(self, board):
+        ranked = self._boards.get(board)
+        return len(ranked) if ranked is not None else 0
+
+    def replace_all(self, boards):
+        rebuilt = {}
+        for board, entries in boards.items():
+            ranked = RankedSet()
+            for member, score in entries:
+                ranked.update(member, float(score))
+            rebuilt[board] = ranked
+        with self._lock:
+            self._boards = rebuilt
+
+    def is_empty(self):
+        return not self._boards
+
+    def export(self):
+        with self._lock:
+            return {board: ranked.items() for board, ranked in self._boards.items()}
+
+class RedisLeaderboardBackend(LeaderboardBackend):
+    """
+    Boards kept as Redis sorted sets so every worker reads and writes the same ranking.
+    """
+
+    KEY_PREFIX = "leaderboard:"
+
+    def __init__(self, client):
+        self._redis = client
+
+    def _key(self, board):
+        return self.KEY_PREFIX + board
+
+    def update(self, board, member, score):
+        self._redis.zadd(self._key(board), {member: float(score)})
+
+    def remove(self, board, member):
+        self._redis.zrem(self._key(board), member)
+
+    def rank(self, board, member):
+        pipe = self._redis.pipeline()
+        pipe.zrevrank(self._key(board), member)
+        pipe.zscore(self._key(board), member)
+        rank, score = pipe.execute()
+        if rank is None:
+            return None
+        return rank + 1, score
+
+    def top(self, board, k, offset=0):
+        if k <= 0:
+            return []
+        return self._redis.zrevrange(self._key(board), offset, offset + k - 1, withscores=True)
+
+    def size(self, board):
+        return self._redis.zcard(self._key(board))
+
+    def replace_all(self, boards):
+        pipe = self._redis.pipeline()
+        for board, entries in boards.items():
+            pipe.delete(self._key(board))
+            if entries:
+                pipe.zadd(self._key(board), {member: float(score) for member, score in entries})
+        pipe.execute()
+
+    def is_empty(self):
+        return next(self._redis.scan_iter(match=self.KEY_PREFIX + "*", count=1), None) is None
+
+_backend = None
+
+def get_leaderboard_backend() -> LeaderboardBackend:
+    global _backend
+    if _backend is None:
+        if settings.LEADERBOARD_BACKEND == "redis":
+            _backend = RedisLeaderboardBackend(get_redis_client())
+        else:
+            _backend = InMemoryLeaderboardBackend()
+    return _backend
+
+def record_leaderboard_score(db: Session, user_id: uuid.UUID, course_id: uuid.UUID):
+    """
+    Refreshes the learner's average-score entry after a quiz submission.
+    """
+    avg_score = db.query(func.avg(QuizAttempt.score)).filter(
+        QuizAttempt.user_id == user_id,
+        QuizAttempt.course_id == course_id
+    ).scalar()
+    if avg_score is not None:
+        get_leaderboard_backend().update(board_name(course_id, METRIC_SCORE), str(user_id), round(float(avg_score), 2))
+
+def record_leaderboard_completion(user_id: uuid.UUID, course_id: uuid.UUID, progress_percent: int):
+    get_leaderboard_backend().update(board_name(course_id, METRIC_COMPLETION), str(user_id), progress_percent or 0)
+
+def get_leaderboard(course_id: uuid.UUID, metric: str, limit: int = 10, offset: int = 0, user_id: uuid.UUID = None) -> dict:
+    backend = get_leaderboard_backend()
+    board = board_name(course_id, metric)
+    top = backend.top(board, limit, offset)
+    me = backend.rank(board, str(user_id)) if user_id is not None else None
+    return {
+        "total": backend.size(board),
+        "entries": [
+            {"rank": offset + i + 1, "user_id": member, "score": score}
+            for i, (member, score) in enumerate(top)
+        ],
+        "me": {"rank": me[0], "score": me[1]} if me else None
+    }
+
+def rebuild_leaderboards(db: Session):
+    """
+    Recomputes every course board from the database.
+    """
+    boards = {}
+    score_rows = db.query(QuizAttempt.course_id, QuizAttempt.user_id, func.avg(QuizAttempt.score))\
+        .group_by(QuizAttempt.course_id, QuizAttempt.user_id)\
+        .all()
+    for course_id, user_id, avg_score in score_rows:
+        boards.setdefault(board_name(course_id, METRIC_SCORE), []).append((str(user_id), round(float(avg_score), 2)))
+
+    completion_rows = db.query(Enrollment.course_id, Enrollment.learner_id, Enrollment.progress_percent).all()
+    for course_id, learner_id, progress in completion_rows:
+        boards.setdefault(board_name(course_id, METRIC_COMPLETION), []).append((str(learner_id), progress or 0))
+
+    get_leaderboard_backend().replace_all(boards)
+    logger.info("Rebuilt %d leaderboards from the database", len(boards))
+
+def save_snapshot(path: str = None):
+    """
+    Writes the in-process boards to disk atomically. Shared backends persist on their own.
+    """
+    boards = get_leaderboard_backend().export()
+    if not boards:
+        return
+    path = path or settings.LEADERBOARD_SNAPSHOT_PATH
+    # Per process, so workers saving at the same time never write into each other's file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"saved_at": time.time(), "boards": boards}, f)
+    os.replace(tmp_path, path)
+
+def load_snapshot(path: str = None, max_age_seconds: int = None) -> bool:
+    path = path or settings.LEADERBOARD_SNAPSHOT_PATH
+    max_age = settings.LEADERBOARD_SNAPSHOT_MAX_AGE_SECONDS if max_age_seconds is None else max_age_seconds
+    try:
+        with open(path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if time.time() - snapshot.get("saved_at", 0) > max_age:
+        return False
+    get_leaderboard_backend().replace_all(snapshot.get("boards", {}))
+    return True
+
+def _snapshot_loop(stop_event: threading.Event, interval: int):
+    while not stop_event.wait(interval):
+        try:
+            save_snapshot()
+        except Exception as e:
+            logger.error("Leaderboard snapshot failed: %s", e)
+
+_snapshot_stop = threading.Event()
+
+def _rebuild_from_database():
+    db = SessionLocal()
+    try:
+        rebuild_leaderboards(db)
+    finally:
+        db.close()
+
+def init_leaderboards():
+    """
+    Startup hook: rebuild the boards from the database, the source of truth. The in-process
+    backend falls back to a recent snapshot only when the database can't be read, since a
+    snapshot misses every write made after it was saved (and all writes by other workers).
+    """
+    backend = get_leaderboard_backend()
+    if isinstance(backend, InMemoryLeaderboardBackend):
+        if int(os.environ.get("WEB_CONCURRENCY", "1")) > 1:
+            logger.error(
+                "LEADERBOARD_BACKEND=memory keeps separate boards in each of the %s workers; "
+                "set LEADERBOARD_BACKEND=redis when running more than one worker",
+                os.environ["WEB_CONCURRENCY"]
+            )
+        try:
+            _rebuild_from_database()
+        except Exception as e:
+            if not load_snapshot():
+                raise
+            logger.warning("Leaderboard rebuild failed (%s); restored the last snapshot instead", e)
+        threading.Thread(
+            target=_snapshot_loop,
+            args=(_snapshot_stop, settings.LEADERBOARD_SNAPSHOT_INTERVAL_SECONDS),
+            name="leaderboard-snapshot",
+            daemon=True
+        ).start()
+    elif backend.is_empty():
+        _rebuild_from_database()
+
+def shutdown_leaderboards():
+    _snapshot_stop.set()
+    save_snapshot()
@@ -0,0 +1,173 @@
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import exists
+from sqlalchemy.orm import Session
+from app.models.mastery import LessonMastery
+from app.models.lesson import Lesson
+from app.models.tracking import QuizAttempt
+
+# Weight of the newest attempt in the rolling score
+MASTERY_ALPHA = 0.4
+WEAK_THRESHOLD = 60
+STRONG_THRESHOLD = 80
+
+def fold_score(ewma_score: float, score: int) -> float:
+    """
+    The rolling mastery score after one more attempt.
+    """
+    return MASTERY_ALPHA * score + (1 - MASTERY_ALPHA) * ewma_score
+
+def record_quiz_score(db: Session, user_id: uuid.UUID, course_id: uuid.UUID, lesson_id: uuid.UUID, score: int) -> LessonMastery:
+    """
+    Folds a quiz score into the user's rolling mastery for that lesson.
+    Does not commit, so the update lands in the same transaction as the attempt.
+    On Postgres and SQLite this is a single upsert, so two submissions racing on a lesson's
+    first attempt both land instead of one hitting the unique constraint.
+    """
+    now = datetime.now(timezone.utc)
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+        statement = insert(LessonMastery).values(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            lesson_id=lesson_id,
+            course_id=course_id,
+            attempt_count=1,
+            ewma_score=float(score),
+            last_score=score,
+            last_attempt_at=now
+        ).on_conflict_do_update(
+            index_elements=["user_id", "lesson_id"],
+            set_={
+                "attempt_count": LessonMastery.attempt_count + 1,
+                "ewma_score": fold_score(LessonMastery.ewma_score, score),
+                "last_score": score,
+                "last_attempt_at": now,
+            }
+        ).returning(LessonMastery)
+        return db.scalars(statement, execution_options={"populate_existing": True}).one()
+
+    mastery = db.query(LessonMastery).filter(
+        LessonMastery.user_id == user_id,
+        LessonMastery.lesson_id == lesson_id
+    ).first()
+
+    if not mastery:
+        mastery = LessonMastery(
+            user_id=user_id,
+            lesson_id=lesson_id,
+            course_id=course_id,
+            attempt_count=0,
+            ewma_score=float(score)
+        )
+        db.add(mastery)
+    else:
+        mastery.ewma_score = fold_score(mastery.ewma_score, score)
+
+    mastery.attempt_count += 1
+    mastery.last_score = score
+    mastery.last_attempt_at = now
+    return mastery
+
+def backfill_lesson_mastery(db: Session, users_per_batch: int = 500) -> int:
+    """
+    Builds mastery rows for quiz attempts made before lesson_mastery existed, replaying each
+    (user, lesson)'s attempts oldest first through the rolling score. Pairs that already have a
+    row are left alone, so it can be rerun. Works through users in batches, committing each.
+    Returns the number of rows written.
+    """
+    has_mastery = exists().where(
+        LessonMastery.user_id == QuizAttempt.user_id,
+        LessonMastery.lesson_id == QuizAttempt.quiz_id
+    )
+    written = 0
+    last_user_id = None
+    while True:
+        query = db.query(QuizAttempt.user_id).distinct().order_by(QuizAttempt.user_id)
+        if last_user_id is not None:
+            query = query.filter(QuizAttempt.user_id > last_user_id)
+        user_ids = [row[0] for row in query.limit(users_per_batch).all()]
+        if not user_ids:
+            return written
+        last_user_id = user_ids[-1]
+
+        attempts = db.query(QuizAttempt.user_id, QuizAttempt.quiz_id, QuizAttempt.course_id, QuizAttempt.score, QuizAttempt.created_at)\
+            .filter(QuizAttempt.user_id.in_(user_ids), ~has_mastery)\
+            .order_by(QuizAttempt.user_id, QuizAttempt.quiz_id, QuizAttempt.created_at, QuizAttempt.id)\
+            .all()
+        rows = {}
+        for user_id, lesson_id, course_id, score, created_at in attempts:
+            score = score or 0
+            row = rows.get((user_id, lesson_id))
+            if row is None:
+                rows[(user_id, lesson_id)] = {
+                    "id": uuid.uuid4(),
+                    "user_id": user_id,
+                    "lesson_id": lesson_id,
+                    "course_id": course_id,
+                    "attempt_count": 1,
+                    "ewma_score": float(score),
+                    "last_score": score,
+                    "last_attempt_at": created_at
+                }
+            else:
+                row["attempt_count"] += 1
+                row["ewma_score"] = fold_score(row["ewma_score"], score)
+                row["last_score"] = score
+                row["last_attempt_at"] = created_at
+        if rows:
+            db.execute(LessonMastery.__table__.insert(), list(rows.values()))
+            db.commit()
+            written += len(rows)
+
+def _mastery_rows(db: Session, user_id: uuid.UUID):
+    return db.query(LessonMastery, Lesson.title)\
+        .join(Lesson, Lesson.id == LessonMastery.lesson_id)\
+        .filter(LessonMastery.user_id == user_id)
+
+def get_weak_topics(db: Session, user_id: uuid.UUID, limit: int = 5):
+    """
+    Lowest rolling scores first, only below the weak threshold.
+    """
+    return _mastery_rows(db, user_id)\
+        .filter(LessonMastery.ewma_score < WEAK_THRESHOLD)\
+        .order_by(LessonMastery.ewma_score.asc())\
+        .limit(limit)\
+        .all()
+
+def get_strong_topics(db: Session, user_id: uuid.UUID, limit: int = 5):
+    """
+    Highest rolling scores first, only at or above the strong threshold.
+    """
+    return _mastery_rows(db, user_id)\
+        .filter(LessonMastery.ewma_score >= STRONG_THRESHOLD)\
+        .order_by(LessonMastery.ewma_score.desc())\
+        .limit(limit)\
+        .all()
+
+def get_review_topics(db: Session, user_id: uuid.UUID, limit: int = 5):
+    """
+    Lessons not yet mastered, least recently attempted first.
+    """
+    return _mastery_rows(db, user_id)\
+        .filter(LessonMastery.ewma_score < STRONG_THRESHOLD)\
+        .order_by(LessonMastery.last_attempt_at.asc())\
+        .limit(limit)\
+        .all()
+
+def serialize_mastery(rows) -> list:
+    return [
+        {
+            "lesson_id": str(mastery.lesson_id),
+            "course_id": str(mastery.course_id),
+            "title": title,
+            "score": round(mastery.ewma_score, 1),
+            "attempts": mastery.attempt_count,
+            "last_attempt_at": mastery.last_attempt_at.isoformat() if mastery.last_attempt_at else None
+        }
+        for mastery, title in rows
+    ]
@@ -0,0 +1,137 @@
+import uuid
+import threading
+from sqlalchemy.orm import Session
+from app.models.course import Enrollment
+from app.models.lesson import Lesson
+from app.models.progress import LessonProgress
+from app.models.mastery import LessonMastery
+from app.core.cache import TTLCache
+from app.services.course_lessons_service import get_course_lesson_indexes, CourseLessonIndex
+from app.services.mastery_service import STRONG_THRESHOLD
+
+REVIEW_CANDIDATES = 10
+
+_learner_state_cache = TTLCache("learner_lesson_state", ttl_seconds=1800, maxsize=50000)
+
+class LearnerLessonState:
+    """
+    Per-learner recommender state: one completion bitset per enrolled course, where bit i
+    is set once the lesson at position i of the course's ordered lesson array is complete,
+    plus the learner's weakest lessons by rolling quiz score. `versions` records which lesson
+    order each bitset was built against; after lessons are inserted or reordered it is rebuilt.
+    """
+
+    def __init__(self, completion: dict, versions: dict, review: list):
+        self.completion = completion
+        self.versions = versions
+        self.review = review
+        self.lock = threading.Lock()
+
+    def matches(self, indexes: dict) -> bool:
+        return all(indexes[course_id].version == self.versions.get(course_id) for course_id in self.completion)
+
+def _load_learner_state(db: Session, user_id: uuid.UUID) -> LearnerLessonState:
+    course_ids = [row[0] for row in db.query(Enrollment.course_id).filter(Enrollment.learner_id == user_id).all()]
+    completion = {course_id: 0 for course_id in course_ids}
+    versions = {}
+
+    if course_ids:
+        completed = db.query(Lesson.course_id, LessonProgress.lesson_id)\
+            .join(Lesson, Lesson.id == LessonProgress.lesson_id)\
+            .filter(
+                LessonProgress.learner_id == user_id,
+                LessonProgress.progress_percent >= 100,
+                Lesson.course_id.in_(course_ids)
+            ).all()
+        indexes = get_course_lesson_indexes(db, course_ids)
+        versions = {course_id: indexes[course_id].version for course_id in course_ids}
+        for course_id, lesson_id in completed:
+            index = indexes[course_id]
+            if lesson_id in index:
+                completion[course_id] |= 1 << index.position[lesson_id]
+
+    review = db.query(LessonMastery.course_id, LessonMastery.lesson_id, LessonMastery.ewma_score)\
+        .filter(LessonMastery.user_id == user_id, LessonMastery.ewma_score < STRONG_THRESHOLD)\
+        .order_by(LessonMastery.ewma_score.asc())\
+        .limit(REVIEW_CANDIDATES)\
+        .all()
+
+    return LearnerLessonState(completion, versions, [tuple(row) for row in review])
+
+def get_learner_state(db: Session, user_id: uuid.UUID) -> LearnerLessonState:
+    state = _learner_state_cache.get(user_id)
+    if state is None:
+        state = _load_learner_state(db, user_id)
+        _learner_state_cache.set(user_id, state)
+    return state
+
+def mark_lesson_completion(user_id: uuid.UUID, lesson_index: CourseLessonIndex, lesson_id: uuid.UUID, completed: bool):
+    """
+    Keeps a cached bitset in step with a lesson progress write. Uncached learners load lazily.
+    """
+    state = _learner_state_cache.get(user_id)
+    if state is None or lesson_index.course_id not in state.completion or lesson_id not in lesson_index:
+        return
+    if state.versions.get(lesson_index.course_id) != lesson_index.version:
+        # The bitset predates the course's current lesson order; reload it on next use
+        _learner_state_cache.invalidate(user_id)
+        return
+    bit = 1 << lesson_index.position[lesson_id]
+    with state.lock:
+        if completed:
+            state.completion[lesson_index.course_id] |= bit
+        else:
+            state.completion[lesson_index.course_id] &= ~bit
+
+def _first_unset_bit(mask: int) -> int:
+    return (~mask & (mask + 1)).bit_length() - 1
+
+def get_next_lessons(db: Session, user_id: uuid.UUID) -> list:
+    """
+    The first unfinished lesson, in order_index order, of every enrolled course that is not complete.
+    """
+    state = get_learner_state(db, user_id)
+    indexes = get_course_lesson_indexes(db, list(state.completion))
+    if not state.matches(indexes):
+        # A course's lessons changed since the bitsets were built, so their positions no longer line up
+        state = _load_learner_state(db, user_id)
+        _learner_state_cache.set(user_id, state)
+        indexes = get_course_lesson_indexes(db, list(state.completion))
+    completion = list(state.completion.items())
+    next_lessons = []
+    for course_id, mask in completion:
+        index = indexes[course_id]
+        position = _first_unset_bit(mask)
+        if position >= len(index):
+            continue
+        next_lessons.append({
+            "course_id": str(course_id),
+            "lesson_id": str(index.lesson_ids[position]),
+            "title": index.titles[position],
+            "order_index": index.order_indexes[position],
+            "completed_lessons": bin(mask).count("1"),
+            "total_lessons": len(index)
+        })
+    return next_lessons
+
+def get_review_lessons(db: Session, user_id: uuid.UUID, limit: int = 5) -> list:
+    """
+    Lessons in enrolled courses that need review, weakest rolling score first.
+    """
+    state = get_learner_state(db, user_id)
+    candidates = [row for row in state.review if row[0] in state.completion]
+    indexes = get_course_lesson_indexes(db, {course_id for course_id, _, _ in candidates})
+    review = []
+    for course_id, lesson_id, score in candidates:
+        index = indexes[course_id]
+        if lesson_id not in index:
+            continue
+        review.append({
+            "course_id": str(course_id),
+            "lesson_id": str(lesson_id),
+            "title": index.titles[index.position[lesson_id]],
+            "score": round(score, 1)
+        })
+        if len(review) >= limit:
+            break
+    return review
@@ -4,17 +4,19 @@ from sqlalchemy import func
 from app.models.tracking import LearningSession, QuizAttempt, PerformanceAnalysis
 from app.models.progress import LessonProgress
 from app.models.course import Enrollment, Course
-from app.models.lesson import Lesson
+from app.services.mastery_service import get_weak_topics
 
 def update_user_performance(user_id: uuid.UUID, db: Session):
     """
     Recalculates metrics for a user and updates or creates their PerformanceAnalysis record.
     """
     
-    # 1. Total Learning Time (Seconds)
-    total_time_res = db.query(func.sum(LearningSession.duration_seconds)).filter(
+    # 1. Total Learning Time (Seconds), with the session count used for engagement below
+    total_time_res, learning_sessions_count = db.query(
+        func.sum(LearningSession.duration_seconds), func.count(LearningSession.id)
+    ).filter(
         LearningSession.user_id == user_id
-    ).scalar()
+    ).one()
     total_learning_time = total_time_res or 0
 
     # 2. Average Quiz Score
@@ -29,24 +31,11 @@ def update_user_performance(user_id: uuid.UUID, db: Session):
     ).scalar()
     completion_percentage = float(avg_completion_res) if avg_completion_res else 0.0
 
-    # 4. Weak topics / engagement trend logic (simplified heuristic)
-    # Weak topics: quizzes where score < 60
-    weak_quizzes = db.query(QuizAttempt).filter(
-        QuizAttempt.user_id == user_id, 
-        QuizAttempt.score < 60
-    ).all()
-    
-    weak_topics_set = set()
-    for w in weak_quizzes:
-        lesson = db.query(Lesson).filter(Lesson.id == w.quiz_id).first()
-        if lesson:
-            weak_topics_set.add(lesson.title)
-    
-    weak_topics = list(weak_topics_set)[:5] # Keep it compact
+    # 4. Weak topics: lowest rolling mastery scores, one indexed top-k read
+    weak_topics = [title for _, title in get_weak_topics(db, user_id, limit=5)]
     
     # 5. Engagement level
     engagement_level = "low"
-    learning_sessions_count = db.query(LearningSession).filter(LearningSession.user_id == user_id).count()
     if learning_sessions_count > 20 and total_learning_time > 3600:
         engagement_level = "high"
     elif learning_sessions_count > 5:
@@ -78,6 +67,15 @@ def update_user_performance(user_id: uuid.UUID, db: Session):
     performance.learning_trend = learning_trend
     
     db.commit()
-    db.refresh(performance)
     
     return performance
+
+def serialize_performance(performance: PerformanceAnalysis) -> dict:
+    return {
+        "total_learning_time": performance.total_learning_time,
+        "average_score": performance.average_score,
+        "completion_percentage": performance.completion_percentage,
+        "weak_topics": performance.weak_topics,
+        "engagement_level": performance.engagement_level,
+        "learning_trend": performance.learning_trend
+    }
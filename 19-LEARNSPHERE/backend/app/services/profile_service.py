@@ -0,0 +1,88 @@
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.models.profile import UserProfile
+from app.core.cache import TTLCache
+
+_profile_cache = TTLCache("user_profiles", ttl_seconds=600, maxsize=50000)
+# Email -> user_id, only a hint for finding a cached snapshot by email; a miss always re-queries
+_user_id_by_email = TTLCache("user_ids_by_email", ttl_seconds=600, maxsize=50000)
+
+class ProfileSnapshot:
+    """
+    What the profile screens show of one user: the account email plus the optional UserProfile row.
+    """
+
+    __slots__ = ("user_id", "email", "display_name", "avatar_url", "bio", "has_profile")
+
+    def __init__(self, row):
+        self.user_id = row.id
+        self.email = row.email
+        self.display_name = row.display_name
+        self.avatar_url = row.avatar_url
+        self.bio = row.bio
+        self.has_profile = row.user_id is not None
+
+    @property
+    def username(self) -> str:
+        return self.email.split("@")[0]
+
+    @property
+    def name(self) -> str:
+        """
+        The display name, falling back to the email's local part.
+        """
+        return self.display_name or self.username
+
+    def to_dict(self) -> dict:
+        return {
+            "displayName": self.display_name,
+            "username": self.username,
+            "email": self.email,
+            "phone": None,
+            "bio": self.bio,
+            "location": None,
+            "interests": None,
+            "updatedAt": None
+        }
+
+def _snapshot_query(db: Session):
+    return db.query(User.id, User.email, UserProfile.user_id, UserProfile.display_name, UserProfile.avatar_url, UserProfile.bio)\
+        .outerjoin(UserProfile, UserProfile.user_id == User.id)
+
+def _remember(snapshot: ProfileSnapshot):
+    _profile_cache.set(snapshot.user_id, snapshot)
+    _user_id_by_email.set(snapshot.email, snapshot.user_id)
+
+def get_profile_by_email(db: Session, email: str):
+    """
+    The user's snapshot, or None when no user has this email. One joined query on a miss.
+    """
+    user_id = _user_id_by_email.get(email)
+    snapshot = _profile_cache.get(user_id) if user_id is not None else None
+    if snapshot is not None and snapshot.email == email:
+        return snapshot
+    row = _snapshot_query(db).filter(User.email == email).first()
+    if row is None:
+        return None
+    snapshot = ProfileSnapshot(row)
+    _remember(snapshot)
+    return snapshot
+
+def get_profiles(db: Session, user_ids) -> dict:
+    """
+    Snapshots for many users at once (unknown ids are left out); every uncached user is loaded in a single query.
+    """
+    profiles = {}
+    missing = []
+    for user_id in user_ids:
+        snapshot = _profile_cache.get(user_id)
+        if snapshot is None:
+            missing.append(user_id)
+        else:
+            profiles[user_id] = snapshot
+    if missing:
+        for row in _snapshot_query(db).filter(User.id.in_(missing)).all():
+            snapshot = ProfileSnapshot(row)
+            _remember(snapshot)
+            profiles[snapshot.user_id] = snapshot
+    return profiles
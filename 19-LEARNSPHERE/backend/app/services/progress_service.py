@@ -0,0 +1,86 @@
+import uuid
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+from app.models.course import Enrollment
+from app.models.progress import LessonProgress
+from app.models.enums import CourseStatus, ProgressStatus
+from app.services.course_lessons_service import CourseLessonIndex
+from app.core.events import publish_event
+
+def lesson_status_for(percent: int) -> ProgressStatus:
+    if percent >= 100:
+        return ProgressStatus.completed
+    if percent > 0:
+        return ProgressStatus.in_progress
+    return ProgressStatus.not_started
+
+def course_status_for(percent: int) -> CourseStatus:
+    if percent >= 100:
+        return CourseStatus.COMPLETED
+    if percent > 0:
+        return CourseStatus.IN_PROGRESS
+    return CourseStatus.NOT_STARTED
+
+def pending_progress_change(enrollment: Enrollment) -> tuple:
+    """
+    (previous_percent, previous_status, percent, status) for an enrollment with uncommitted changes.
+    Call before commit; the values stay usable after the instance expires.
+    """
+    attrs = inspect(enrollment).attrs
+    def previous(name):
+        history = attrs[name].history
+        return history.deleted[0] if history.deleted else getattr(enrollment, name)
+    return previous("progress_percent"), previous("status"), enrollment.progress_percent, enrollment.status
+
+def publish_progress_change(course_id: uuid.UUID, learner_id: uuid.UUID, change: tuple):
+    """
+    Dashboard delta for a committed change captured with pending_progress_change.
+    """
+    previous_percent, previous_status, percent, status = change
+    if status != previous_status:
+        event_type = "status_changed"
+    elif percent != previous_percent:
+        event_type = "progress_changed"
+    else:
+        return
+    publish_event(
+        course_id, event_type,
+        learner_id=learner_id,
+        previous_status=previous_status,
+        status=status,
+        progress_percent=percent
+    )
+
+def rollup_enrollment_progress(db: Session, user_id: uuid.UUID, lesson_index: CourseLessonIndex):
+    """
+    Derives the enrollment's progress and status from the learner's lesson progress,
+    weighting each lesson by its share of the course duration.
+    Does not commit, so the rollup lands in the same transaction as the lesson write.
+    Returns None when the learner is not enrolled in the course.
+    """
+    enrollment = db.query(Enrollment).filter(
+        Enrollment.learner_id == user_id,
+        Enrollment.course_id == lesson_index.course_id
+    ).first()
+    if not enrollment:
+        return None
+
+    if lesson_index.total_weight:
+        # Sessions run with autoflush off, so push the pending lesson write first
+        db.flush()
+        rows = db.query(LessonProgress.lesson_id, LessonProgress.progress_percent).filter(
+            LessonProgress.learner_id == user_id,
+            LessonProgress.lesson_id.in_(lesson_index.lesson_ids)
+        ).all()
+        earned = sum(
+            lesson_index.weight_of(lesson_id) * max(0, min(100, percent or 0))
+            for lesson_id, percent in rows
+        )
+        # Floor so that a course only reads 100% once every lesson is complete
+        percent = int(earned // lesson_index.total_weight)
+    else:
+        percent = 0
+
+    enrollment.progress_percent = percent
+    enrollment.status = course_status_for(percent)
+    return enrollment
@@ -1,5 +1,7 @@
+import time
 import httpx
 from app.core.config import settings
+from app.core.metrics import QUBRID_REQUEST_DURATION, QUBRID_TOKENS
 
 async def ask_qubrid(prompt: str) -> str:
     """
@@ -20,11 +22,22 @@ async def ask_qubrid(prompt: str) -> str:
         "stream": False
     }
 
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        response = await client.post(url, headers=headers, json=payload)
-        response.raise_for_status()
-        data = response.json()
-        
-        # Safely parse both Qubrid native and OpenAI compatible structures
-        text = data.get("content") or data.get("choices", [{}])[0].get("message", {}).get("content", "")
-        return text.strip()
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            response = await client.post(url, headers=headers, json=payload)
+            response.raise_for_status()
+            data = response.json()
+        outcome = "ok"
+    finally:
+        QUBRID_REQUEST_DURATION.observe(time.perf_counter() - started, outcome=outcome)
+
+    usage = data.get("usage") or {}
+    for kind in ("prompt_tokens", "completion_tokens"):
+        if isinstance(usage.get(kind), int):
+            QUBRID_TOKENS.inc(usage[kind], kind=kind.split("_")[0])
+
+    # Safely parse both Qubrid native and OpenAI compatible structures
+    text = data.get("content") or data.get("choices", [{}])[0].get("message", {}).get("content", "")
+    return text.strip()
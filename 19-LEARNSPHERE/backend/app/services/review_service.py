@@ -0,0 +1,144 @@
+import uuid
+import heapq
+import itertools
+import threading
+from datetime import datetime, timezone, timedelta
+from sqlalchemy.orm import Session
+from app.models.review import ReviewItem
+from app.core.cache import TTLCache
+from app.services.course_lessons_service import get_course_lesson_indexes
+
+MIN_EASE = 1.3
+PASSING_QUALITY = 3
+
+_review_queue_cache = TTLCache("review_queues", ttl_seconds=1800, maxsize=50000)
+
+def _quality(score: int) -> int:
+    """
+    Maps a 0-100 quiz score onto the SM-2 0-5 recall quality scale.
+    """
+    return max(0, min(5, round((score or 0) / 20)))
+
+def apply_sm2(item: ReviewItem, score: int, now: datetime):
+    """
+    One SM-2 step for a quiz score: updates the item's ease, interval and due date in place.
+    """
+    quality = _quality(score)
+    if quality < PASSING_QUALITY:
+        item.repetitions = 0
+        item.interval_days = 1.0
+    else:
+        item.repetitions += 1
+        if item.repetitions == 1:
+            item.interval_days = 1.0
+        elif item.repetitions == 2:
+            item.interval_days = 6.0
+        else:
+            item.interval_days = round(item.interval_days * item.ease, 1)
+    item.ease = max(MIN_EASE, item.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    item.last_score = score
+    item.last_reviewed_at = now
+    item.due_at = now + timedelta(days=item.interval_days)
+
+def schedule_review(db: Session, user_id: uuid.UUID, course_id: uuid.UUID, lesson_id: uuid.UUID, score: int) -> ReviewItem:
+    """
+    Updates the learner's review item for a quiz lesson from a new attempt.
+    Does not commit; call update_review_queue after the commit to keep the in-memory queue current.
+    """
+    item = db.query(ReviewItem).filter(
+        ReviewItem.user_id == user_id,
+        ReviewItem.lesson_id == lesson_id
+    ).first()
+    if not item:
+        item = ReviewItem(user_id=user_id, lesson_id=lesson_id, course_id=course_id, ease=2.5, interval_days=0.0, repetitions=0)
+        db.add(item)
+    apply_sm2(item, score, datetime.now(timezone.utc))
+    return item
+
+class ReviewQueue:
+    """
+    Per-learner min-heap of review items keyed on due time.
+    Rescheduled items are pushed again and their old heap entries skipped lazily.
+    """
+
+    def __init__(self, items):
+        self._heap = []
+        self._current = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        for lesson_id, course_id, due_at in items:
+            self._push(lesson_id, course_id, due_at)
+
+    def _push(self, lesson_id, course_id, due_at: datetime):
+        due_ts = _timestamp(due_at)
+        self._current[lesson_id] = (due_ts, course_id)
+        heapq.heappush(self._heap, (due_ts, next(self._counter), lesson_id))
+
+    def update(self, lesson_id, course_id, due_at: datetime):
+        with self._lock:
+            self._push(lesson_id, course_id, due_at)
+            # Compact once stale entries dominate the heap
+            if len(self._heap) > 2 * len(self._current) + 16:
+                self._heap = [(due, next(self._counter), lid) for lid, (due, _) in self._current.items()]
+                heapq.heapify(self._heap)
+
+    def due(self, now_ts: float, limit: int):
+        """
+        [(lesson_id, course_id, due_ts)] for up to `limit` items due at or before now, most overdue first.
+        """
+        result = []
+        popped = []
+        with self._lock:
+            while self._heap and len(result) < limit and self._heap[0][0] <= now_ts:
+                entry = heapq.heappop(self._heap)
+                due_ts, _, lesson_id = entry
+                current = self._current.get(lesson_id)
+                if current is None or current[0] != due_ts:
+                    continue
+                popped.append(entry)
+                result.append((lesson_id, current[1], due_ts))
+            for entry in popped:
+                heapq.heappush(self._heap, entry)
+        return result
+
+    def __len__(self):
+        return len(self._current)
+
+def _timestamp(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def get_review_queue(db: Session, user_id: uuid.UUID) -> ReviewQueue:
+    queue = _review_queue_cache.get(user_id)
+    if queue is None:
+        items = db.query(ReviewItem.lesson_id, ReviewItem.course_id, ReviewItem.due_at)\
+            .filter(ReviewItem.user_id == user_id)\
+            .order_by(ReviewItem.due_at.asc())\
+            .all()
+        queue = ReviewQueue(items)
+        _review_queue_cache.set(user_id, queue)
+    return queue
+
+def update_review_queue(user_id: uuid.UUID, lesson_id: uuid.UUID, course_id: uuid.UUID, due_at: datetime):
+    queue = _review_queue_cache.get(user_id)
+    if queue is not None:
+        queue.update(lesson_id, course_id, due_at)
+
+def get_due_reviews(db: Session, user_id: uuid.UUID, limit: int = 10) -> list:
+    now_ts = datetime.now(timezone.utc).timestamp()
+    due = get_review_queue(db, user_id).due(now_ts, limit)
+    indexes = get_course_lesson_indexes(db, {course_id for _, course_id, _ in due})
+    reviews = []
+    for lesson_id, course_id, due_ts in due:
+        index = indexes[course_id]
+        if lesson_id not in index:
+            continue
+        reviews.append({
+            "course_id": str(course_id),
+            "lesson_id": str(lesson_id),
+            "title": index.titles[index.position[lesson_id]],
+            "due_at": datetime.fromtimestamp(due_ts, tz=timezone.utc).isoformat(),
+            "overdue_days": round((now_ts - due_ts) / 86400.0, 1)
+        })
+    return reviews
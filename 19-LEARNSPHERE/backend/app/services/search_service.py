@@ -0,0 +1,283 @@
+import re
+import math
+import uuid
+import bisect
+import logging
+import threading
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.models.course import Course
+from app.models.lesson import Lesson
+
+logger = logging.getLogger("search")
+
+# Field weights, shared by the Postgres ranking (setweight A/B) and the in-memory fallback
+NAME_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+LESSON_WEIGHT = 0.5
+MATCHED_LESSONS_PER_COURSE = 3
+
+# Letters and digits only, which also keeps terms safe to splice into to_tsquery syntax
+_TOKEN = re.compile(r"[^\W_]+", re.UNICODE)
+
+def tokenize(value: str) -> list:
+    return _TOKEN.findall((value or "").lower())
+
+# Generated columns can't read other tables, so courses and lessons each carry their own vector
+SEARCH_SCHEMA_DDL = [
+    """
+    ALTER TABLE courses ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(course_name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_courses_search_vector ON courses USING GIN (search_vector)",
+    """
+    ALTER TABLE lessons ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('english', coalesce(title, ''))) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_lessons_search_vector ON lessons USING GIN (search_vector)",
+]
+
+def ensure_search_schema(engine):
+    """
+    Adds the tsvector columns and GIN indexes on Postgres. Idempotent; other dialects use the in-memory index.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as connection:
+        for statement in SEARCH_SCHEMA_DDL:
+            connection.execute(text(statement))
+    logger.info("Search schema ready")
+
+def _uses_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+def _to_tsquery(terms: list) -> str:
+    """
+    All terms must match; the last one is a prefix so partial words work for typeahead.
+    """
+    return " & ".join(terms[:-1] + [f"{terms[-1]}:*"])
+
+_POSTGRES_SEARCH = text("""
+    WITH q AS (SELECT to_tsquery('english', :tsquery) AS query),
+    course_hits AS (
+        SELECT c.id, ts_rank(ARRAY[0.1, 0.2, :description_weight, :name_weight]::float4[], c.search_vector, q.query) AS rank
+        FROM courses c, q
+        WHERE c.search_vector @@ q.query
+    ),
+    lesson_hits AS (
+        SELECT l.course_id, max(ts_rank(l.search_vector, q.query)) AS rank
+        FROM lessons l, q
+        WHERE l.search_vector @@ q.query
+        GROUP BY l.course_id
+    )
+    SELECT c.id, c.course_name, c.description,
+           coalesce(ch.rank, 0) + :lesson_weight * coalesce(lh.rank, 0) AS rank,
+           count(*) OVER () AS total
+    FROM courses c
+    LEFT JOIN course_hits ch ON ch.id = c.id
+    LEFT JOIN lesson_hits lh ON lh.course_id = c.id
+    WHERE ch.id IS NOT NULL OR lh.course_id IS NOT NULL
+    ORDER BY rank DESC, c.course_name ASC, c.id ASC
+    LIMIT :limit OFFSET :offset
+""")
+
+_POSTGRES_LESSON_MATCHES = text("""
+    SELECT course_id, id, title FROM (
+        SELECT l.course_id, l.id, l.title,
+               row_number() OVER (PARTITION BY l.course_id ORDER BY ts_rank(l.search_vector, q.query) DESC, l.order_index) AS n
+        FROM lessons l, (SELECT to_tsquery('english', :tsquery) AS query) q
+        WHERE l.course_id = ANY(CAST(:course_ids AS uuid[])) AND l.search_vector @@ q.query
+    ) ranked
+    WHERE n <= :per_course
+""")
+
+def _search_postgres(db: Session, terms: list, limit: int, offset: int):
+    tsquery = _to_tsquery(terms)
+    rows = db.execute(_POSTGRES_SEARCH, {
+        "tsquery": tsquery,
+        "name_weight": NAME_WEIGHT,
+        "description_weight": DESCRIPTION_WEIGHT,
+        "lesson_weight": LESSON_WEIGHT,
+        "limit": limit,
+        "offset": offset
+    }).all()
+    total = rows[0].total if rows else 0
+
+    matched = {}
+    if rows:
+        lesson_rows = db.execute(_POSTGRES_LESSON_MATCHES, {
+            "tsquery": tsquery,
+            "course_ids": [str(row.id) for row in rows],
+            "per_course": MATCHED_LESSONS_PER_COURSE
+        }).all()
+        for course_id, lesson_id, title in lesson_rows:
+            matched.setdefault(str(course_id), []).append({"lesson_id": str(lesson_id), "title": title})
+
+    results = [
+        {
+            "course_id": str(row.id),
+            "course_name": row.course_name,
+            "description": row.description,
+            "rank": round(float(row.rank), 4),
+            "matched_lessons": matched.get(str(row.id), [])
+        }
+        for row in rows
+    ]
+    return total, results
+
+class InvertedIndex:
+    """
+    In-memory course search index for non-Postgres databases.
+    Postings map each term to {course_id: field weight}; a sorted term list serves prefix lookups.
+    """
+
+    def __init__(self):
+        self._postings = {}
+        self._terms = []
+        self._course_terms = {}
+        self._courses = {}
+        self._lock = threading.Lock()
+
+    def index_course(self, course_id, course_name: str, description: str, lessons: list):
+        """
+        (Re)indexes one course; `lessons` is [(lesson_id, title)] in lesson order.
+        """
+        weights = {}
+        for term in tokenize(course_name):
+            weights[term] = max(weights.get(term, 0), NAME_WEIGHT)
+        for term in tokenize(description):
+            weights[term] = max(weights.get(term, 0), DESCRIPTION_WEIGHT)
+        lesson_terms = []
+        for lesson_id, title in lessons:
+            terms = set(tokenize(title))
+            lesson_terms.append((lesson_id, title, terms))
+            for term in terms:
+                weights[term] = max(weights.get(term, 0), LESSON_WEIGHT)
+
+        with self._lock:
+            self._remove(course_id)
+            for term, weight in weights.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    bisect.insort(self._terms, term)
+                postings[course_id] = weight
+            self._course_terms[course_id] = weights
+            self._courses[course_id] = (course_name, description, lesson_terms)
+
+    def remove_course(self, course_id):
+        with self._lock:
+            self._remove(course_id)
+
+    def _remove(self, course_id):
+        for term in self._course_terms.pop(course_id, {}):
+            postings = self._postings[term]
+            postings.pop(course_id, None)
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect.bisect_left(self._terms, term)]
+        self._courses.pop(course_id, None)
+
+    def _expand_prefix(self, prefix: str) -> list:
+        start = bisect.bisect_left(self._terms, prefix)
+        end = bisect.bisect_left(self._terms, prefix + "\uffff")
+        return self._terms[start:end]
+
+    def search(self, terms: list, limit: int, offset: int):
+        with self._lock:
+            n_courses = max(len(self._courses), 1)
+            scores = None
+            expanded = []
+            for i, term in enumerate(terms):
+                candidates = self._expand_prefix(term) if i == len(terms) - 1 else [term]
+                expanded.append(set(candidates))
+                term_scores = {}
+                for candidate in candidates:
+                    postings = self._postings.get(candidate, {})
+                    idf = math.log(1 + n_courses / len(postings)) if postings else 0
+                    for course_id, weight in postings.items():
+                        term_scores[course_id] = max(term_scores.get(course_id, 0), weight * idf)
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {c: s + term_scores[c] for c, s in scores.items() if c in term_scores}
+                if not scores:
+                    return 0, []
+
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], self._courses[item[0]][0], str(item[0])))
+            results = []
+            for course_id, score in ranked[offset:offset + limit]:
+                course_name, description, lesson_terms = self._courses[course_id]
+                matched_lessons = [
+                    {"lesson_id": str(lesson_id), "title": title}
+                    for lesson_id, title, words in lesson_terms
+                    if any(words & candidates for candidates in expanded)
+                ][:MATCHED_LESSONS_PER_COURSE]
+                results.append({
+                    "course_id": str(course_id),
+                    "course_name": course_name,
+                    "description": description,
+                    "rank": round(score, 4),
+                    "matched_lessons": matched_lessons
+                })
+            return len(ranked), results
+
+    def __len__(self):
+        return len(self._courses)
+
+_memory_index = None
+_memory_index_lock = threading.Lock()
+
+def _load_course_lessons(db: Session, course_ids=None) -> dict:
+    query = db.query(Lesson.course_id, Lesson.id, Lesson.title).order_by(Lesson.course_id, Lesson.order_index, Lesson.id)
+    if course_ids is not None:
+        query = query.filter(Lesson.course_id.in_(course_ids))
+    lessons = {}
+    for course_id, lesson_id, title in query.all():
+        lessons.setdefault(course_id, []).append((lesson_id, title))
+    return lessons
+
+def get_memory_index(db: Session) -> InvertedIndex:
+    """
+    The fallback index, built from the database on first use.
+    """
+    global _memory_index
+    if _memory_index is None:
+        with _memory_index_lock:
+            if _memory_index is None:
+                index = InvertedIndex()
+                lessons = _load_course_lessons(db)
+                for course_id, course_name, description in db.query(Course.id, Course.course_name, Course.description).all():
+                    index.index_course(course_id, course_name, description, lessons.get(course_id, []))
+                _memory_index = index
+    return _memory_index
+
+def reindex_course(db: Session, course_id: uuid.UUID):
+    """
+    Incremental update after a course or its lessons change. Postgres vectors are generated columns
+    and update themselves, so this only touches the fallback index, and only once it has been built.
+    """
+    if _memory_index is None:
+        return
+    course = db.query(Course.course_name, Course.description).filter(Course.id == course_id).first()
+    if course is None:
+        _memory_index.remove_course(course_id)
+        return
+    lessons = _load_course_lessons(db, [course_id]).get(course_id, [])
+    _memory_index.index_course(course_id, course.course_name, course.description, lessons)
+
+def search_courses(db: Session, query: str, limit: int = 20, offset: int = 0) -> dict:
+    """
+    Ranked course search over names, descriptions and lesson titles.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return {"query": query, "total": 0, "results": []}
+    if _uses_postgres(db):
+        total, results = _search_postgres(db, terms, limit, offset)
+    else:
+        total, results = get_memory_index(db).search(terms, limit, offset)
+    return {"query": query, "total": total, "results": results}
@@ -0,0 +1,12 @@
+import time
+from app.db.session import SessionLocal
+from app.services.mastery_service import backfill_lesson_mastery
+
+started = time.monotonic()
+print("Backfilling lesson mastery from quiz attempts...")
+db = SessionLocal()
+try:
+    written = backfill_lesson_mastery(db)
+finally:
+    db.close()
+print(f"Wrote {written} lesson mastery rows in {time.monotonic() - started:.2f}s")
@@ -0,0 +1,53 @@
+"""
+Local stand-in for Neon Auth: serves a JWKS and mints RS256 tokens the backend will accept.
+"""
+import time
+import base64
+from fastapi import FastAPI
+from jose import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+KEY_ID = "bench-key"
+AUDIENCE = "learnsphere-bench"
+ISSUER = "learnsphere-bench-issuer"
+
+def _b64url_uint(value: int) -> str:
+    raw = value.to_bytes((value.bit_length() + 7) // 8, "big")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+class JwksStub:
+    def __init__(self, audience: str = AUDIENCE, issuer: str = ISSUER):
+        self.audience = audience
+        self.issuer = issuer
+        self._key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self._pem = self._key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        ).decode("ascii")
+
+    def jwks(self) -> dict:
+        numbers = self._key.public_key().public_numbers()
+        return {"keys": [{
+            "kty": "RSA",
+            "kid": KEY_ID,
+            "use": "sig",
+            "alg": "RS256",
+            "n": _b64url_uint(numbers.n),
+            "e": _b64url_uint(numbers.e)
+        }]}
+
+    def mint(self, sub: str, email: str, ttl_seconds: int = 3600) -> str:
+        now = int(time.time())
+        claims = {"sub": sub, "email": email, "aud": self.audience, "iss": self.issuer, "iat": now, "exp": now + ttl_seconds}
+        return jwt.encode(claims, self._pem, algorithm="RS256", headers={"kid": KEY_ID})
+
+def create_app(stub: JwksStub) -> FastAPI:
+    app = FastAPI(title="Bench JWKS stub")
+
+    @app.get("/.well-known/jwks.json")
+    def jwks():
+        return stub.jwks()
+
+    return app
@@ -0,0 +1,32 @@
+"""
+Mock Qubrid chat-completions endpoint with configurable latency, jitter and error rate.
+"""
+import random
+import asyncio
+from fastapi import FastAPI, Request, HTTPException
+
+def create_app(latency_ms: float = 800, jitter_ms: float = 200, error_rate: float = 0.0, seed: int = 7) -> FastAPI:
+    app = FastAPI(title="Bench Qubrid mock")
+    rng = random.Random(seed)
+    app.state.requests = 0
+
+    @app.post("/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        await asyncio.sleep(max(0.0, rng.gauss(latency_ms, jitter_ms)) / 1000)
+        if rng.random() < error_rate:
+            raise HTTPException(status_code=503, detail="Mock upstream failure")
+
+        prompt = " ".join(message.get("content", "") for message in body.get("messages", []))
+        content = "Here is a study plan based on your recent progress. " * 8
+        return {
+            "choices": [{"message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": len(prompt) // 4,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": (len(prompt) + len(content)) // 4
+            }
+        }
+
+    return app
@@ -0,0 +1,415 @@
+"""
+Load-benchmark runner.
+
+    python -m bench.run --tier 1k --scenarios tracking,dashboard,catalog,ai --concurrency 32 --duration 60
+
+Starts the JWKS stub and the mock Qubrid server in-process, launches the backend under uvicorn
+against DATABASE_URL (seeded beforehand with bench.seed), drives the chosen scenarios at a fixed
+concurrency and reports throughput, p50/p95/p99 latency, SQL queries and JSON serialization
+time per request.
+Results are compared against bench/baseline.json; --save-baseline replaces it.
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import threading
+import subprocess
+from datetime import datetime, timezone, timedelta
+import httpx
+import numpy as np
+import uvicorn
+
+from bench import auth_stub, mock_qubrid
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(BACKEND_DIR, "bench", "baseline.json")
+API = "/api/v1"
+QUERY_COUNT_HEADER = "X-Query-Count"
+# The backend's Server-Timing header carries the time spent encoding the response body
+SERIALIZE_TIMING = re.compile(r"\bserialize;dur=([0-9.]+)")
+
+# Relative weights of the requests inside each scenario
+SCENARIOS = {
+    "tracking": {"lesson_progress": 6, "quiz_submit": 2, "session_end": 2},
+    "dashboard": {"dashboard_metrics": 2, "learner_progress": 1, "course_cohort": 2, "course_funnel": 1},
+    "catalog": {"my_courses": 3, "learner_home": 3, "course_detail": 2, "course_search": 3, "course_list": 1},
+    "ai": {"ai_chat": 1},
+}
+SEARCH_TERMS = ["python", "data", "design", "cloud", "security", "stat", "writing", "market", "finance", "ml intro"]
+
+class BackgroundServer:
+    """
+    A uvicorn server on a daemon thread, for the stubs.
+    """
+
+    def __init__(self, app, port: int):
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.05)
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join(5)
+
+def start_backend(args, env_overrides: dict) -> subprocess.Popen:
+    env = dict(os.environ, **env_overrides)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(args.port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+    deadline = time.monotonic() + args.startup_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Backend exited during startup with code {process.returncode}")
+        try:
+            if httpx.get(f"http://127.0.0.1:{args.port}/health/ready", timeout=2).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError("Backend did not become ready in time")
+
+def load_fixtures(sample_size: int) -> dict:
+    """
+    Picks the seeded learners and instructors the virtual users act as, with their courses and lessons.
+    """
+    from sqlalchemy import select
+    from app.db.session import SessionLocal
+    from app.models.user import User
+    from app.models.course import Course, Enrollment
+    from app.models.lesson import Lesson
+    from app.models.enums import LessonType
+
+    db = SessionLocal()
+    try:
+        learners = db.execute(
+            select(User.id, User.neon_user_id, User.email)
+            .where(User.neon_user_id.like("bench-learner-%")).order_by(User.neon_user_id).limit(sample_size)
+        ).all()
+        instructors = db.execute(
+            select(User.id, User.neon_user_id, User.email)
+            .where(User.neon_user_id.like("bench-instructor-%")).order_by(User.neon_user_id).limit(max(1, sample_size // 20))
+        ).all()
+        if not learners or not instructors:
+            raise RuntimeError("No benchmark users found; run `python -m bench.seed` first")
+
+        enrollments = db.execute(
+            select(Enrollment.learner_id, Enrollment.course_id).where(Enrollment.learner_id.in_([row.id for row in learners]))
+        ).all()
+        owned = db.execute(
+            select(Course.id, Course.created_by).where(Course.created_by.in_([row.id for row in instructors]))
+        ).all()
+        lessons = db.execute(
+            select(Lesson.id, Lesson.course_id, Lesson.type).where(Lesson.course_id.in_({row.course_id for row in enrollments}))
+        ).all()
+    finally:
+        db.close()
+
+    lessons_by_course = {}
+    for lesson in lessons:
+        entry = lessons_by_course.setdefault(str(lesson.course_id), {"lessons": [], "quizzes": []})
+        entry["lessons"].append(str(lesson.id))
+        if lesson.type == LessonType.quiz:
+            entry["quizzes"].append(str(lesson.id))
+    courses_by_learner = {}
+    for row in enrollments:
+        if str(row.course_id) in lessons_by_course:
+            courses_by_learner.setdefault(row.learner_id, []).append(str(row.course_id))
+    courses_by_instructor = {}
+    for row in owned:
+        courses_by_instructor.setdefault(row.created_by, []).append(str(row.id))
+
+    return {
+        "learners": [
+            {"sub": row.neon_user_id, "email": row.email, "courses": courses_by_learner[row.id]}
+            for row in learners if row.id in courses_by_learner
+        ],
+        "instructors": [
+            {"sub": row.neon_user_id, "email": row.email, "courses": courses_by_instructor[row.id]}
+            for row in instructors if row.id in courses_by_instructor
+        ],
+        "lessons": lessons_by_course,
+    }
+
+class Scenario:
+    """
+    Builds one request at a time for a virtual user, drawn from the weighted request mix.
+    """
+
+    def __init__(self, fixtures: dict, stub: auth_stub.JwksStub, names: list, seed: int):
+        self.fixtures = fixtures
+        self.rng = random.Random(seed)
+        self.requests = {}
+        for name in names:
+            self.requests.update(SCENARIOS[name])
+        self.request_names = list(self.requests)
+        self.weights = [self.requests[name] for name in self.request_names]
+        self.tokens = {
+            user["sub"]: stub.mint(user["sub"], user["email"], ttl_seconds=24 * 3600)
+            for user in fixtures["learners"] + fixtures["instructors"]
+        }
+
+    def _headers(self, user: dict) -> dict:
+        return {"Authorization": f"Bearer {self.tokens[user['sub']]}"}
+
+    def next_request(self) -> tuple:
+        """
+        (name, method, path, headers, json body or None)
+        """
+        name = self.rng.choices(self.request_names, self.weights)[0]
+        rng = self.rng
+        learner = rng.choice(self.fixtures["learners"])
+        course_id = rng.choice(learner["courses"])
+        course = self.fixtures["lessons"][course_id]
+
+        if name == "lesson_progress":
+            body = {"course_id": course_id, "lesson_id": rng.choice(course["lessons"]), "percent": rng.choice([25, 50, 75, 100])}
+            return name, "POST", f"{API}/lesson/progress", self._headers(learner), body
+        if name == "quiz_submit":
+            quiz_id = rng.choice(course["quizzes"] or course["lessons"])
+            # Scores are percentages, drawn like the seeder's attempts so mastery and review updates see realistic values
+            body = {"course_id": course_id, "quiz_id": quiz_id, "score": max(0, min(100, int(rng.gauss(72, 12)))),
+                    "total_questions": 10, "time_taken_seconds": rng.randint(60, 900)}
+            return name, "POST", f"{API}/quiz/submit", self._headers(learner), body
+        if name == "session_end":
+            ended = datetime.now(timezone.utc)
+            body = {"course_id": course_id, "lesson_id": rng.choice(course["lessons"]),
+                    "started_at": (ended - timedelta(minutes=rng.randint(5, 45))).isoformat(), "ended_at": ended.isoformat()}
+            return name, "POST", f"{API}/session/end", self._headers(learner), body
+        if name == "my_courses":
+            return name, "GET", f"{API}/courses/my-courses", self._headers(learner), None
+        if name == "learner_home":
+            return name, "GET", f"{API}/home", self._headers(learner), None
+        if name == "course_detail":
+            return name, "GET", f"{API}/courses/{course_id}", self._headers(learner), None
+        if name == "course_search":
+            return name, "GET", f"{API}/search/courses?q={rng.choice(SEARCH_TERMS)}&limit=20", self._headers(learner), None
+        if name == "course_list":
+            return name, "GET", f"{API}/courses", self._headers(learner), None
+        if name == "ai_chat":
+            body = {"prompt": "What should I study next to improve my quiz scores?"}
+            return name, "POST", f"{API}/ai/chat", self._headers(learner), body
+
+        instructor = rng.choice(self.fixtures["instructors"])
+        managed = rng.choice(instructor["courses"])
+        if name == "dashboard_metrics":
+            return name, "GET", f"{API}/dashboard/metrics", self._headers(instructor), None
+        if name == "learner_progress":
+            return name, "GET", f"{API}/dashboard/learner-progress", self._headers(instructor), None
+        if name == "course_cohort":
+            return name, "GET", f"{API}/dashboard/courses/{managed}/cohort", self._headers(instructor), None
+        if name == "course_funnel":
+            return name, "GET", f"{API}/dashboard/courses/{managed}/funnel", self._headers(instructor), None
+        raise ValueError(f"Unknown request {name}")
+
+async def drive(base_url: str, scenario: Scenario, concurrency: int, duration: float, warmup: float) -> tuple:
+    """
+    Runs `concurrency` closed-loop virtual users. Samples taken during warm-up are discarded.
+    """
+    samples = []
+    started = time.monotonic()
+    measure_from = started + warmup
+    deadline = measure_from + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        async def virtual_user():
+            while time.monotonic() < deadline:
+                name, method, path, headers, body = scenario.next_request()
+                sent = time.perf_counter()
+                try:
+                    response = await client.request(method, path, headers=headers, json=body)
+                    status = response.status_code
+                    queries = response.headers.get(QUERY_COUNT_HEADER)
+                    serialize = SERIALIZE_TIMING.search(response.headers.get("Server-Timing", ""))
+                except httpx.HTTPError:
+                    status, queries, serialize = 0, None, None
+                elapsed_ms = (time.perf_counter() - sent) * 1000
+                if time.monotonic() >= measure_from:
+                    samples.append((
+                        name, status, elapsed_ms,
+                        int(queries) if queries is not None else None,
+                        float(serialize.group(1)) if serialize else None
+                    ))
+
+        await asyncio.gather(*(virtual_user() for _ in range(concurrency)))
+    return samples, duration
+
+def summarize(samples: list, seconds: float) -> dict:
+    def stats(rows):
+        latencies = np.array([row[2] for row in rows])
+        queries = [row[3] for row in rows if row[3] is not None]
+        serialize = [row[4] for row in rows if row[4] is not None]
+        errors = sum(1 for row in rows if row[1] == 0 or row[1] >= 400)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        return {
+            "requests": len(rows),
+            "throughput_rps": round(len(rows) / seconds, 2),
+            "error_rate": round(errors / len(rows), 4),
+            "p50_ms": round(float(p50), 2),
+            "p95_ms": round(float(p95), 2),
+            "p99_ms": round(float(p99), 2),
+            "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+            "serialize_ms_per_request": round(sum(serialize) / len(serialize), 3) if serialize else None,
+        }
+
+    by_name = {}
+    for row in samples:
+        by_name.setdefault(row[0], []).append(row)
+    return {
+        "overall": stats(samples) if samples else None,
+        "endpoints": {name: stats(rows) for name, rows in sorted(by_name.items())},
+    }
+
+def print_report(summary: dict):
+    header = f"{'endpoint':<20}{'reqs':>8}{'rps':>9}{'err%':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'q/req':>8}{'ser ms':>8}"
+    print(header)
+    print("-" * len(header))
+    rows = list(summary["endpoints"].items()) + [("OVERALL", summary["overall"])]
+    for name, s in rows:
+        if s is None:
+            continue
+        qpr = "-" if s["queries_per_request"] is None else f"{s['queries_per_request']:.1f}"
+        ser = "-" if s.get("serialize_ms_per_request") is None else f"{s['serialize_ms_per_request']:.2f}"
+        print(f"{name:<20}{s['requests']:>8}{s['throughput_rps']:>9.1f}{s['error_rate'] * 100:>7.1f}"
+              f"{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}{s['p99_ms']:>9.1f}{qpr:>8}{ser:>8}")
+
+def compare(summary: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Regressions against the baseline: p95 latency or throughput worse by more than `tolerance`
+    (a fraction), or more SQL queries per request.
+    """
+    regressions = []
+    for name, current in summary["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if previous is None:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {previous['throughput_rps']} -> {current['throughput_rps']} rps")
+        if (current["queries_per_request"] is not None and previous.get("queries_per_request") is not None
+                and current["queries_per_request"] > previous["queries_per_request"] + 0.5):
+            regressions.append(f"{name}: queries/request {previous['queries_per_request']} -> {current['queries_per_request']}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the backend with a synthetic load and report latency percentiles")
+    parser.add_argument("--tier", default="1k", help="Seeded tier, recorded with the results")
+    parser.add_argument("--scenarios", default="tracking,dashboard,catalog", help=f"Comma-separated: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=60, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=10, help="Unmeasured seconds before measuring")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes for the backend")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--auth-port", type=int, default=8101)
+    parser.add_argument("--qubrid-port", type=int, default=8102)
+    parser.add_argument("--qubrid-latency-ms", type=float, default=800)
+    parser.add_argument("--qubrid-jitter-ms", type=float, default=200)
+    parser.add_argument("--qubrid-error-rate", type=float, default=0.0)
+    parser.add_argument("--sample-users", type=int, default=500, help="Seeded learners to act as")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--startup-timeout", type=float, default=120)
+    parser.add_argument("--output", help="Write the results JSON here")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed p95/throughput regression (fraction)")
+    args = parser.parse_args()
+
+    # The app's modules configure INFO logging on import; keep per-request client logs out of the report
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(unknown)}")
+
+    stub = auth_stub.JwksStub()
+    overrides = {
+        "NEON_AUTH_URL": f"http://127.0.0.1:{args.auth_port}",
+        "NEON_AUTH_AUDIENCE": stub.audience,
+        "NEON_AUTH_ISSUER": stub.issuer,
+        "QUBRID_BASE_URL": f"http://127.0.0.1:{args.qubrid_port}",
+        "QUBRID_API_KEY": os.environ.get("QUBRID_API_KEY", "bench"),
+        "QUERY_COUNT_HEADER": "true",
+        "SERVER_TIMING_HEADER": "true",
+    }
+    # The fixture loader imports the app's settings, which require these too
+    for key, value in overrides.items():
+        os.environ.setdefault(key, value)
+
+    servers = [
+        BackgroundServer(auth_stub.create_app(stub), args.auth_port),
+        BackgroundServer(mock_qubrid.create_app(args.qubrid_latency_ms, args.qubrid_jitter_ms, args.qubrid_error_rate), args.qubrid_port),
+    ]
+    for server in servers:
+        server.start()
+    backend = None
+    try:
+        fixtures = load_fixtures(args.sample_users)
+        scenario = Scenario(fixtures, stub, names, args.seed)
+        backend = start_backend(args, overrides)
+        print(f"Driving {', '.join(names)} at concurrency {args.concurrency} for {args.duration:.0f}s "
+              f"(+{args.warmup:.0f}s warm-up) against tier {args.tier}")
+        samples, seconds = asyncio.run(drive(f"http://127.0.0.1:{args.port}", scenario, args.concurrency, args.duration, args.warmup))
+    finally:
+        if backend is not None:
+            backend.terminate()
+            backend.wait(30)
+        for server in servers:
+            server.stop()
+
+    summary = summarize(samples, seconds)
+    results = {
+        "meta": {
+            "tier": args.tier,
+            "scenarios": names,
+            "concurrency": args.concurrency,
+            "duration_seconds": args.duration,
+            "workers": args.workers,
+            "qubrid_latency_ms": args.qubrid_latency_ms,
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+        },
+        **summary,
+    }
+    print_report(summary)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    exit_code = 0
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        mismatched = [key for key in ("tier", "concurrency", "workers") if baseline["meta"].get(key) != results["meta"][key]]
+        if mismatched:
+            print(f"Warning: baseline was recorded with different {', '.join(mismatched)}")
+        regressions = compare(summary, baseline, args.tolerance)
+        if regressions:
+            print("Regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            exit_code = 1
+        else:
+            print("No regressions against baseline")
+    elif args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    else:
+        print("No baseline yet; rerun with --save-baseline to record one")
+    sys.exit(exit_code)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+Synthetic data generator for the load benchmarks.
+
+    python -m bench.seed --tier 1k --reset
+
+Generates a reproducible population (fixed RNG seed) of instructors, courses, lessons and learners
+with enrollments, lesson progress, quiz attempts, learning sessions and activity logs, plus the
+lesson mastery and review schedule those attempts would have produced.
+Postgres is loaded with COPY; other databases fall back to batched inserts (fine for the 1k tier).
+"""
+import io
+import csv
+import json
+import time
+import uuid
+import argparse
+from types import SimpleNamespace
+from datetime import datetime, timezone, timedelta
+import numpy as np
+from sqlalchemy import text
+from app.db.session import get_engine
+from app.db.migrate import run_migrations
+from app.db.base import Base
+from app.db.types import GUID
+from app.services.mastery_service import fold_score
+from app.services.review_service import apply_sm2
+
+TIERS = {
+    "1k": {"learners": 1_000, "instructors": 10, "courses": 40},
+    "100k": {"learners": 100_000, "instructors": 200, "courses": 800},
+    "1m": {"learners": 1_000_000, "instructors": 1_000, "courses": 4_000},
+}
+
+LEARNER_BATCH = 5_000
+HISTORY_DAYS = 90
+QUIZ_SHARE = 0.25
+TABLES_IN_LOAD_ORDER = [
+    "users", "courses", "lessons", "enrollments", "lesson_progress",
+    "quiz_attempts", "learning_sessions", "user_activity_logs", "lesson_mastery", "review_items",
+]
+
+def learner_identity(i: int) -> tuple:
+    """
+    (neon_user_id, email) for the i-th synthetic learner; the runner mints tokens from these.
+    """
+    return f"bench-learner-{i}", f"learner{i}@bench.learnsphere.test"
+
+def instructor_identity(i: int) -> tuple:
+    return f"bench-instructor-{i}", f"instructor{i}@bench.learnsphere.test"
+
+class Writer:
+    """
+    Buffers rows per table and flushes them with COPY (Postgres) or executemany.
+    """
+
+    def __init__(self, engine, flush_rows: int = 50_000):
+        self.engine = engine
+        self.postgres = engine.dialect.name == "postgresql"
+        self.flush_rows = flush_rows
+        self.buffers = {}
+        self.columns = {}
+        self.totals = {}
+
+    def add(self, table: str, columns: tuple, row: tuple):
+        self.columns[table] = columns
+        buffer = self.buffers.setdefault(table, [])
+        buffer.append(row)
+        if len(buffer) >= self.flush_rows:
+            self.flush(table)
+
+    def flush(self, table: str = None):
+        # Parents first, so foreign keys always resolve
+        tables = [table] if table else [t for t in TABLES_IN_LOAD_ORDER if self.buffers.get(t)]
+        for name in tables:
+            rows = self.buffers.get(name)
+            if not rows:
+                continue
+            if table is not None:
+                # Flushing one table early: its parents may still be buffered
+                for parent in TABLES_IN_LOAD_ORDER[:TABLES_IN_LOAD_ORDER.index(name)]:
+                    self.flush(parent)
+            columns = self.columns[name]
+            if self.postgres:
+                self._copy(name, columns, rows)
+            else:
+                self._insert(name, columns, rows)
+            self.totals[name] = self.totals.get(name, 0) + len(rows)
+            self.buffers[name] = []
+
+    def _copy(self, table, columns, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow(["" if value is None else value for value in row])
+        buffer.seek(0)
+        raw = self.engine.raw_connection()
+        try:
+            with raw.cursor() as cursor:
+                cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+            raw.commit()
+        finally:
+            raw.close()
+
+    def _insert(self, table, columns, rows):
+        sa_table = Base.metadata.tables[table]
+        records = [dict(zip(columns, row)) for row in rows]
+        for record in records:
+            for key, value in record.items():
+                column_type = sa_table.c[key].type
+                if isinstance(value, str) and isinstance(column_type, GUID):
+                    record[key] = uuid.UUID(value)
+                elif isinstance(value, str) and key == "metadata_json":
+                    record[key] = json.loads(value)
+                elif isinstance(value, str) and key.endswith("_at"):
+                    record[key] = datetime.fromisoformat(value)
+        with self.engine.begin() as connection:
+            connection.execute(sa_table.insert(), records)
+
+class Generator:
+    def __init__(self, tier: dict, seed: int):
+        self.tier = tier
+        self.rng = np.random.default_rng(seed)
+        self.now = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def uuid(self) -> str:
+        return str(uuid.UUID(bytes=self.rng.bytes(16), version=4))
+
+    def timestamp(self, days_ago: float) -> str:
+        return (self.now - timedelta(days=float(days_ago))).isoformat()
+
+    def catalog(self, writer: Writer):
+        """
+        Instructors, courses and lessons. Returns per-course lesson metadata for the learner pass.
+        """
+        user_columns = ("id", "neon_user_id", "email", "role", "created_at")
+        instructors = []
+        for i in range(self.tier["instructors"]):
+            instructor_id = self.uuid()
+            neon_id, email = instructor_identity(i)
+            writer.add("users", user_columns, (instructor_id, neon_id, email, "instructor", self.timestamp(HISTORY_DAYS + 30)))
+            instructors.append(instructor_id)
+
+        topics = ["python", "data", "design", "cloud", "security", "statistics", "writing", "marketing", "finance", "ml"]
+        levels = ["intro", "applied", "advanced", "practical", "foundations of"]
+        courses = []
+        for c in range(self.tier["courses"]):
+            course_id = self.uuid()
+            topic = topics[c % len(topics)]
+            name = f"{levels[(c // len(topics)) % len(levels)].title()} {topic} {c}"
+            writer.add("courses", ("id", "course_name", "description", "created_by", "created_at"), (
+                course_id, name, f"A course about {topic} for learners at every level",
+                instructors[c % len(instructors)], self.timestamp(HISTORY_DAYS + 10)
+            ))
+            n_lessons = int(self.rng.integers(5, 31))
+            lesson_ids, durations, is_quiz = [], [], []
+            for position in range(n_lessons):
+                lesson_id = self.uuid()
+                quiz = bool(self.rng.random() < QUIZ_SHARE)
+                duration = int(self.rng.integers(5, 46))
+                writer.add("lessons", ("id", "course_id", "title", "type", "duration_minutes", "order_index"), (
+                    lesson_id, course_id, f"{topic.title()} lesson {position + 1}",
+                    "quiz" if quiz else "video", duration, position
+                ))
+                lesson_ids.append(lesson_id)
+                durations.append(duration)
+                is_quiz.append(quiz)
+            courses.append({"id": course_id, "lessons": lesson_ids, "durations": np.array(durations), "quiz": is_quiz})
+
+        # Popularity follows a power law, like real catalogs
+        weights = 1.0 / np.arange(1, len(courses) + 1) ** 0.8
+        self.course_weights = weights / weights.sum()
+        return courses
+
+    def learners(self, writer: Writer, courses: list, start: int, count: int):
+        user_columns = ("id", "neon_user_id", "email", "role", "created_at")
+        enrollment_columns = ("id", "learner_id", "course_id", "progress_percent", "status", "enrolled_at", "updated_at")
+        progress_columns = ("id", "lesson_id", "learner_id", "status", "progress_percent", "updated_at")
+        attempt_columns = ("id", "user_id", "course_id", "quiz_id", "score", "total_questions", "time_taken_seconds", "attempt_number", "created_at")
+        session_columns = ("id", "user_id", "course_id", "lesson_id", "started_at", "ended_at", "duration_seconds")
+        log_columns = ("id", "user_id", "activity_type", "metadata_json", "created_at")
+        mastery_columns = ("id", "user_id", "lesson_id", "course_id", "attempt_count", "ewma_score", "last_score", "last_attempt_at")
+        review_columns = ("id", "user_id", "lesson_id", "course_id", "ease", "interval_days", "repetitions",
+                          "last_score", "last_reviewed_at", "due_at")
+
+        enrollment_counts = np.clip(self.rng.poisson(3, size=count), 1, 8)
+        for offset in range(count):
+            learner_id = self.uuid()
+            neon_id, email = learner_identity(start + offset)
+            writer.add("users", user_columns, (learner_id, neon_id, email, "learner", self.timestamp(HISTORY_DAYS + 5)))
+            n_courses = min(int(enrollment_counts[offset]), len(courses))
+            picks = self.rng.choice(len(courses), size=n_courses, replace=False, p=self.course_weights)
+            skill = self.rng.normal(72, 12)
+
+            for pick in picks:
+                course = courses[pick]
+                n_lessons = len(course["lessons"])
+                enrolled_days_ago = float(self.rng.uniform(1, HISTORY_DAYS))
+                # Geometric drop-off: each lesson is reached with probability 0.85
+                reached = min(int(self.rng.geometric(0.15)), n_lessons)
+                partial = int(self.rng.integers(0, 100)) if reached < n_lessons else 100
+                percents = np.zeros(n_lessons, dtype=np.int64)
+                percents[:reached - 1] = 100
+                percents[reached - 1] = partial if reached < n_lessons else 100
+                progress = int((course["durations"] * percents).sum() // (course["durations"].sum()))
+                status = "COMPLETED" if progress >= 100 else ("IN_PROGRESS" if progress > 0 else "NOT_STARTED")
+                last_active = float(self.rng.uniform(0, enrolled_days_ago))
+                writer.add("enrollments", enrollment_columns, (
+                    self.uuid(), learner_id, course["id"], progress, status,
+                    self.timestamp(enrolled_days_ago), self.timestamp(last_active)
+                ))
+
+                for position in range(reached):
+                    lesson_id = course["lessons"][position]
+                    percent = int(percents[position])
+                    lesson_status = "completed" if percent >= 100 else ("in_progress" if percent > 0 else "not_started")
+                    days_ago = enrolled_days_ago - (enrolled_days_ago - last_active) * (position + 1) / reached
+                    writer.add("lesson_progress", progress_columns, (
+                        self.uuid(), lesson_id, learner_id, lesson_status, percent, self.timestamp(days_ago)
+                    ))
+
+                    duration = int(self.rng.lognormal(np.log(course["durations"][position] * 60), 0.5))
+                    writer.add("learning_sessions", session_columns, (
+                        self.uuid(), learner_id, course["id"], lesson_id,
+                        self.timestamp(days_ago + duration / 86400), self.timestamp(days_ago), duration
+                    ))
+                    writer.add("user_activity_logs", log_columns, (
+                        self.uuid(), learner_id, "lesson_progress",
+                        json.dumps({"detail": f"Updated progress on lesson {lesson_id} to {percent}%",
+                                    "course_id": course["id"], "lesson_id": lesson_id}),
+                        self.timestamp(days_ago)
+                    ))
+
+                    if course["quiz"][position]:
+                        attempted_at = self.now - timedelta(days=float(days_ago))
+                        ewma_score = None
+                        # Replayed through the same SM-2 step quiz submissions use
+                        review = SimpleNamespace(ease=2.5, interval_days=0.0, repetitions=0)
+                        attempts = int(self.rng.integers(1, 4))
+                        for attempt in range(1, attempts + 1):
+                            score = int(np.clip(self.rng.normal(skill + 5 * attempt, 12), 0, 100))
+                            ewma_score = float(score) if ewma_score is None else fold_score(ewma_score, score)
+                            apply_sm2(review, score, attempted_at)
+                            writer.add("quiz_attempts", attempt_columns, (
+                                self.uuid(), learner_id, course["id"], lesson_id, score, 10,
+                                int(self.rng.integers(60, 900)), attempt, self.timestamp(days_ago)
+                            ))
+                            writer.add("user_activity_logs", log_columns, (
+                                self.uuid(), learner_id, "quiz_submitted",
+                                json.dumps({"detail": f"Submitted quiz {lesson_id} with score {score}/10",
+                                            "course_id": course["id"], "quiz_id": lesson_id, "score": score}),
+                                self.timestamp(days_ago)
+                            ))
+                        writer.add("lesson_mastery", mastery_columns, (
+                            self.uuid(), learner_id, lesson_id, course["id"], attempts, ewma_score, score, attempted_at.isoformat()
+                        ))
+                        writer.add("review_items", review_columns, (
+                            self.uuid(), learner_id, lesson_id, course["id"], review.ease, review.interval_days,
+                            review.repetitions, score, attempted_at.isoformat(), review.due_at.isoformat()
+                        ))
+
+def reset_tables(engine):
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as connection:
+            connection.execute(text(f"TRUNCATE {', '.join(reversed(Base.metadata.tables))} CASCADE"))
+    else:
+        with engine.begin() as connection:
+            for table in reversed(Base.metadata.sorted_tables):
+                connection.execute(table.delete())
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed the database with a synthetic benchmark population")
+    parser.add_argument("--tier", choices=sorted(TIERS), default="1k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Delete ALL rows from every application table first")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    print(f"Seeding tier {args.tier} into {engine.url.render_as_string(hide_password=True)}")
+    run_migrations(engine)
+    if args.reset:
+        reset_tables(engine)
+
+    started = time.monotonic()
+    tier = TIERS[args.tier]
+    generator = Generator(tier, args.seed)
+    writer = Writer(engine)
+    courses = generator.catalog(writer)
+    writer.flush()
+    for start in range(0, tier["learners"], LEARNER_BATCH):
+        generator.learners(writer, courses, start, min(LEARNER_BATCH, tier["learners"] - start))
+        writer.flush()
+        print(f"  {min(start + LEARNER_BATCH, tier['learners'])}/{tier['learners']} learners")
+
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as connection:
+            connection.execute(text("ANALYZE"))
+    for table, total in writer.totals.items():
+        print(f"  {table}: {total} rows")
+    print(f"Seeded in {time.monotonic() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
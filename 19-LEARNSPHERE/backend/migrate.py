@@ -0,0 +1,8 @@
+import time
+from app.db.session import get_engine
+from app.db.migrate import run_migrations
+
+started = time.monotonic()
+print("Applying schema...")
+run_migrations(get_engine())
+print(f"Schema applied in {time.monotonic() - started:.2f}s")
@@ -6,6 +6,8 @@ from app.core.config import settings
 engine = create_engine(settings.DATABASE_URL)
 with engine.connect() as conn:
     print("Executing drops...")
+    conn.execute(text("DROP TABLE IF EXISTS review_items CASCADE;"))
+    conn.execute(text("DROP TABLE IF EXISTS lesson_mastery CASCADE;"))
     conn.execute(text("DROP TABLE IF EXISTS performance_analysis CASCADE;"))
     conn.execute(text("DROP TABLE IF EXISTS user_activity_logs CASCADE;"))
     conn.execute(text("DROP TABLE IF EXISTS quiz_attempts CASCADE;"))
@@ -0,0 +1,81 @@
+import uuid
+import pytest
+from app.models.tracking import UserActivityLog
+import app.services.activity_log_service as activity_log_service
+from app.services.activity_log_service import ActivityLogBuffer
+from conftest import login
+
+def _row(user, n: int) -> dict:
+    return {"id": uuid.uuid4(), "user_id": user.id, "activity_type": "test", "metadata_json": {"n": n}}
+
+def _logged(db, user) -> list:
+    rows = db.query(UserActivityLog.metadata_json).filter(UserActivityLog.user_id == user.id).all()
+    return sorted(metadata["n"] for metadata, in rows)
+
+def test_flush_writes_in_batches(db, factory):
+    user = factory.user()
+    buffer = ActivityLogBuffer(capacity=10, flush_rows=4, flush_interval=60)
+    for n in range(6):
+        buffer.add(_row(user, n))
+    assert _logged(db, user) == []
+
+    assert buffer.flush_batch() == 4
+    buffer.flush()
+    assert len(buffer) == 0
+    assert _logged(db, user) == list(range(6))
+
+@pytest.mark.parametrize("overflow, kept", [("drop_newest", [0, 1, 2]), ("drop_oldest", [2, 3, 4])])
+def test_overflow_drops(db, factory, overflow, kept):
+    user = factory.user()
+    buffer = ActivityLogBuffer(capacity=3, flush_rows=3, flush_interval=60, overflow=overflow)
+    for n in range(5):
+        buffer.add(_row(user, n))
+    buffer.stop()
+    assert _logged(db, user) == kept
+
+def test_overflow_flush_applies_backpressure(db, factory):
+    user = factory.user()
+    buffer = ActivityLogBuffer(capacity=3, flush_rows=2, flush_interval=60, overflow="flush")
+    for n in range(5):
+        buffer.add(_row(user, n))
+    # The caller wrote batches itself instead of dropping rows
+    assert len(_logged(db, user)) >= 2
+    buffer.stop()
+    assert _logged(db, user) == list(range(5))
+
+def test_tracking_logs_go_through_the_buffer(client, factory, db, monkeypatch):
+    learner = factory.user()
+    course = factory.course(factory.user("instructor"), lessons=2)
+    factory.enroll(learner, course)
+    buffer = ActivityLogBuffer(capacity=10, flush_rows=10, flush_interval=60)
+    monkeypatch.setattr(activity_log_service, "_buffer", buffer)
+    login(client, learner)
+
+    response = client.post("/api/v1/course/start", json={"course_id": str(course.id)})
+    assert response.status_code == 200
+    assert db.query(UserActivityLog).filter(UserActivityLog.user_id == learner.id).count() == 0
+
+    buffer.flush()
+    log = db.query(UserActivityLog).filter(UserActivityLog.user_id == learner.id).one()
+    assert log.activity_type == "course_start"
+    assert log.metadata_json["course_id"] == str(course.id)
+
+def test_failed_inline_flush_drops_instead_of_spinning(db, factory, monkeypatch):
+    user = factory.user()
+    buffer = ActivityLogBuffer(capacity=2, flush_rows=2, flush_interval=60, overflow="flush")
+    buffer.add(_row(user, 0))
+    buffer.add(_row(user, 1))
+
+    attempts = []
+    def failing_session():
+        attempts.append(1)
+        raise RuntimeError("database is down")
+    monkeypatch.setattr(activity_log_service, "SessionLocal", failing_session)
+    buffer.add(_row(user, 2))
+    # One inline flush attempt, then the new row is dropped and the queued rows kept
+    assert len(attempts) == 1
+    assert len(buffer) == 2
+
+    monkeypatch.undo()
+    buffer.flush()
+    assert _logged(db, user) == [0, 1]
@@ -0,0 +1,80 @@
+import asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.core.admission import AdmissionController, AdmissionControlMiddleware, RouteClass, classify
+
+def _controller(max_concurrent=0, max_queue=0, **classes) -> AdmissionController:
+    """
+    classes: name=(limit, deadline_seconds, priority)
+    """
+    return AdmissionController(
+        {name: RouteClass(name, *spec) for name, spec in classes.items()},
+        max_concurrent=max_concurrent,
+        max_queue=max_queue
+    )
+
+def test_classify():
+    assert classify("POST", "/api/v1/ai/chat") == "ai"
+    assert classify("POST", "/api/v1/lesson/progress") == "tracking"
+    assert classify("GET", "/api/v1/performance/me") == "tracking"
+    assert classify("GET", "/api/v1/dashboard/metrics") == "dashboard"
+    assert classify("GET", "/api/v1/courses/my-courses") == "read"
+    assert classify("POST", "/api/v1/courses") == "write"
+    assert classify("GET", "/api/v1/dashboard/stream") is None
+    assert classify("GET", "/health/ready") is None
+
+def test_sheds_after_queue_deadline():
+    async def scenario():
+        controller = _controller(ai=(1, 0.05, 3))
+        assert await controller.acquire("ai")
+        assert not await controller.acquire("ai")
+        controller.release("ai")
+        assert await controller.acquire("ai")
+    asyncio.run(scenario())
+
+def test_queue_full_sheds_immediately():
+    async def scenario():
+        controller = _controller(max_queue=1, ai=(1, 1.0, 3))
+        assert await controller.acquire("ai")
+        waiter = asyncio.create_task(controller.acquire("ai"))
+        await asyncio.sleep(0)
+        assert not await controller.acquire("ai")
+        controller.release("ai")
+        assert await waiter
+    asyncio.run(scenario())
+
+def test_cheap_reads_are_admitted_before_ai():
+    async def scenario():
+        controller = _controller(max_concurrent=1, read=(0, 1.0, 0), ai=(0, 1.0, 3))
+        assert await controller.acquire("ai")
+        order = []
+
+        async def request(name):
+            assert await controller.acquire(name)
+            order.append(name)
+            controller.release(name)
+
+        queued = [asyncio.create_task(request("ai")), asyncio.create_task(request("read"))]
+        await asyncio.sleep(0)
+        controller.release("ai")
+        await asyncio.gather(*queued)
+        assert order == ["read", "ai"]
+    asyncio.run(scenario())
+
+def test_shed_requests_get_503_with_retry_after():
+    app = FastAPI()
+
+    @app.post("/api/v1/ai/chat")
+    def chat():
+        return {"response": "ok"}
+
+    controller = _controller(ai=(1, 0, 3))
+    controller.classes["ai"].in_flight = 1
+    app.add_middleware(AdmissionControlMiddleware, controller=controller, retry_after=3)
+
+    response = TestClient(app).post("/api/v1/ai/chat")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+
+    controller.classes["ai"].in_flight = 0
+    assert TestClient(app).post("/api/v1/ai/chat").status_code == 200
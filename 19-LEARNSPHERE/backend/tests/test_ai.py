@@ -0,0 +1,21 @@
+import app.services.ai_service as ai_service
+from conftest import SIZES, login, query_count, assert_flat
+
+async def _fake_qubrid(payload: str) -> str:
+    return "Keep going."
+
+def test_chat_budget(client, factory, monkeypatch):
+    monkeypatch.setattr(ai_service, "ask_qubrid", _fake_qubrid)
+    counts = []
+    for size in SIZES:
+        instructor = factory.user("instructor")
+        learner = factory.user()
+        for _ in range(size):
+            course = factory.course(instructor, lessons=3)
+            factory.enroll(learner, course, progress=30)
+            factory.activity(learner, course, factory.lessons(course)[:2], score=40)
+        login(client, learner)
+        response = client.post("/api/v1/ai/chat", json={"prompt": "What should I study next?"})
+        assert response.status_code == 200
+        counts.append(query_count(response))
+    assert_flat(counts)
@@ -0,0 +1,8 @@
+from conftest import login, query_count
+
+def test_register_profile_budget(client, factory):
+    login(client, factory.user())
+    response = client.post("/api/v1/auth/register-profile", json={"role": "instructor"})
+    assert response.status_code == 200
+    assert response.json()["role"] == "instructor"
+    assert query_count(response) <= 3
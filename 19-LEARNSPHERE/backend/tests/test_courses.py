@@ -0,0 +1,137 @@
+import json
+from conftest import SIZES, login, query_count, assert_flat
+from app.services.enrollment_service import bulk_enroll
+
+def test_my_courses_budget(client, factory):
+    counts = []
+    for size in SIZES:
+        instructor = factory.user("instructor")
+        learner = factory.user()
+        for _ in range(size):
+            factory.enroll(learner, factory.course(instructor, lessons=2), progress=40)
+        login(client, learner)
+        response = client.get("/api/v1/courses/my-courses")
+        assert response.status_code == 200
+        assert len(response.json()) == size
+        counts.append(query_count(response))
+    assert_flat(counts)
+
+def test_get_and_list_courses_budget(client, factory):
+    detail_counts, list_counts = [], []
+    for size in SIZES:
+        instructor = factory.user("instructor")
+        courses = [factory.course(instructor, lessons=size) for _ in range(size)]
+        login(client, factory.user())
+        response = client.get(f"/api/v1/courses/{courses[-1].id}")
+        assert response.status_code == 200
+        detail_counts.append(query_count(response))
+        response = client.get("/api/v1/courses")
+        assert response.status_code == 200
+        list_counts.append(query_count(response))
+    assert_flat(detail_counts)
+    assert_flat(list_counts)
+
+def test_create_and_edit_course_budget(client, factory):
+    create_counts, edit_counts = [], []
+    for size in SIZES:
+        instructor = factory.user("instructor")
+        course = factory.course(instructor, lessons=size)
+        login(client, instructor)
+        response = client.post("/api/v1/courses", json={"course_name": f"New {size}", "description": "Statistics"})
+        assert response.status_code == 200
+        create_counts.append(query_count(response))
+        response = client.put(f"/api/v1/courses/{course.id}", json={"course_name": "Renamed"})
+        assert response.status_code == 200
+        edit_counts.append(query_count(response))
+    assert_flat(create_counts)
+    assert_flat(edit_counts)
+
+def test_enroll_budget(client, factory):
+    counts = []
+    for size in SIZES:
+        instructor = factory.user("instructor")
+        course = factory.course(instructor, lessons=size)
+        for _ in range(size):
+            factory.enroll(factory.user(), course)
+        login(client, factory.user())
+        response = client.post(f"/api/v1/courses/{course.id}/enroll")
+        assert response.status_code == 200
+        counts.append(query_count(response))
+    assert_flat(counts)
+
+def test_bulk_enroll_budget(client, factory):
+    counts = []
+    for size in SIZES:
+        instructor = factory.user("instructor")
+        course = factory.course(instructor)
+        learners = [factory.user() for _ in range(size)]
+        login(client, instructor)
+        response = client.post(
+            f"/api/v1/courses/{course.id}/enroll/bulk",
+            json={"learner_ids": [str(learner.id) for learner in learners]}
+        )
+        assert response.status_code == 200
+        assert response.json()["created"] == size
+        counts.append(query_count(response))
+    assert_flat(counts)
+
+def test_bulk_enroll_matches_emails_case_insensitively(client, factory):
+    instructor = factory.user("instructor")
+    course = factory.course(instructor)
+    learner = factory.user()
+    login(client, instructor)
+    response = client.post(
+        f"/api/v1/courses/{course.id}/enroll/bulk",
+        json={"emails": [f"  {learner.email.upper()} ", "Nobody@Example.com"]}
+    )
+    assert response.status_code == 200
+    assert response.json()["created"] == 1
+    assert response.json()["not_found_identifiers"] == ["Nobody@Example.com"]
+
+def test_bulk_enroll_reports_uncommitted_rows_as_pending(db, factory):
+    instructor = factory.user("instructor")
+    course = factory.course(instructor)
+    learners = [factory.user() for _ in range(3)]
+    updates = list(bulk_enroll(db, course.id, [learner.id for learner in learners], [], chunk_size=2))
+    assert [update.get("pending") for update in updates[:-1]] == [2, 3]
+    assert all("created" not in update for update in updates[:-1])
+    assert updates[-1]["done"] and updates[-1]["created"] == 3
+
+def test_import_and_export_budget(client, factory):
+    import_counts = []
+    for size in SIZES:
+        instructor = factory.user("instructor")
+        lines = [{"course_name": f"Imported {size}"}] + [
+            {"title": f"Lesson {i}", "type": "video", "duration_minutes": 5} for i in range(size)
+        ]
+        login(client, instructor)
+        response = client.post("/api/v1/courses/import", content="\n".join(json.dumps(line) for line in lines))
+        assert response.status_code == 200
+        import_counts.append(query_count(response))
+
+        # The budget covers the streamed body; the call fails in "raise" mode if it is exceeded
+        response = client.get(f"/api/v1/courses/{response.json()['course_id']}/export")
+        assert response.status_code == 200
+        assert len(response.text.splitlines()) == size + 1
+    assert_flat(import_counts)
+
+def test_large_responses_are_compressed(client, factory):
+    instructor = factory.user("instructor")
+    course = factory.course(instructor, lessons=60)
+    for _ in range(40):
+        factory.course(instructor, lessons=0)
+    login(client, instructor)
+
+    response = client.get("/api/v1/courses", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert len(response.json()) == 41
+
+    response = client.get("/api/v1/courses", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+
+    # Streamed bodies go out uncompressed, chunk by chunk
+    response = client.get(f"/api/v1/courses/{course.id}/export", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert "Content-Encoding" not in response.headers
@@ -0,0 +1,197 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi import BackgroundTasks
+from app.core.cache import get_cache
+from app.core.invalidation import publish_invalidation, COURSE_ACTIVITY
+from app.models.progress import LessonProgress
+from app.models.tracking import QuizAttempt, LearningSession
+from app.models.enums import ProgressStatus
+from app.services.cohort_service import get_cohort_analytics
+from app.services import funnel_service
+from app.services.funnel_service import get_lesson_funnel, compute_lesson_funnel
+from conftest import SIZES, login, query_count, assert_flat
+
+def _course_with_cohort(factory, size):
+    instructor = factory.user("instructor")
+    course = factory.course(instructor, lessons=size)
+    lessons = factory.lessons(course)
+    for i in range(size):
+        learner = factory.user()
+        factory.enroll(learner, course, progress=(i * 40) % 101)
+        factory.activity(learner, course, lessons[:i + 1])
+    return instructor, course
+
+def test_metrics_and_learner_progress_budget(client, factory):
+    metrics_counts, progress_counts = [], []
+    for size in SIZES:
+        instructor, _ = _course_with_cohort(factory, size)
+        login(client, instructor)
+        response = client.get("/api/v1/dashboard/metrics")
+        assert response.status_code == 200
+        metrics_counts.append(query_count(response))
+        response = client.get("/api/v1/dashboard/learner-progress")
+        assert response.status_code == 200
+        assert len(response.json()) == size
+        progress_counts.append(query_count(response))
+    assert_flat(metrics_counts)
+    assert_flat(progress_counts)
+
+def test_cohort_and_funnel_budget(client, factory):
+    cohort_counts, funnel_counts = [], []
+    for size in SIZES:
+        instructor, course = _course_with_cohort(factory, size)
+        login(client, instructor)
+        response = client.get(f"/api/v1/dashboard/courses/{course.id}/cohort")
+        assert response.status_code == 200
+        cohort_counts.append(query_count(response))
+        response = client.get(f"/api/v1/dashboard/courses/{course.id}/funnel")
+        assert response.status_code == 200
+        funnel_counts.append(query_count(response))
+    assert_flat(cohort_counts)
+    assert_flat(funnel_counts)
+
+def _days_ago(days: float) -> datetime:
+    return datetime.now(timezone.utc) - timedelta(days=days)
+
+def _learner(factory, course, progress, enrolled_days_ago, completed=0, score=None, minutes=0, active_days_ago=None):
+    """
+    An enrolled learner with `completed` lessons done, one quiz attempt at `score` and
+    `minutes` of learning, all last touched `active_days_ago` days ago.
+    """
+    db = factory.db
+    learner = factory.user()
+    enrollment = factory.enroll(learner, course, progress=progress)
+    enrollment.enrolled_at = _days_ago(enrolled_days_ago)
+    lessons = factory.lessons(course)
+    active_at = _days_ago(active_days_ago) if active_days_ago is not None else None
+    for lesson in lessons[:completed]:
+        db.add(LessonProgress(
+            learner_id=learner.id, lesson_id=lesson.id, progress_percent=100,
+            status=ProgressStatus.completed, updated_at=active_at
+        ))
+    if score is not None:
+        db.add(QuizAttempt(user_id=learner.id, course_id=course.id, quiz_id=lessons[0].id, score=score, created_at=active_at))
+    if minutes:
+        db.add(LearningSession(
+            user_id=learner.id, course_id=course.id, lesson_id=lessons[0].id,
+            started_at=active_at, ended_at=active_at, duration_seconds=minutes * 60
+        ))
+    db.commit()
+    return learner
+
+def test_cohort_analytics_values(db, factory):
+    instructor = factory.user("instructor")
+    course = factory.course(instructor, lessons=4)
+    _learner(factory, course, 100, 30, completed=4, score=90, minutes=60, active_days_ago=1)
+    low_scorer = _learner(factory, course, 50, 30, completed=2, score=40, minutes=10, active_days_ago=1)
+    not_started = _learner(factory, course, 0, 30)
+    inactive = _learner(factory, course, 25, 40, completed=1, score=70, minutes=20, active_days_ago=20)
+
+    analytics = get_cohort_analytics(db, course.id)
+    assert analytics["total_learners"] == 4
+
+    scores = analytics["scores"]
+    assert scores["learners_with_attempts"] == 3
+    assert scores["percentiles"] == {"p10": 46.0, "p25": 55.0, "p50": 70.0, "p75": 80.0, "p90": 86.0}
+    assert {(b["from"], b["count"]) for b in scores["histogram"] if b["count"]} == {(40.0, 1), (70.0, 1), (90.0, 1)}
+    assert sum(b["count"] for b in scores["histogram"]) == 3
+
+    # Learners without sessions count as zero minutes
+    time_on_course = analytics["time_on_course_minutes"]
+    assert time_on_course["percentiles"] == {"p10": 3.0, "p25": 7.5, "p50": 15.0, "p75": 30.0, "p90": 48.0}
+    assert [(b["from"], b["to"], b["count"]) for b in time_on_course["histogram"]] == [
+        (0.0, 15.0, 2), (15.0, 30.0, 1), (30.0, 60.0, 0), (60.0, 120.0, 1),
+        (120.0, 240.0, 0), (240.0, 480.0, 0), (480.0, None, 0)
+    ]
+
+    completion = analytics["completion"]
+    assert completion["completed"] == 1
+    assert completion["percentiles"]["p50"] == 37.5
+    assert [step["completed"] for step in completion["funnel"]] == [3, 2, 1, 1]
+    assert [step["share"] for step in completion["funnel"]] == [0.75, 0.5, 0.25, 0.25]
+
+    at_risk = analytics["at_risk"]
+    assert at_risk["count"] == 3
+    # Most inactive first
+    assert [(entry["learner_id"], entry["reasons"]) for entry in at_risk["learners"]] == [
+        (str(not_started.id), ["inactive", "not_started"]),
+        (str(inactive.id), ["inactive"]),
+        (str(low_scorer.id), ["low_score"]),
+    ]
+    assert at_risk["learners"][0]["average_score"] is None
+    assert at_risk["learners"][1]["days_inactive"] == pytest.approx(20, abs=0.1)
+
+def test_course_activity_evicts_cohort_analytics(db, factory):
+    instructor = factory.user("instructor")
+    course = factory.course(instructor, lessons=2)
+    _learner(factory, course, 0, 1)
+    assert get_cohort_analytics(db, course.id)["total_learners"] == 1
+    _learner(factory, course, 0, 1)
+    # Served from the cache until the course's activity is invalidated
+    assert get_cohort_analytics(db, course.id)["total_learners"] == 1
+
+    publish_invalidation(db, COURSE_ACTIVITY, course.id)
+    assert get_cache("cohort_analytics").get(course.id) is not None
+    db.commit()
+    assert get_cache("cohort_analytics").get(course.id) is None
+    assert get_cohort_analytics(db, course.id)["total_learners"] == 2
+
+def test_lesson_funnel_values(db, factory):
+    instructor = factory.user("instructor")
+    course = factory.course(instructor, lessons=5)
+    for furthest in (1, 3, 3, 5):
+        _learner(factory, course, 0, 10, completed=furthest, active_days_ago=1)
+    _learner(factory, course, 0, 10)
+    # Progress without an enrollment doesn't count
+    outsider = factory.user()
+    db.add(LessonProgress(learner_id=outsider.id, lesson_id=factory.lessons(course)[4].id, progress_percent=50))
+    db.commit()
+
+    report = compute_lesson_funnel(db, course.id)
+    assert report["enrolled"] == 5
+    assert [step["order_index"] for step in report["steps"]] == [0, 1, 2, 3, 4]
+    assert [step["reached"] for step in report["steps"]] == [4, 3, 3, 1, 1]
+    assert [step["share"] for step in report["steps"]] == [0.8, 0.6, 0.6, 0.2, 0.2]
+    assert [step["dropped_before"] for step in report["steps"]] == [1, 1, 0, 2, 0]
+
+def _run(background_tasks: BackgroundTasks):
+    tasks, background_tasks.tasks = background_tasks.tasks, []
+    for task in tasks:
+        task.func(*task.args, **task.kwargs)
+    return len(tasks)
+
+def test_stale_funnel_is_served_and_refreshed_in_the_background(db, factory):
+    instructor = factory.user("instructor")
+    course = factory.course(instructor, lessons=2)
+    _learner(factory, course, 0, 10, completed=1, active_days_ago=1)
+    background_tasks = BackgroundTasks()
+
+    report = get_lesson_funnel(db, course.id, background_tasks)
+    assert (report["enrolled"], report["stale"], report["refreshing"]) == (1, False, False)
+    _learner(factory, course, 0, 10, completed=2, active_days_ago=1)
+    # Fresh: served from the cache, no refresh queued
+    assert get_lesson_funnel(db, course.id, background_tasks)["enrolled"] == 1
+    assert _run(background_tasks) == 0
+
+    cache = get_cache("lesson_funnel")
+    computed_at, cached = cache.get(course.id)
+    cache.set(course.id, (computed_at - funnel_service.FUNNEL_STALE_SECONDS - 1, cached))
+    report = get_lesson_funnel(db, course.id, background_tasks)
+    # The stale report is served while one refresh is queued, however many requests see it
+    assert (report["enrolled"], report["stale"], report["refreshing"]) == (1, True, True)
+    assert get_lesson_funnel(db, course.id, background_tasks)["refreshing"]
+    assert _run(background_tasks) == 1
+
+    report = get_lesson_funnel(db, course.id, background_tasks)
+    assert (report["enrolled"], report["stale"], report["refreshing"]) == (2, False, False)
+    assert [step["reached"] for step in report["steps"]] == [2, 1]
+
+def test_forced_funnel_refresh(db, factory):
+    instructor = factory.user("instructor")
+    course = factory.course(instructor, lessons=2)
+    background_tasks = BackgroundTasks()
+    assert get_lesson_funnel(db, course.id, background_tasks)["enrolled"] == 0
+    _learner(factory, course, 0, 10, completed=1, active_days_ago=1)
+    assert get_lesson_funnel(db, course.id, background_tasks, force_refresh=True)["refreshing"]
+    assert _run(background_tasks) == 1
+    assert get_lesson_funnel(db, course.id, background_tasks)["enrolled"] == 1
@@ -0,0 +1,14 @@
+from conftest import SIZES, login, query_count, assert_flat
+
+def test_update_progress_budget(client, factory):
+    counts = []
+    for size in SIZES:
+        instructor = factory.user("instructor")
+        learner = factory.user()
+        course = factory.course(instructor, lessons=size)
+        enrollment = factory.enroll(learner, course, progress=10)
+        login(client, learner)
+        response = client.patch(f"/api/v1/enrollments/{enrollment.id}/progress", json={"progress_percent": 60})
+        assert response.status_code == 200
+        counts.append(query_count(response))
+    assert_flat(counts)
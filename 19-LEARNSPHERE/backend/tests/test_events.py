@@ -0,0 +1,143 @@
+import json
+import asyncio
+import threading
+from app.core.events import EventBus, ALL_COURSES, event_bus, publish_event
+from app.models.enums import CourseStatus
+from app.routers.dashboard import dashboard_stream
+from conftest import login
+
+def test_fan_out_to_subscribers():
+    async def scenario():
+        bus = EventBus()
+        first, second = bus.subscribe(["c1"]), bus.subscribe(["c1"])
+        everything, elsewhere = bus.subscribe([ALL_COURSES]), bus.subscribe(["c2"])
+        assert bus.subscriber_count() == 4
+
+        bus.publish("c1", "progress_changed", {"learner_id": "l1"})
+        for subscription in (first, second, everything):
+            assert await subscription.wait(1)
+            events, dropped = subscription.drain()
+            assert [(e["type"], e["course_id"], e["data"]) for e in events] == [("progress_changed", "c1", {"learner_id": "l1"})]
+            assert dropped == 0
+        # Course-scoped: the c2 subscriber never sees c1 events
+        assert not await elsewhere.wait(0.01)
+        assert elsewhere.drain() == ([], 0)
+
+        bus.publish("c2", "status_changed", {})
+        assert [e["course_id"] for e in elsewhere.drain()[0]] == ["c2"]
+        assert [e["course_id"] for e in everything.drain()[0]] == ["c2"]
+        assert first.drain() == ([], 0)
+
+        for subscription in (first, second, everything, elsewhere):
+            bus.unsubscribe(subscription)
+        assert bus.subscriber_count() == 0
+    asyncio.run(scenario())
+
+def test_full_buffer_drops_oldest():
+    async def scenario():
+        bus = EventBus()
+        subscription = bus.subscribe(["c1"], maxsize=3)
+        for i in range(5):
+            bus.publish("c1", "quiz_submitted", {"n": i})
+        events, dropped = subscription.drain()
+        assert [e["data"]["n"] for e in events] == [2, 3, 4]
+        assert dropped == 2
+        # The count is reported once
+        assert subscription.drain() == ([], 0)
+    asyncio.run(scenario())
+
+def test_publish_from_a_worker_thread_wakes_the_consumer():
+    async def scenario():
+        bus = EventBus()
+        subscription = bus.subscribe(["c1"])
+        threading.Thread(target=bus.publish, args=("c1", "enrollment_created", {})).start()
+        assert await subscription.wait(5)
+        assert len(subscription.drain()[0]) == 1
+    asyncio.run(scenario())
+
+def test_stream_authorization(client, factory):
+    owner = factory.user("instructor")
+    course = factory.course(owner)
+
+    login(client, factory.user())
+    assert client.get("/api/v1/dashboard/stream").status_code == 403
+    assert client.get("/api/v1/dashboard/stream", params={"course_id": str(course.id)}).status_code == 403
+
+    login(client, factory.user("instructor"))
+    assert client.get("/api/v1/dashboard/stream", params={"course_id": str(course.id)}).status_code == 403
+    other = factory.course(factory.user("instructor"))
+    # One course the instructor doesn't own is enough to refuse the whole stream
+    login(client, owner)
+    response = client.get("/api/v1/dashboard/stream", params={"course_id": [str(course.id), str(other.id)]})
+    assert response.status_code == 403
+
+class OpenRequest:
+    """
+    Stands in for the client connection; the stream ends once `disconnected` is set.
+    """
+
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+def _parse(chunk: str) -> dict:
+    fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+    return {"event": fields["event"], "id": fields.get("id"), "data": json.loads(fields["data"])}
+
+def _open_stream(user, db, course_ids=None):
+    """
+    Runs the stream endpoint on a fresh event loop; returns (loop, request, body iterator).
+    """
+    loop = asyncio.new_event_loop()
+    request = OpenRequest()
+    response = loop.run_until_complete(dashboard_stream(request, course_id=course_ids, current_user=user, db=db))
+    return loop, request, response.body_iterator
+
+def _next(loop, body) -> dict:
+    return _parse(loop.run_until_complete(asyncio.wait_for(body.__anext__(), 5)))
+
+def _close(loop, request, body):
+    request.disconnected = True
+    loop.run_until_complete(body.aclose())
+    loop.close()
+
+def test_owner_stream_snapshot_and_course_filtering(db, factory):
+    owner = factory.user("instructor")
+    course, other = factory.course(owner), factory.course(owner)
+    factory.enroll(factory.user(), course, progress=100)
+    factory.enroll(factory.user(), course, progress=40)
+    baseline = event_bus.subscriber_count()
+
+    loop, request, body = _open_stream(owner, db, [course.id])
+    try:
+        assert event_bus.subscriber_count() == baseline + 1
+        snapshot = _next(loop, body)
+        assert snapshot["event"] == "snapshot"
+        assert snapshot["data"]["courses"] == {str(course.id): {
+            CourseStatus.NOT_STARTED.value: 0, CourseStatus.IN_PROGRESS.value: 1, CourseStatus.COMPLETED.value: 1
+        }}
+
+        # Only the subscribed course's events come through
+        publish_event(other.id, "status_changed", learner_id="skipped")
+        publish_event(course.id, "status_changed", learner_id="seen", status=CourseStatus.COMPLETED)
+        event = _next(loop, body)
+        assert event["event"] == "status_changed" and event["id"] is not None
+        assert event["data"]["course_id"] == str(course.id)
+        assert event["data"]["data"] == {"learner_id": "seen", "status": CourseStatus.COMPLETED.value}
+    finally:
+        _close(loop, request, body)
+    assert event_bus.subscriber_count() == baseline
+
+def test_admin_stream_sees_every_course(db, factory):
+    admin = factory.user("admin")
+    course = factory.course(factory.user("instructor"))
+
+    loop, request, body = _open_stream(admin, db)
+    try:
+        assert _next(loop, body)["event"] == "snapshot"
+        publish_event(course.id, "enrollment_created", learner_id="l1")
+        assert _next(loop, body)["data"]["course_id"] == str(course.id)
+    finally:
+        _close(loop, request, body)
@@ -0,0 +1,197 @@
+import threading
+import pytest
+from fastapi.testclient import TestClient
+import app.services.home_service as home_service
+from app.main import app
+from app.auth.jwt import verify_token
+from app.core.cache import clear_all_caches
+from app.core.config import settings
+from app.core.query_stats import RequestQueryStats, start_request_stats, reset_request_stats
+from app.db import replicas
+from app.db.replicas import ReplicaSet
+from app.db.session import SessionLocal, create_sqlite_engine
+from app.db.migrate import run_migrations
+from conftest import SIZES, Factory, login, query_count, assert_flat
+
+def test_home_budget(client, factory):
+    first_counts, repeat_counts = [], []
+    for size in SIZES:
+        learner = factory.user()
+        instructor = factory.user("instructor")
+        for i in range(size):
+            course = factory.course(instructor, lessons=2)
+            factory.enroll(learner, course, progress=50)
+            factory.activity(learner, course, factory.lessons(course)[:1])
+        login(client, learner)
+        response = client.get("/api/v1/home")
+        assert response.status_code == 200
+        first_counts.append(query_count(response))
+        response = client.get("/api/v1/home")
+        repeat_counts.append(query_count(response))
+
+        home = response.json()
+        assert len(home["enrollments"]) == size
+        assert all(enrollment["next_lesson"]["order_index"] == 1 for enrollment in home["enrollments"])
+        assert home["performance"]["average_score"] == 70
+        assert len(home["recent_activity"]) == min(size, home_service.RECENT_ACTIVITY_LIMIT)
+    assert_flat(first_counts)
+    assert_flat(repeat_counts)
+
+def test_home_conditional_refetch(client, factory):
+    learner = factory.user()
+    course = factory.course(factory.user("instructor"), lessons=2)
+    factory.enroll(learner, course)
+    login(client, learner)
+
+    response = client.get("/api/v1/home")
+    etag = response.headers["ETag"]
+    response = client.get("/api/v1/home", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    lesson = factory.lessons(course)[0]
+    client.post("/api/v1/lesson/progress", json={"course_id": str(course.id), "lesson_id": str(lesson.id), "percent": 100})
+    response = client.get("/api/v1/home", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+def test_home_is_for_learners(client, factory):
+    login(client, factory.user("instructor"))
+    assert client.get("/api/v1/home").status_code == 403
+
+def test_home_parts_run_concurrently(db, monkeypatch):
+    barrier = threading.Barrier(2, timeout=5)
+
+    def part(name):
+        def load(db, user_id):
+            # Both parts must be in flight at once to get past the barrier
+            barrier.wait()
+            return name, threading.current_thread().name
+        return load
+
+    monkeypatch.setattr(home_service, "HOME_PARTS", {"a": (part("a"), True), "b": (part("b"), False)})
+    monkeypatch.setattr(settings, "HOME_QUERY_WORKERS", 2)
+    monkeypatch.setattr(home_service, "_executor", None)
+    parts = home_service._load_parts(db, db, None)
+    home_service._executor.shutdown()
+
+    assert {name: result[0] for name, result in parts.items()} == {"a": "a", "b": "b"}
+    assert all(result[1].startswith("home-query") for result in parts.values())
+
+def test_parts_share_request_query_stats_safely():
+    stats = RequestQueryStats(track_shapes=True)
+    threads, per_thread = 8, 2000
+
+    def run():
+        for _ in range(per_thread):
+            stats.record_query("SELECT 1", 0.001)
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert stats.count == threads * per_thread
+    assert stats.shapes == {"SELECT 1": threads * per_thread}
+
+@pytest.fixture
+def file_database(tmp_path, monkeypatch):
+    """
+    A file-backed SQLite database, so every part can hold its own connection the way it does on
+    Postgres. It doubles as a read replica, reached through a separate engine.
+    """
+    url = f"sqlite:///{tmp_path / 'home.db'}"
+    engine = create_sqlite_engine(url)
+    run_migrations(engine)
+    SessionLocal.configure(bind=engine)
+    replica_set = ReplicaSet([url])
+    monkeypatch.setattr(replicas, "_replicas", replica_set)
+    monkeypatch.setattr(replicas, "_recent_writers", None)
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_URLS", url)
+    monkeypatch.setattr(settings, "HOME_QUERY_WORKERS", 4)
+    monkeypatch.setattr(home_service, "_executor", None)
+    db = SessionLocal()
+    yield db
+    db.close()
+    if home_service._executor is not None:
+        home_service._executor.shutdown()
+    SessionLocal.configure(bind=None)
+    clear_all_caches()
+    for replica_engine in replica_set.engines:
+        replica_engine.dispose()
+    engine.dispose()
+
+def _seed_home(factory, courses: int = 3):
+    learner = factory.user()
+    instructor = factory.user("instructor")
+    for _ in range(courses):
+        course = factory.course(instructor, lessons=3)
+        factory.enroll(learner, course, progress=30)
+        factory.activity(learner, course, factory.lessons(course)[:1])
+    # Keep the learner loaded, then end the read transaction: an open one would lock out SQLite writers
+    factory.db.refresh(learner)
+    factory.db.expunge(learner)
+    factory.db.commit()
+    return learner
+
+def test_concurrent_home_with_real_parts(file_database, monkeypatch):
+    learner = _seed_home(Factory(file_database))
+    seen = {}
+
+    def observed(name, part):
+        def run(db, user_id):
+            # Holds on to the session so a finished part's id can't be reused by the next one
+            seen[name] = (threading.current_thread().name, db.get_bind() in replicas.get_replicas().engines, db)
+            return part(db, user_id)
+        return run
+    monkeypatch.setattr(home_service, "HOME_PARTS", {
+        name: (observed(name, part), replica_ok) for name, (part, replica_ok) in home_service.HOME_PARTS.items()
+    })
+
+    def load(workers: int):
+        monkeypatch.setattr(settings, "HOME_QUERY_WORKERS", workers)
+        clear_all_caches()
+        # As get_read_db would hand them over: the primary and a replica session
+        db, read_db = SessionLocal(), replicas.get_replicas().open_session()
+        stats, token = start_request_stats(None)
+        try:
+            home = home_service.get_learner_home(db, read_db, learner.id)
+        finally:
+            reset_request_stats(token)
+            db.close()
+            read_db.close()
+        return home, stats.count
+
+    # The first visit also computes the performance snapshot; compare visits after it
+    load(0)
+    sequential, sequential_count = load(0)
+    concurrent, concurrent_count = load(4)
+    assert concurrent == sequential
+    assert len(concurrent["enrollments"]) == 3
+    assert all(enrollment["next_lesson"]["order_index"] == 1 for enrollment in concurrent["enrollments"])
+    # Every part ran on a pool thread, on its own session; replica-safe parts on the replica
+    assert all(thread.startswith("home-query") for thread, _, _ in seen.values())
+    assert len({id(session) for _, _, session in seen.values()}) == len(seen)
+    assert {name: on_replica for name, (_, on_replica, _) in seen.items()} == {
+        "enrollments": True, "performance": True, "recent_activity": True, "next_lessons": False
+    }
+    # Queries made on the pool threads still count against the request
+    assert concurrent_count == sequential_count > 0
+
+def test_concurrent_home_request_within_budget(file_database):
+    learner = _seed_home(Factory(file_database))
+    claims = {}
+    app.dependency_overrides[verify_token] = lambda: dict(claims)
+    client = TestClient(app)
+    client.claims = claims
+    try:
+        login(client, learner)
+        # The budget is enforced ("raise" mode) over the queries of all four threads
+        first = client.get("/api/v1/home")
+        repeat = client.get("/api/v1/home")
+    finally:
+        app.dependency_overrides.pop(verify_token, None)
+    assert first.status_code == repeat.status_code == 200
+    assert len(repeat.json()["enrollments"]) == 3
+    assert repeat.json()["performance"]["average_score"] == 70
+    assert 0 < query_count(repeat) <= query_count(first)
@@ -0,0 +1,105 @@
+import os
+import json
+import time
+import uuid
+import pytest
+from sqlalchemy import text
+from app.core import invalidation
+from app.core.cache import TTLCache, get_cache
+from app.core.invalidation import publish_invalidation, handle_notification, worker_origin
+
+TEST_TYPE = "test_changed"
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = get_cache("test_invalidation") or TTLCache("test_invalidation")
+    cache.clear()
+    monkeypatch.setitem(invalidation.INVALIDATION_TARGETS, TEST_TYPE, ["test_invalidation"])
+    return cache
+
+def test_publish_evicts_after_commit(db, cache):
+    key = uuid.uuid4()
+    cache.set(key, "stale")
+    publish_invalidation(db, TEST_TYPE, key)
+    # Other requests keep the old value until the write is committed
+    assert cache.get(key) == "stale"
+    db.commit()
+    assert cache.get(key) is None
+
+def test_rollback_discards_pending_invalidations(db, cache):
+    key = uuid.uuid4()
+    cache.set(key, "current")
+    publish_invalidation(db, TEST_TYPE, key)
+    db.rollback()
+    db.commit()
+    assert cache.get(key) == "current"
+
+def test_publish_skips_types_without_targets(db, monkeypatch):
+    monkeypatch.setitem(invalidation.INVALIDATION_TARGETS, TEST_TYPE, [])
+    executed = []
+    monkeypatch.setattr(db, "execute", lambda *args, **kwargs: executed.append(args))
+    publish_invalidation(db, TEST_TYPE, uuid.uuid4())
+    assert executed == []
+    assert "pending_invalidations" not in db.info
+
+def test_unknown_type_is_rejected(db):
+    with pytest.raises(ValueError):
+        publish_invalidation(db, "no_such_type", uuid.uuid4())
+
+def test_handle_notification(cache):
+    key = uuid.uuid4()
+    other = uuid.uuid4()
+    for k in (key, other):
+        cache.set(k, "stale")
+
+    # A worker ignores its own messages: it already evicted after commit
+    handle_notification(json.dumps({"type": TEST_TYPE, "keys": [str(key)], "origin": worker_origin()}))
+    assert cache.get(key) == "stale"
+
+    handle_notification(json.dumps({"type": TEST_TYPE, "keys": [str(key)], "origin": "elsewhere"}))
+    assert cache.get(key) is None
+    assert cache.get(other) == "stale"
+
+    for payload in ("not json", json.dumps({"type": TEST_TYPE}), json.dumps({"type": TEST_TYPE, "keys": ["bad"]})):
+        handle_notification(payload)
+    assert cache.get(other) == "stale"
+
+def _wait_for(condition, timeout: float = 10) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+@pytest.mark.skipif(
+    not os.environ.get("TEST_DATABASE_URL", "").startswith("postgresql"),
+    reason="needs a local Postgres (TEST_DATABASE_URL)"
+)
+def test_listener_evicts_and_flushes_on_reconnect(engine, cache, monkeypatch):
+    pytest.importorskip("psycopg2")
+    monkeypatch.setattr(invalidation, "RECONNECT_MIN_SECONDS", 0.1)
+    channel = f"test_invalidation_{uuid.uuid4().hex[:8]}"
+    listener = invalidation.InvalidationListener(invalidation._listener_dsn(), channel)
+    listener.start()
+    try:
+        assert listener.connected.wait(10)
+        key = uuid.uuid4()
+        cache.set(key, "stale")
+        payload = json.dumps({"type": TEST_TYPE, "keys": [str(key)], "origin": "elsewhere"})
+        with engine.begin() as connection:
+            connection.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": channel, "payload": payload})
+        assert _wait_for(lambda: cache.get(key) is None)
+
+        # Drop the listener's connection: notifications may be lost in the gap, so every cache is flushed
+        other = uuid.uuid4()
+        cache.set(other, "cached before the gap")
+        with engine.begin() as connection:
+            connection.execute(
+                text("SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE query = :query"),
+                {"query": f'LISTEN "{channel}"'}
+            )
+        assert _wait_for(lambda: cache.get(other) is None)
+        assert _wait_for(listener.connected.is_set)
+    finally:
+        listener.stop()
@@ -0,0 +1,72 @@
+import pytest
+from app.core.config import settings
+import app.services.leaderboard_service as leaderboard_service
+from app.services.leaderboard_service import record_leaderboard_completion, InMemoryLeaderboardBackend, LeaderboardBackend
+from conftest import SIZES, login, query_count, assert_flat
+
+def test_leaderboard_budget(client, factory):
+    counts = []
+    for size in SIZES:
+        instructor = factory.user("instructor")
+        course = factory.course(instructor)
+        for i in range(size):
+            learner = factory.user()
+            factory.enroll(learner, course, progress=i * 3)
+            record_leaderboard_completion(learner.id, course.id, i * 3)
+        login(client, learner)
+        response = client.get(f"/api/v1/courses/{course.id}/leaderboard", params={"metric": "completion"})
+        assert response.status_code == 200
+        counts.append(query_count(response))
+    assert_flat(counts)
+
+def test_startup_rebuilds_from_database_over_a_snapshot(factory, tmp_path, monkeypatch):
+    course = factory.course(factory.user("instructor"))
+    learner = factory.user()
+    factory.enroll(learner, course, progress=40)
+    board = leaderboard_service.board_name(course.id, leaderboard_service.METRIC_COMPLETION)
+
+    # A fresh snapshot saved before the enrollment's latest progress
+    snapshot = tmp_path / "boards.json"
+    monkeypatch.setattr(settings, "LEADERBOARD_SNAPSHOT_PATH", str(snapshot))
+    monkeypatch.setattr(leaderboard_service, "_backend", InMemoryLeaderboardBackend())
+    monkeypatch.setattr(leaderboard_service, "_snapshot_loop", lambda stop_event, interval: None)
+    leaderboard_service.get_leaderboard_backend().update(board, str(learner.id), 10)
+    leaderboard_service.save_snapshot()
+    assert [path.name for path in tmp_path.iterdir()] == ["boards.json"]
+
+    monkeypatch.setattr(leaderboard_service, "_backend", InMemoryLeaderboardBackend())
+    leaderboard_service.init_leaderboards()
+    assert leaderboard_service.get_leaderboard_backend().rank(board, str(learner.id)) == (1, 40)
+
+def test_startup_falls_back_to_snapshot_when_database_fails(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "LEADERBOARD_SNAPSHOT_PATH", str(tmp_path / "boards.json"))
+    monkeypatch.setattr(leaderboard_service, "_backend", InMemoryLeaderboardBackend())
+    monkeypatch.setattr(leaderboard_service, "_snapshot_loop", lambda stop_event, interval: None)
+    leaderboard_service.get_leaderboard_backend().update("course:score", "learner", 75)
+    leaderboard_service.save_snapshot()
+
+    def failing_rebuild():
+        raise RuntimeError("database is down")
+    monkeypatch.setattr(leaderboard_service, "_rebuild_from_database", failing_rebuild)
+    monkeypatch.setattr(leaderboard_service, "_backend", InMemoryLeaderboardBackend())
+    leaderboard_service.init_leaderboards()
+    assert leaderboard_service.get_leaderboard_backend().rank("course:score", "learner") == (1, 75)
+
+def test_leaderboard_access(client, factory):
+    owner = factory.user("instructor")
+    course = factory.course(owner)
+    learner = factory.user()
+    factory.enroll(learner, course)
+    url = f"/api/v1/courses/{course.id}/leaderboard"
+    for user, status in [(learner, 200), (owner, 200), (factory.user("admin"), 200),
+                         (factory.user(), 403), (factory.user("instructor"), 403)]:
+        login(client, user)
+        assert client.get(url).status_code == status
+
+def test_incomplete_backend_cannot_be_constructed():
+    class ScoresOnly(LeaderboardBackend):
+        def update(self, board, member, score):
+            pass
+
+    with pytest.raises(TypeError):
+        ScoresOnly()
@@ -0,0 +1,45 @@
+from datetime import datetime, timezone, timedelta
+import pytest
+from app.models.mastery import LessonMastery
+from app.models.tracking import QuizAttempt
+from app.services.mastery_service import backfill_lesson_mastery, record_quiz_score, MASTERY_ALPHA
+
+def test_backfill_replays_attempts_through_the_rolling_score(db, factory):
+    learner = factory.user()
+    course = factory.course(factory.user("instructor"), lessons=2)
+    first, second = factory.lessons(course)
+    started = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for minutes, lesson, score in [(0, first, 40), (10, first, 90), (5, second, 70)]:
+        db.add(QuizAttempt(user_id=learner.id, course_id=course.id, quiz_id=lesson.id, score=score,
+                           total_questions=10, time_taken_seconds=60, created_at=started + timedelta(minutes=minutes)))
+    db.commit()
+
+    assert backfill_lesson_mastery(db, users_per_batch=1) == 2
+    mastery = {row.lesson_id: row for row in db.query(LessonMastery).filter(LessonMastery.user_id == learner.id)}
+    assert mastery[first.id].attempt_count == 2
+    assert mastery[first.id].ewma_score == pytest.approx(MASTERY_ALPHA * 90 + (1 - MASTERY_ALPHA) * 40)
+    assert mastery[first.id].last_score == 90
+    assert mastery[second.id].ewma_score == 70
+
+    # Rows that already exist, backfilled or live, are left alone
+    record_quiz_score(db, learner.id, course.id, second.id, 100)
+    db.commit()
+    assert backfill_lesson_mastery(db) == 0
+    assert db.query(LessonMastery).filter(LessonMastery.user_id == learner.id).count() == 2
+
+def test_record_quiz_score_upserts_over_a_row_it_has_not_seen(db, factory):
+    learner = factory.user()
+    course = factory.course(factory.user("instructor"), lessons=1)
+    lesson, = factory.lessons(course)
+    # This session's view of the row is stale, as when another submission created it concurrently
+    stale = record_quiz_score(db, learner.id, course.id, lesson.id, 40)
+    db.commit()
+    db.query(LessonMastery).filter(LessonMastery.id == stale.id).update({"attempt_count": 5}, synchronize_session=False)
+
+    mastery = record_quiz_score(db, learner.id, course.id, lesson.id, 90)
+    db.commit()
+    assert mastery is stale
+    assert mastery.attempt_count == 6
+    assert mastery.ewma_score == pytest.approx(MASTERY_ALPHA * 90 + (1 - MASTERY_ALPHA) * 40)
+    assert mastery.last_score == 90
+    assert db.query(LessonMastery).filter(LessonMastery.user_id == learner.id).count() == 1
@@ -0,0 +1,122 @@
+import re
+import uuid
+import pytest
+from collections import defaultdict
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app.core.instrumentation import RequestMetricsMiddleware
+from app.core.metrics import Histogram, render_metrics
+from app.core.responses import FastJSONResponse
+from app.db.session import SessionLocal
+from conftest import login
+
+SAMPLE = re.compile(r'^(?P<name>[a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(?P<labels>.*)\})? (?P<value>\S+)$')
+LABEL = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+def parse_exposition(body: str):
+    """
+    ({metric name: type}, [(sample name, labels, value)]) from the Prometheus text format.
+    """
+    types, samples = {}, []
+    for line in body.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            types[name] = kind
+        elif line and not line.startswith("#"):
+            match = SAMPLE.match(line)
+            assert match, f"malformed sample line: {line!r}"
+            labels = dict(LABEL.findall(match["labels"] or ""))
+            samples.append((match["name"], labels, float(match["value"])))
+    return types, samples
+
+def histogram_series(samples, name: str) -> dict:
+    """
+    {labels without le: {"buckets": [(le, count)], "count": n, "sum": s}} for one histogram.
+    """
+    series = defaultdict(lambda: {"buckets": []})
+    for sample, labels, value in samples:
+        key = tuple(sorted((k, v) for k, v in labels.items() if k != "le"))
+        if sample == f"{name}_bucket":
+            series[key]["buckets"].append((labels["le"], value))
+        elif sample == f"{name}_count":
+            series[key]["count"] = value
+        elif sample == f"{name}_sum":
+            series[key]["sum"] = value
+    return dict(series)
+
+TEST_HISTOGRAM = Histogram("test_exposition_seconds", "Histogram owned by the exposition test", ("route",), buckets=(0.1, 1))
+
+def test_histogram_exposition():
+    for value in (0.05, 0.1, 0.5, 5):
+        TEST_HISTOGRAM.observe(value, route="/a")
+    types, samples = parse_exposition(render_metrics())
+    assert types["test_exposition_seconds"] == "histogram"
+    series = histogram_series(samples, "test_exposition_seconds")[(("route", "/a"),)]
+    # Cumulative; an observation equal to a bound falls in that bucket
+    assert series["buckets"] == [("0.1", 2), ("1", 3), ("+Inf", 4)]
+    assert series["count"] == 4
+    assert series["sum"] == pytest.approx(5.65)
+
+def test_metrics_endpoint(client, factory):
+    instructor = factory.user("instructor")
+    course = factory.course(instructor)
+    login(client, instructor)
+    assert client.get(f"/api/v1/courses/{course.id}").status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    types, samples = parse_exposition(response.text)
+    assert types["http_requests_total"] == "counter"
+    assert types["http_requests_in_flight"] == "gauge"
+    assert types["http_request_duration_seconds"] == "histogram"
+    # Every sample belongs to a declared family
+    for name, _, _ in samples:
+        assert name in types or re.sub(r"_(bucket|sum|count)$", "", name) in types, name
+
+    for name, kind in types.items():
+        if kind != "histogram":
+            continue
+        for labels, series in histogram_series(samples, name).items():
+            bounds = [le for le, _ in series["buckets"]]
+            counts = [count for _, count in series["buckets"]]
+            assert bounds[-1] == "+Inf", (name, labels)
+            assert [float(b) for b in bounds] == sorted(float(b) for b in bounds)
+            assert counts == sorted(counts), f"{name}{labels} buckets are not cumulative"
+            assert series["count"] == counts[-1]
+
+    # Labelled with the route template, not the path that was requested
+    routes = {labels.get("route") for name, labels, _ in samples if name == "http_requests_total"}
+    assert "/api/v1/courses/{course_id}" in routes
+    assert not any(str(course.id) in (route or "") for route in routes)
+    assert any(
+        labels == {"method": "GET", "route": "/api/v1/courses/{course_id}", "status": "200"} and value >= 1
+        for name, labels, value in samples if name == "http_requests_total"
+    )
+
+def test_server_timing_header(connection):
+    inner = FastAPI()
+
+    @inner.get("/api/v1/courses/{course_id}")
+    def read(course_id: uuid.UUID):
+        db = SessionLocal()
+        try:
+            db.execute(text("SELECT 1"))
+            db.execute(text("SELECT 2"))
+        finally:
+            db.close()
+        return FastJSONResponse({"course_id": course_id})
+
+    client = TestClient(RequestMetricsMiddleware(inner, query_count_header=True, server_timing_header=True))
+    response = client.get(f"/api/v1/courses/{uuid.uuid4()}")
+    assert response.status_code == 200
+    assert response.headers["X-Query-Count"] == "2"
+    assert re.fullmatch(
+        r'db;dur=\d+\.\d;desc="2 queries", serialize;dur=\d+\.\d, app;dur=\d+\.\d',
+        response.headers["Server-Timing"]
+    )
+
+    # Off by default
+    client = TestClient(RequestMetricsMiddleware(inner))
+    assert "Server-Timing" not in client.get(f"/api/v1/courses/{uuid.uuid4()}").headers
@@ -0,0 +1,66 @@
+from app.models.profile import UserProfile
+from conftest import SIZES, login, query_count, assert_flat
+
+def test_profile_budget(client, factory):
+    user = factory.user()
+    response = client.get("/api/v1/profile", params={"email": user.email})
+    assert response.status_code == 200
+    assert response.json() is None
+    assert query_count(response) <= 1
+
+    for display_name in ("First", "Second"):
+        response = client.post("/api/v1/profile", json={"email": user.email, "displayName": display_name})
+        assert response.status_code == 200
+        assert query_count(response) <= 4
+
+def test_profile_reads_are_cached_until_updated(client, factory):
+    user = factory.user()
+    client.post("/api/v1/profile", json={"email": user.email, "displayName": "Ada"})
+
+    response = client.get("/api/v1/profile", params={"email": user.email})
+    assert response.json()["displayName"] == "Ada"
+    assert response.json()["username"] == user.email.split("@")[0]
+    response = client.get("/api/v1/profile", params={"email": user.email})
+    assert response.json()["displayName"] == "Ada"
+    assert query_count(response) == 0
+
+    client.post("/api/v1/profile", json={"email": user.email, "displayName": "Grace"})
+    response = client.get("/api/v1/profile", params={"email": user.email})
+    assert response.json()["displayName"] == "Grace"
+
+def test_unknown_profile_is_404(client):
+    response = client.get("/api/v1/profile", params={"email": "nobody@example.com"})
+    assert response.status_code == 404
+
+def test_batch_profiles_budget(client, factory, db):
+    instructor = factory.user("instructor")
+    counts = []
+    for size in SIZES:
+        learners = [factory.user() for _ in range(size + 1)]
+        db.add(UserProfile(user_id=learners[0].id, display_name="Named Learner"))
+        db.flush()
+        login(client, instructor)
+        response = client.post("/api/v1/profile/batch", json={"user_ids": [str(learner.id) for learner in learners]})
+        assert response.status_code == 200
+        profiles = response.json()["profiles"]
+        assert len(profiles) == size + 1
+        assert profiles[str(learners[0].id)]["displayName"] == "Named Learner"
+        assert profiles[str(learners[-1].id)]["displayName"] == learners[-1].email.split("@")[0]
+        counts.append(query_count(response))
+    assert_flat(counts)
+
+def test_batch_profiles_requires_instructor(client, factory):
+    login(client, factory.user())
+    response = client.post("/api/v1/profile/batch", json={"user_ids": []})
+    assert response.status_code == 403
+
+def test_learner_progress_shows_display_names(client, factory, db):
+    instructor = factory.user("instructor")
+    course = factory.course(instructor, lessons=1)
+    learner = factory.user()
+    factory.enroll(learner, course)
+    db.add(UserProfile(user_id=learner.id, display_name="Ada Lovelace"))
+    db.flush()
+    login(client, instructor)
+    response = client.get("/api/v1/dashboard/learner-progress")
+    assert [row["learner_name"] for row in response.json()] == ["Ada Lovelace"]
@@ -0,0 +1,106 @@
+import pytest
+import app.core.rate_limit as rate_limit_module
+import app.services.ai_service as ai_service
+from app.core.config import settings
+from app.core.rate_limit import InMemoryRateLimitStore, Rate, RateLimitStore
+from conftest import login
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_token_bucket_bursts_then_refills():
+    clock = FakeClock()
+    store = InMemoryRateLimitStore(clock=clock)
+    rate = Rate.parse("3/minute")
+    assert [store.take("k", rate).allowed for _ in range(4)] == [True, True, True, False]
+    clock.now += 20 # one token back
+    assert store.take("k", rate).allowed
+    assert not store.take("k", rate).allowed
+    # Buckets are independent per key
+    assert store.take("other", rate).allowed
+
+def test_least_recently_used_buckets_are_evicted():
+    store = InMemoryRateLimitStore(max_keys=2, clock=FakeClock())
+    rate = Rate.parse("1/hour")
+    for key in ("a", "b", "c"):
+        store.take(key, rate)
+    assert len(store._buckets) == 2
+    assert "a" not in store._buckets
+
+@pytest.fixture
+def ai_limits(monkeypatch):
+    async def fake_qubrid(payload):
+        return "Keep going."
+    monkeypatch.setattr(ai_service, "ask_qubrid", fake_qubrid)
+    monkeypatch.setitem(settings.RATE_LIMITS, "ai", {"default": "2/minute", "admin": "5/minute"})
+    monkeypatch.setattr(rate_limit_module, "_store", InMemoryRateLimitStore())
+    monkeypatch.setattr(rate_limit_module, "_rates", {})
+
+def test_ai_chat_is_limited_per_user(client, factory, ai_limits):
+    learner = factory.user()
+    login(client, learner)
+    chat = lambda: client.post("/api/v1/ai/chat", json={"prompt": "Help"})
+
+    first = chat()
+    assert first.status_code == 200
+    assert first.headers["RateLimit-Limit"] == "2"
+    assert first.headers["RateLimit-Remaining"] == "1"
+    assert first.headers["RateLimit-Policy"] == "2;w=60"
+    assert chat().status_code == 200
+
+    refused = chat()
+    assert refused.status_code == 429
+    assert refused.headers["RateLimit-Remaining"] == "0"
+    assert 0 < int(refused.headers["Retry-After"]) <= 30
+
+    # Another user has their own bucket, and roles get their own limits
+    login(client, factory.user("admin"))
+    response = chat()
+    assert response.status_code == 200
+    assert response.headers["RateLimit-Limit"] == "5"
+
+@pytest.mark.parametrize("value", ["0/minute", "-1/hour", "5/fortnight", "five/minute"])
+def test_invalid_rates_are_rejected(value, monkeypatch):
+    monkeypatch.setitem(settings.RATE_LIMITS, "ai", {"default": value})
+    with pytest.raises(ValueError):
+        rate_limit_module.validate_rate_limits()
+
+def test_routes_of_a_class_have_their_own_buckets(client, factory, monkeypatch):
+    monkeypatch.setitem(settings.RATE_LIMITS, "tracking", {"default": "1/minute"})
+    monkeypatch.setattr(rate_limit_module, "_store", InMemoryRateLimitStore())
+    monkeypatch.setattr(rate_limit_module, "_rates", {})
+    course = factory.course(factory.user("instructor"))
+    login(client, factory.user())
+    start = lambda: client.post("/api/v1/course/start", json={"course_id": str(course.id)})
+
+    assert start().status_code == 200
+    assert start().status_code == 429
+    # Ending a session doesn't spend the course-start bucket
+    response = client.post("/api/v1/session/end", json={
+        "course_id": str(course.id), "started_at": "2024-01-01T10:00:00", "ended_at": "2024-01-01T10:30:00"
+    })
+    assert response.status_code == 200
+    assert response.headers["RateLimit-Remaining"] == "0"
+
+def test_incomplete_store_cannot_be_constructed():
+    class NoTake(RateLimitStore):
+        pass
+
+    with pytest.raises(TypeError):
+        NoTake()
+
+class BrokenStore:
+    def take(self, key, rate):
+        raise ConnectionError("redis is down")
+
+def test_store_errors_fail_open(client, factory, ai_limits, monkeypatch):
+    monkeypatch.setattr(rate_limit_module, "_store", BrokenStore())
+    login(client, factory.user())
+    for _ in range(3):
+        response = client.post("/api/v1/ai/chat", json={"prompt": "Help"})
+        assert response.status_code == 200
+        assert "RateLimit-Limit" not in response.headers
@@ -0,0 +1,110 @@
+from datetime import datetime, timezone, timedelta
+from app.core.invalidation import publish_invalidation, COURSE_EDITED
+from app.models.lesson import Lesson
+from app.models.course import Enrollment
+from app.models.enums import LessonType
+from app.core.cache import get_cache
+from app.services.course_recommendation_service import train_course_embeddings, refresh_course_embeddings
+from app.services.course_lessons_service import get_course_lesson_index
+from app.services.next_lesson_service import mark_lesson_completion
+from conftest import SIZES, login, query_count, assert_flat
+
+def test_next_lessons_budget(client, factory):
+    counts = []
+    for size in SIZES:
+        instructor = factory.user("instructor")
+        learner = factory.user()
+        for _ in range(size):
+            course = factory.course(instructor, lessons=4)
+            factory.enroll(learner, course, progress=25)
+            factory.activity(learner, course, factory.lessons(course)[:1])
+        login(client, learner)
+        response = client.get("/api/v1/recommendations/next-lessons")
+        assert response.status_code == 200
+        assert len(response.json()["next_lessons"]) == size
+        counts.append(query_count(response))
+    assert_flat(counts)
+
+def test_recommended_courses_budget(client, factory):
+    counts = []
+    for size in SIZES:
+        instructor = factory.user("instructor")
+        learner = factory.user()
+        courses = [factory.course(instructor) for _ in range(size + 1)]
+        factory.enroll(learner, courses[0], progress=50)
+        # Enrollments elsewhere give the popularity fallback something to rank
+        peer = factory.user()
+        for course in courses[1:]:
+            factory.enroll(peer, course)
+        login(client, learner)
+        response = client.get("/api/v1/recommendations/courses")
+        assert response.status_code == 200
+        assert len(response.json()["courses"]) == min(size, 5)
+        counts.append(query_count(response))
+    assert_flat(counts)
+
+def test_refresh_counts_new_enrollments_towards_popularity(db, factory):
+    instructor = factory.user("instructor")
+    popular, quiet = factory.course(instructor), factory.course(instructor)
+    first, second = factory.user(), factory.user()
+    factory.enroll(first, popular, progress=80)
+    factory.enroll(second, popular, progress=40)
+    factory.enroll(second, quiet, progress=10)
+    db.query(Enrollment).update({"enrolled_at": datetime.now(timezone.utc) - timedelta(days=2)}, synchronize_session=False)
+    db.commit()
+    model = train_course_embeddings(db, factors=4, iterations=2)
+    model.trained_at = (datetime.now(timezone.utc) - timedelta(days=1)).timestamp()
+    popularity = lambda m, course: m.popularity[m.course_position[str(course.id)]]
+    assert (popularity(model, popular), popularity(model, quiet)) == (2, 1)
+
+    # The refresh reloads every enrollment of a touched learner, but counts only the new ones
+    new = factory.course(instructor)
+    factory.enroll(first, quiet)
+    factory.enroll(first, new)
+    factory.enroll(factory.user(), quiet)
+    refreshed = refresh_course_embeddings(db, model)
+    assert (popularity(refreshed, popular), popularity(refreshed, quiet), popularity(refreshed, new)) == (2, 3, 1)
+
+def _insert_lesson_first(db, course) -> Lesson:
+    """
+    Adds a lesson ahead of the existing ones, shifting every position, the way a course edit would.
+    """
+    lesson = Lesson(course_id=course.id, title="New intro", type=LessonType.video, duration_minutes=5, order_index=-1)
+    db.add(lesson)
+    publish_invalidation(db, COURSE_EDITED, course.id)
+    db.commit()
+    return lesson
+
+def _next_lesson(client) -> str:
+    response = client.get("/api/v1/recommendations/next-lessons")
+    assert response.status_code == 200
+    return response.json()["next_lessons"][0]["lesson_id"]
+
+def test_next_lessons_follow_a_lesson_insert(client, factory, db):
+    course = factory.course(factory.user("instructor"), lessons=3)
+    learner = factory.user()
+    factory.enroll(learner, course, progress=30)
+    first, second, _ = factory.lessons(course)
+    factory.activity(learner, course, [first])
+    login(client, learner)
+    assert _next_lesson(client) == str(second.id)
+
+    # The cached bitset says "position 0 done", which is now the new lesson, not the completed one
+    intro = _insert_lesson_first(db, course)
+    assert _next_lesson(client) == str(intro.id)
+
+def test_completion_on_a_stale_bitset_drops_it(client, factory, db):
+    course = factory.course(factory.user("instructor"), lessons=3)
+    learner = factory.user()
+    factory.enroll(learner, course, progress=30)
+    first, second, _ = factory.lessons(course)
+    factory.activity(learner, course, [first])
+    login(client, learner)
+    assert _next_lesson(client) == str(second.id)
+    assert get_cache("learner_lesson_state").get(learner.id) is not None
+
+    intro = _insert_lesson_first(db, course)
+    # Flipping a bit by the new position in the old bitset would mark the wrong lesson
+    mark_lesson_completion(learner.id, get_course_lesson_index(db, course.id), second.id, True)
+    assert get_cache("learner_lesson_state").get(learner.id) is None
+    assert _next_lesson(client) == str(intro.id)
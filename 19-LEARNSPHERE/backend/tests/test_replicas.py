@@ -0,0 +1,151 @@
+import time
+import pytest
+from app.core.config import settings
+from app.db import replicas
+from app.db.replicas import ReplicaSet, RedisRecentWriters, InMemoryRecentWriters, get_read_db, open_read_session
+from app.db.session import SessionLocal
+from app.main import app
+import app.routers.dashboard as dashboard
+from conftest import login
+
+# A path SQLite can't create, so connecting fails the way a down replica does
+DOWN_REPLICA = "sqlite:////nonexistent-dir/replica.db"
+
+@pytest.fixture
+def replica_set(monkeypatch):
+    def configure(urls):
+        replica_set = ReplicaSet(urls)
+        monkeypatch.setattr(replicas, "_replicas", replica_set)
+        monkeypatch.setattr(settings, "DATABASE_REPLICA_URLS", ",".join(urls))
+        return replica_set
+    monkeypatch.setattr(replicas, "_recent_writers", None)
+    yield configure
+
+def _bound_url(session) -> str:
+    return str(session.get_bind().url)
+
+def _on_replica(session) -> bool:
+    return session.get_bind() in replicas._replicas.engines
+
+def test_round_robin(replica_set):
+    replica_set = replica_set(["sqlite:///:memory:", "sqlite://"])
+    assert [replica_set.candidates() for _ in range(3)] == [[0, 1], [1, 0], [0, 1]]
+    urls = []
+    for _ in range(2):
+        session = replica_set.open_session()
+        urls.append(_bound_url(session))
+        session.close()
+    assert sorted(urls) == ["sqlite://", "sqlite:///:memory:"]
+
+def test_failover_marks_replica_down(replica_set, monkeypatch):
+    monkeypatch.setattr(settings, "REPLICA_RETRY_SECONDS", 60)
+    replica_set = replica_set([DOWN_REPLICA, "sqlite://"])
+    for _ in range(2):
+        session = replica_set.open_session()
+        assert _bound_url(session) == "sqlite://"
+        session.close()
+    # Skipped until the retry interval passes
+    assert all(candidates == [1] for candidates in (replica_set.candidates(), replica_set.candidates()))
+
+    replica_set.mark_down(1)
+    assert replica_set.open_session() is None
+
+def test_writers_read_their_writes_from_the_primary(db, factory, replica_set):
+    replica_set(["sqlite://"])
+    user = factory.user()
+
+    def read_session():
+        dependency = get_read_db(current_user=user, db=db)
+        return next(dependency)
+
+    assert read_session() is not db
+    assert _on_replica(open_read_session(user.id))
+
+    _commit_as(user)
+    assert read_session() is db
+    assert not _on_replica(open_read_session(user.id))
+    # Only the writer is pinned
+    other = factory.user()
+    assert next(get_read_db(current_user=other, db=db)) is not db
+
+class SharedStore:
+    """
+    The two Redis commands the recent-writer markers use, over one dict that several "workers" share.
+    """
+
+    def __init__(self):
+        self.keys = {}
+
+    def set(self, key, value, px):
+        self.keys[key] = (value, time.monotonic() + px / 1000)
+
+    def exists(self, key):
+        entry = self.keys.get(key)
+        return int(entry is not None and entry[1] > time.monotonic())
+
+def _commit_as(user):
+    writer = SessionLocal()
+    writer.info["user_id"] = user.id
+    writer.commit()
+    writer.close()
+
+def test_stickiness_crosses_workers_with_a_shared_store(db, factory, replica_set, monkeypatch):
+    replica_set(["sqlite://"])
+    user = factory.user()
+    store = SharedStore()
+    worker_a = RedisRecentWriters(store, settings.REPLICA_STICKY_SECONDS)
+    worker_b = RedisRecentWriters(store, settings.REPLICA_STICKY_SECONDS)
+
+    # The write lands on worker A...
+    monkeypatch.setattr(replicas, "_recent_writers", worker_a)
+    _commit_as(user)
+    # ...and worker B, with its own marker store, still sends the next read to the primary
+    monkeypatch.setattr(replicas, "_recent_writers", worker_b)
+    assert next(get_read_db(current_user=user, db=db)) is db
+    assert not _on_replica(open_read_session(user.id))
+
+    # Per-process markers don't cross workers, which is why multi-worker deployments need the shared store
+    monkeypatch.setattr(replicas, "_recent_writers", InMemoryRecentWriters(settings.REPLICA_STICKY_SECONDS))
+    _commit_as(user)
+    monkeypatch.setattr(replicas, "_recent_writers", InMemoryRecentWriters(settings.REPLICA_STICKY_SECONDS))
+    assert next(get_read_db(current_user=user, db=db)) is not db
+
+def test_sticky_marker_expires():
+    store = SharedStore()
+    writers = RedisRecentWriters(store, 0.05)
+    writers.mark("user")
+    assert writers.contains("user")
+    time.sleep(0.1)
+    assert not writers.contains("user")
+
+def test_unreachable_marker_store_reads_from_the_primary():
+    class DownStore:
+        def set(self, *args, **kwargs):
+            raise ConnectionError("redis is down")
+        exists = set
+
+    writers = RedisRecentWriters(DownStore(), 5)
+    writers.mark("user")
+    assert writers.contains("user")
+
+def test_shared_caches_fill_from_the_primary(client, factory, db, monkeypatch):
+    instructor = factory.user("instructor")
+    course = factory.course(instructor)
+    used, read_sessions = [], []
+    monkeypatch.setattr(dashboard, "get_cohort_analytics", lambda session, course_id: used.append(session) or {})
+
+    def separate_read_db():
+        # Stands in for a replica session; closed before the request's own session
+        session = SessionLocal()
+        read_sessions.append(session)
+        try:
+            yield session
+        finally:
+            session.close()
+    app.dependency_overrides[get_read_db] = separate_read_db
+    try:
+        login(client, instructor)
+        assert client.get(f"/api/v1/dashboard/courses/{course.id}/cohort").status_code == 200
+    finally:
+        app.dependency_overrides.pop(get_read_db)
+    assert len(used) == 1 and used[0] is not read_sessions[0]
@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.models.review import ReviewItem
+from app.services.review_service import ReviewQueue, MIN_EASE, apply_sm2
+from conftest import SIZES, login, query_count, assert_flat
+
+def test_due_reviews_budget(client, factory, db):
+    counts = []
+    for size in SIZES:
+        instructor = factory.user("instructor")
+        learner = factory.user()
+        due_at = datetime.now(timezone.utc) - timedelta(days=1)
+        for _ in range(size):
+            course = factory.course(instructor, lessons=2)
+            factory.enroll(learner, course, progress=50)
+            for lesson in factory.lessons(course):
+                db.add(ReviewItem(user_id=learner.id, lesson_id=lesson.id, course_id=course.id, due_at=due_at))
+        db.commit()
+        login(client, learner)
+        response = client.get("/api/v1/reviews/due")
+        assert response.status_code == 200
+        counts.append(query_count(response))
+    assert_flat(counts)
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+def _new_item() -> ReviewItem:
+    return ReviewItem(ease=2.5, interval_days=0.0, repetitions=0)
+
+def test_sm2_intervals_grow_by_ease():
+    item = _new_item()
+    intervals = []
+    for _ in range(4):
+        # Score 100 is quality 5: ease grows by 0.1 per review
+        apply_sm2(item, 100, NOW)
+        intervals.append(item.interval_days)
+    assert intervals[:2] == [1.0, 6.0]
+    assert intervals[2] == round(6.0 * 2.7, 1)
+    assert intervals[3] == round(intervals[2] * 2.8, 1)
+    assert item.repetitions == 4
+    assert item.last_score == 100 and item.last_reviewed_at == NOW
+    assert item.due_at == NOW + timedelta(days=intervals[3])
+
+def test_sm2_failed_recall_resets_the_schedule():
+    item = _new_item()
+    for _ in range(3):
+        apply_sm2(item, 90, NOW)
+    assert item.repetitions == 3 and item.interval_days > 6
+    ease = item.ease
+    # 40 is quality 2, below the passing quality of 3
+    apply_sm2(item, 40, NOW)
+    assert item.repetitions == 0
+    assert item.interval_days == 1.0
+    assert item.ease < ease
+    apply_sm2(item, 90, NOW)
+    assert (item.repetitions, item.interval_days) == (1, 1.0)
+
+@pytest.mark.parametrize("score", [0, 20, 50])
+def test_sm2_ease_has_a_floor(score):
+    item = _new_item()
+    for _ in range(20):
+        apply_sm2(item, score, NOW)
+        assert item.ease >= MIN_EASE
+    assert item.ease == pytest.approx(MIN_EASE)
+
+def test_review_queue_serves_most_overdue_first():
+    now = NOW.timestamp()
+    queue = ReviewQueue([
+        ("soon", "c1", NOW - timedelta(days=1)),
+        ("oldest", "c1", NOW - timedelta(days=5)),
+        ("later", "c2", NOW + timedelta(days=2)),
+        ("middle", "c2", NOW - timedelta(days=3)),
+    ])
+    assert [lesson for lesson, _, _ in queue.due(now, 10)] == ["oldest", "middle", "soon"]
+    assert [lesson for lesson, _, _ in queue.due(now, 2)] == ["oldest", "middle"]
+    # Reading doesn't consume the queue
+    assert len(queue.due(now, 10)) == 3
+
+def test_review_queue_skips_rescheduled_entries():
+    now = NOW.timestamp()
+    queue = ReviewQueue([("a", "c1", NOW - timedelta(days=2)), ("b", "c1", NOW - timedelta(days=1))])
+    # Reviewing "a" pushes it into the future; its old heap entry is stale and must be skipped
+    queue.update("a", "c1", NOW + timedelta(days=6))
+    assert queue.due(now, 10) == [("b", "c1", (NOW - timedelta(days=1)).timestamp())]
+    # Moving "b" earlier keeps exactly one entry for it
+    queue.update("b", "c1", NOW - timedelta(days=4))
+    assert [lesson for lesson, _, _ in queue.due(now, 10)] == ["b"]
+    assert len(queue) == 2
+    assert [lesson for lesson, _, _ in queue.due(now + 7 * 86400, 10)] == ["b", "a"]
+
+def test_review_queue_compacts_stale_entries():
+    queue = ReviewQueue([("a", "c1", NOW)])
+    for day in range(100):
+        queue.update("a", "c1", NOW + timedelta(days=day))
+    assert len(queue._heap) <= 2 * len(queue) + 16
+    assert queue.due((NOW + timedelta(days=99)).timestamp(), 10) == [("a", "c1", (NOW + timedelta(days=99)).timestamp())]
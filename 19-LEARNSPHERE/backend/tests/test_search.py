@@ -0,0 +1,18 @@
+import app.services.search_service as search_service
+from conftest import SIZES, login, query_count, assert_flat
+
+def test_search_budget(client, factory):
+    counts, indexed = [], 0
+    for size in SIZES:
+        instructor = factory.user("instructor")
+        for _ in range(size):
+            factory.course(instructor)
+        indexed += size
+        # Rebuild the fallback index each time so every size pays for the cold build
+        search_service._memory_index = None
+        login(client, factory.user())
+        response = client.get("/api/v1/search/courses", params={"q": "python"})
+        assert response.status_code == 200
+        assert response.json()["total"] == indexed
+        counts.append(query_count(response))
+    assert_flat(counts)
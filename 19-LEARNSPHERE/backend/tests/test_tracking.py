@@ -0,0 +1,87 @@
+from app.models.mastery import LessonMastery
+from app.models.tracking import QuizAttempt
+from conftest import SIZES, login, query_count, assert_flat
+
+def _learner_with_history(factory, size):
+    """
+    A learner enrolled in a course of `size` lessons, with activity on all of them.
+    """
+    instructor = factory.user("instructor")
+    learner = factory.user()
+    course = factory.course(instructor, lessons=size + 1, quiz_every=1)
+    factory.enroll(learner, course, progress=50)
+    lessons = factory.lessons(course)
+    factory.activity(learner, course, lessons[:size])
+    return learner, course, lessons
+
+def test_lesson_progress_budget(client, factory):
+    counts = []
+    for size in SIZES:
+        learner, course, lessons = _learner_with_history(factory, size)
+        login(client, learner)
+        response = client.post("/api/v1/lesson/progress", json={
+            "course_id": str(course.id), "lesson_id": str(lessons[-1].id), "percent": 100
+        })
+        assert response.status_code == 200
+        assert response.json()["course_progress"] is not None
+        counts.append(query_count(response))
+    assert_flat(counts)
+
+def test_quiz_submit_budget(client, factory):
+    counts = []
+    for size in SIZES:
+        learner, course, lessons = _learner_with_history(factory, size)
+        login(client, learner)
+        response = client.post("/api/v1/quiz/submit", json={
+            "course_id": str(course.id), "quiz_id": str(lessons[0].id),
+            "score": 80, "total_questions": 10, "time_taken_seconds": 300
+        })
+        assert response.status_code == 200
+        counts.append(query_count(response))
+    assert_flat(counts)
+
+def test_quiz_submit_rejects_a_lesson_from_another_course(client, factory, db):
+    learner, course, _ = _learner_with_history(factory, 1)
+    _, other, other_lessons = _learner_with_history(factory, 1)
+    attempts = lambda: db.query(QuizAttempt).filter(QuizAttempt.user_id == learner.id).count()
+    before = attempts()
+    login(client, learner)
+    response = client.post("/api/v1/quiz/submit", json={
+        "course_id": str(course.id), "quiz_id": str(other_lessons[0].id),
+        "score": 80, "total_questions": 10, "time_taken_seconds": 300
+    })
+    assert response.status_code == 400
+    assert attempts() == before
+    assert db.query(LessonMastery).filter(LessonMastery.lesson_id == other_lessons[0].id).count() == 0
+
+def test_session_end_and_course_start_budget(client, factory):
+    end_counts, start_counts = [], []
+    for size in SIZES:
+        learner, course, lessons = _learner_with_history(factory, size)
+        login(client, learner)
+        response = client.post("/api/v1/session/end", json={
+            "course_id": str(course.id), "lesson_id": str(lessons[0].id),
+            "started_at": "2024-05-01T10:00:00Z", "ended_at": "2024-05-01T10:25:00Z"
+        })
+        assert response.status_code == 200
+        end_counts.append(query_count(response))
+        response = client.post("/api/v1/course/start", json={"course_id": str(course.id)})
+        assert response.status_code == 200
+        start_counts.append(query_count(response))
+    assert_flat(end_counts)
+    assert_flat(start_counts)
+
+def test_performance_budget(client, factory):
+    first_counts, mastery_counts = [], []
+    for size in SIZES:
+        learner, _, _ = _learner_with_history(factory, size)
+        login(client, learner)
+        # First visit computes and stores the snapshot
+        response = client.get("/api/v1/performance/me")
+        assert response.status_code == 200
+        first_counts.append(query_count(response))
+        response = client.get("/api/v1/performance/mastery")
+        assert response.status_code == 200
+        mastery_counts.append(query_count(response))
+    assert_flat(first_counts)
+    assert_flat(mastery_counts)
@@ -0,0 +1,71 @@
+import time
+import threading
+import pytest
+from fastapi.testclient import TestClient
+import app.main as main
+from app.core.warmup import WarmupState, WarmupTask
+
+@pytest.fixture
+def start_app(connection, monkeypatch):
+    """
+    Runs the app's lifespan with the given warm-up tasks. Teardown that would dispose the
+    test database's engine is skipped.
+    """
+    monkeypatch.setattr(main, "warmup", WarmupState(time.monotonic()))
+    monkeypatch.setattr(main, "dispose_engine", lambda: None)
+    monkeypatch.setattr(main, "dispose_replicas", lambda: None)
+    clients = []
+
+    def start(tasks):
+        monkeypatch.setattr(main, "warmup_tasks", lambda: tasks)
+        client = TestClient(main.app)
+        client.__enter__()
+        clients.append(client)
+        return client
+    yield start
+    for client in clients:
+        client.__exit__(None, None, None)
+
+def _wait_for_finish(timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while not main.warmup.finished:
+        assert time.monotonic() < deadline, "warm-up did not finish"
+        time.sleep(0.01)
+
+def fail():
+    raise RuntimeError("database unreachable")
+
+def test_ready_only_after_warmup_finishes(start_app):
+    gate = threading.Event()
+    client = start_app([WarmupTask("database", lambda: gate.wait(5), critical=True), WarmupTask("jwks", lambda: None)])
+
+    # Live straight away, not ready while a task is still running
+    assert client.get("/health/live").status_code == 200
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming_up"
+    assert response.json()["tasks"]["database"]["status"] == "pending"
+
+    gate.set()
+    _wait_for_finish()
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    assert {name: task["status"] for name, task in response.json()["tasks"].items()} == {"database": "ok", "jwks": "ok"}
+    assert response.json()["startup_seconds"] is not None
+
+def test_failed_critical_task_keeps_the_worker_unready(start_app):
+    client = start_app([WarmupTask("database", fail, critical=True), WarmupTask("jwks", lambda: None)])
+    _wait_for_finish()
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "degraded"
+    database = response.json()["tasks"]["database"]
+    assert (database["status"], database["error"]) == ("failed", "database unreachable")
+
+def test_failed_optional_task_is_reported_but_ready(start_app):
+    client = start_app([WarmupTask("database", lambda: None, critical=True), WarmupTask("recommender", fail)])
+    _wait_for_finish()
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    assert response.json()["tasks"]["recommender"]["status"] == "failed"
@@ -0,0 +1,41 @@
+import argparse
+import logging
+from app.core.config import settings
+from app.db.base import Base  # registers every model with the mapper
+from app.db.session import SessionLocal
+from app.services.course_recommendation_service import (
+    CourseEmbeddings, train_course_embeddings, refresh_course_embeddings,
+    DEFAULT_FACTORS, DEFAULT_ITERATIONS, DEFAULT_REGULARIZATION
+)
+
+# Offline job for "learners like you also took" recommendations.
+# Run a full training periodically (e.g. nightly) and --incremental in between.
+parser = argparse.ArgumentParser(description="Build course recommendation embeddings")
+parser.add_argument("--incremental", action="store_true", help="Only refit learners and courses changed since the last run")
+parser.add_argument("--factors", type=int, default=DEFAULT_FACTORS)
+parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+parser.add_argument("--regularization", type=float, default=DEFAULT_REGULARIZATION)
+parser.add_argument("--output", default=settings.RECOMMENDER_MODEL_PATH)
+args = parser.parse_args()
+
+logging.basicConfig(level=logging.INFO)
+
+db = SessionLocal()
+try:
+    if args.incremental:
+        try:
+            model = CourseEmbeddings.load(args.output)
+        except OSError:
+            print("No existing model found, running a full training instead")
+            model = None
+        if model is not None:
+            model = refresh_course_embeddings(db, model)
+        else:
+            model = train_course_embeddings(db, args.factors, args.iterations, args.regularization)
+    else:
+        model = train_course_embeddings(db, args.factors, args.iterations, args.regularization)
+finally:
+    db.close()
+
+model.save(args.output)
+print(f"Saved embeddings for {len(model.user_ids)} learners and {len(model.course_ids)} courses to {args.output}")